@@ -1,18 +1,24 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import List
-from app.services.market_service import market_service
-from app.models.schemas import Quote, IndexData, ChartData
+from app.core.config import settings
+from app.core.deadline import with_deadline
+from app.services.indicators import INDICATOR_OUTPUTS
+from app.services.market_service import INTRADAY_PERIOD_BARS, TECHNICAL_OUTPUTS, market_service
+from app.models.schemas import Quote, QuoteBatch, IndexData, ChartData
 
 router = APIRouter()
 
 
 @router.get("/indices", response_model=List[IndexData])
+@with_deadline()
 def get_indices():
     """Get major market indices"""
     return market_service.get_indices()
 
 
 @router.get("/quote/{ticker}", response_model=Quote)
+@with_deadline()
 def get_quote(ticker: str):
     """Get real-time quote for a ticker"""
     quote = market_service.get_quote(ticker.upper())
@@ -22,24 +28,35 @@ def get_quote(ticker: str):
 
 
 @router.post("/quotes", response_model=List[Quote])
+@with_deadline()
 def get_multiple_quotes(tickers: List[str]):
     """Get quotes for multiple tickers"""
     return market_service.get_multiple_quotes([t.upper() for t in tickers])
 
 
+@router.post("/quotes/batch", response_model=QuoteBatch)
+@with_deadline()
+def get_quote_batch(tickers: List[str]):
+    """Get quotes for multiple tickers concurrently, reporting per-ticker errors"""
+    return market_service.fetch_quotes([t.upper() for t in tickers])
+
+
 @router.get("/chart/{ticker}")
+@with_deadline()
 def get_chart(ticker: str, period: str = "1M"):
     """Get historical chart data"""
     return market_service.get_chart_data(ticker.upper(), period)
 
 
 @router.get("/movers")
+@with_deadline()
 def get_movers():
     """Get top gainers and losers"""
     return market_service.get_movers()
 
 
 @router.get("/search")
+@with_deadline()
 def search_stocks(q: str):
     """Search for stocks"""
     if len(q) < 1:
@@ -48,6 +65,7 @@ def search_stocks(q: str):
 
 
 @router.get("/intraday/{ticker}")
+@with_deadline()
 def get_intraday_data(ticker: str, interval: str = "5min"):
     """Get intraday price data for detailed charts"""
     valid_intervals = ["1min", "5min", "15min", "30min", "60min"]
@@ -63,6 +81,7 @@ def get_intraday_data(ticker: str, interval: str = "5min"):
 
 
 @router.get("/company/{ticker}")
+@with_deadline()
 def get_company_overview(ticker: str):
     """Get detailed company information and fundamentals"""
     overview = market_service.get_company_overview(ticker.upper())
@@ -72,10 +91,11 @@ def get_company_overview(ticker: str):
 
 
 @router.get("/technical/{ticker}")
+@with_deadline()
 def get_technical_indicators(ticker: str, indicators: str = "SMA,RSI,MACD"):
     """Get calculated technical indicators"""
     indicator_list = [ind.strip() for ind in indicators.split(",")]
-    valid_indicators = ["SMA", "RSI", "MACD"]
+    valid_indicators = list(TECHNICAL_OUTPUTS)
 
     # Validate indicators
     for ind in indicator_list:
@@ -90,3 +110,44 @@ def get_technical_indicators(ticker: str, indicators: str = "SMA,RSI,MACD"):
         "ticker": ticker.upper(),
         "indicators": data
     }
+
+
+@router.post("/technical/batch")
+@with_deadline()
+def get_batch_technical_indicators(
+    tickers: List[str],
+    indicators: str = "SMA,RSI,MACD",
+    period: str = "6M",
+    latest: bool = False
+):
+    """Get technical indicators for many tickers in one columnar payload"""
+    indicator_list = [ind.strip() for ind in indicators.split(",")]
+    valid_indicators = list(INDICATOR_OUTPUTS)
+
+    for ind in indicator_list:
+        if ind not in valid_indicators:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid indicator '{ind}'. Must be one of: {valid_indicators}"
+            )
+    if len(tickers) > settings.TECHNICAL_BATCH_MAX_TICKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.TECHNICAL_BATCH_MAX_TICKERS} tickers per request"
+        )
+    if period in INTRADAY_PERIOD_BARS:
+        raise HTTPException(status_code=400, detail="Batch indicators use daily periods")
+
+    data = market_service.calculate_batch_indicators([t.upper() for t in tickers], indicator_list, period, latest)
+    # NumPy arrays straight to orjson; FastAPI's encoder would walk every value
+    return ORJSONResponse(data)
+
+
+@router.get("/technical/{ticker}/live")
+@with_deadline()
+def get_live_indicators(ticker: str):
+    """Latest value of every indicator, with today's bar previewed at the live price"""
+    data = market_service.get_live_indicators(ticker.upper())
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"No price history for {ticker}")
+    return data
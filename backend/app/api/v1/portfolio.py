@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
+from app.core.cassette import http_session
+from app.core.deadline import with_deadline
 from app.db.base import get_db
 from app.models import models, schemas
 from app.services.market_service import market_service
 from datetime import date
 import os
-import requests
 
 router = APIRouter()
 
@@ -139,6 +140,7 @@ def delete_position(
 
 
 @router.get("/{portfolio_id}/performance")
+@with_deadline()
 def get_portfolio_performance(portfolio_id: int, db: Session = Depends(get_db)):
     """Get portfolio performance metrics"""
     portfolio = db.query(models.Portfolio).filter(models.Portfolio.id == portfolio_id).first()
@@ -219,6 +221,11 @@ def _alpaca_headers():
         'APCA-API-SECRET-KEY': os.environ.get('ALPACA_SECRET_KEY', ''),
     }
 
+
+# Routed through the cassette transport when recording/replaying upstream calls
+_alpaca_session = http_session()
+
+
 def _alpaca_base():
     return os.environ.get('ALPACA_BASE_URL', 'https://paper-api.alpaca.markets/v2')
 
@@ -227,7 +234,7 @@ def _alpaca_base():
 def get_alpaca_positions():
     """Get positions from Alpaca"""
     try:
-        resp = requests.get(f"{_alpaca_base()}/positions", headers=_alpaca_headers(), timeout=10)
+        resp = _alpaca_session.get(f"{_alpaca_base()}/positions", headers=_alpaca_headers(), timeout=10)
         resp.raise_for_status()
         raw = resp.json()
     except Exception as e:
@@ -261,7 +268,7 @@ def get_alpaca_positions():
 def get_alpaca_summary():
     """Get account summary from Alpaca"""
     try:
-        account_resp = requests.get(f"{_alpaca_base()}/account", headers=_alpaca_headers(), timeout=10)
+        account_resp = _alpaca_session.get(f"{_alpaca_base()}/account", headers=_alpaca_headers(), timeout=10)
         account_resp.raise_for_status()
         account = account_resp.json()
     except Exception as e:
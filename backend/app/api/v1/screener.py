@@ -1,42 +1,56 @@
 from fastapi import APIRouter
+from app.core.deadline import with_deadline
 from app.models.schemas import ScreenerFilters
+from app.services.fundamentals import fundamentals_store
 from app.services.market_service import market_service
+from app.services.screener_service import SCREENER_UNIVERSE
 
 router = APIRouter()
 
 
 @router.post("/")
+@with_deadline()
 def run_screener(filters: ScreenerFilters):
     """Run stock screener with filters (simplified for MVP)"""
-    # For MVP, return a curated list of popular stocks
+    # For MVP, screen a curated list of popular stocks
     # In Phase 2, this will integrate with FMP API for full screening
-    popular_stocks = [
-        'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
-        'JPM', 'BAC', 'WMT', 'V', 'MA', 'DIS', 'NFLX', 'PYPL',
-        'KO', 'PEP', 'NKE', 'COST', 'HD', 'MCD', 'SBUX', 'TGT'
-    ]
-
-    quotes = market_service.get_multiple_quotes(popular_stocks)
+    quotes = market_service.get_multiple_quotes(SCREENER_UNIVERSE)
+    # Names, sectors and market caps come from the fundamentals table, without upstream calls
+    fundamentals = fundamentals_store.get_many(SCREENER_UNIVERSE)
+    sectors = {sector.lower() for sector in filters.sectors or []}
 
     results = []
     for quote in quotes:
+        overview = fundamentals.get(quote.ticker, {})
+        market_cap = overview.get('market_cap') or quote.market_cap
+        pe_ratio = overview.get('pe_ratio') or quote.pe_ratio
+        sector = overview.get('sector')
+
         # Apply basic filters
         if filters.min_price and quote.price < filters.min_price:
             continue
         if filters.max_price and quote.price > filters.max_price:
             continue
-        if filters.min_pe and quote.pe_ratio and quote.pe_ratio < filters.min_pe:
+        if filters.min_pe and pe_ratio and pe_ratio < filters.min_pe:
+            continue
+        if filters.max_pe and pe_ratio and pe_ratio > filters.max_pe:
+            continue
+        if filters.min_market_cap and market_cap and market_cap < filters.min_market_cap:
+            continue
+        if filters.max_market_cap and market_cap and market_cap > filters.max_market_cap:
             continue
-        if filters.max_pe and quote.pe_ratio and quote.pe_ratio > filters.max_pe:
+        # Tickers whose fundamentals are not loaded yet pass with sector None rather than vanish
+        if sectors and sector and sector.lower() not in sectors:
             continue
 
         results.append({
             'ticker': quote.ticker,
-            'name': quote.ticker,  # In Phase 2, get actual company name
+            'name': overview.get('name') or quote.ticker,
+            'sector': sector,
             'price': quote.price,
             'change_percent': quote.change_percent,
-            'market_cap': quote.market_cap,
-            'pe_ratio': quote.pe_ratio,
+            'market_cap': market_cap,
+            'pe_ratio': pe_ratio,
             'volume': quote.volume
         })
 
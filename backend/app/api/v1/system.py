@@ -0,0 +1,83 @@
+from fastapi import APIRouter
+from app.core.background import background_refresher
+from app.core.cache import cache
+from app.core.cassette import cassette
+from app.core.circuit_breaker import circuit_breakers
+from app.core.rate_limit import rate_limiter
+from app.core.single_flight import single_flight
+from app.db.write_behind import write_behind
+from app.services.fundamentals import fundamentals_refresh_scheduler
+from app.services.indicator_stream import indicator_streams
+from app.services.market_data import market_data
+from app.services.quote_refresh import quote_refresh_scheduler
+from app.services.symbol_index import symbol_index
+
+router = APIRouter()
+
+
+@router.get("/single-flight")
+def get_single_flight_stats():
+    """Get counters for upstream calls executed vs. coalesced onto an in-flight call"""
+    return single_flight.stats()
+
+
+@router.get("/rate-limits")
+def get_rate_limit_stats():
+    """Get token bucket state for each rate-limited upstream"""
+    return rate_limiter.stats()
+
+
+@router.get("/circuit-breakers")
+def get_circuit_breaker_stats():
+    """Get circuit state and failure counters for each upstream"""
+    return circuit_breakers.stats()
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """Get cache size and hit/miss/eviction counters per namespace"""
+    return {**cache.stats(), "background_refresh": background_refresher.stats()}
+
+
+@router.get("/write-behind")
+def get_write_behind_stats():
+    """Get queued and flushed counters for batched cache writes"""
+    return write_behind.stats()
+
+
+@router.get("/quote-refresh")
+def get_quote_refresh_stats():
+    """Get hot-symbol refresh scheduler state and its last cycle"""
+    return quote_refresh_scheduler.stats()
+
+
+@router.get("/fundamentals-refresh")
+def get_fundamentals_refresh_stats():
+    """Get fundamentals refresh scheduler state and its last cycle"""
+    return fundamentals_refresh_scheduler.stats()
+
+
+@router.get("/cassette")
+def get_cassette_stats():
+    """Get upstream record/replay mode and recording counters"""
+    if cassette is None:
+        return {"mode": "off"}
+    return {"mode": cassette.mode, **cassette.store.stats()}
+
+
+@router.get("/providers")
+def get_provider_stats():
+    """Get market data provider health, latency and hedging counters"""
+    return market_data.stats()
+
+
+@router.get("/symbol-index")
+def get_symbol_index_stats():
+    """Get local symbol search index size and hit/miss counters"""
+    return symbol_index.stats()
+
+
+@router.get("/indicator-streams")
+def get_indicator_stream_stats():
+    """Get streaming indicator state counters: tickers live in process, seeded, restored and advanced bars"""
+    return indicator_streams.stats()
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
+from app.core.deadline import with_deadline
 from app.db.base import get_db
 from app.models import models, schemas
 from app.services.market_service import market_service
@@ -95,6 +96,7 @@ def remove_stock_from_watchlist(
 
 
 @router.get("/{watchlist_id}/quotes")
+@with_deadline()
 def get_watchlist_with_quotes(watchlist_id: int, db: Session = Depends(get_db)):
     """Get watchlist with live quotes"""
     watchlist = db.query(models.Watchlist).filter(models.Watchlist.id == watchlist_id).first()
@@ -122,7 +124,9 @@ def get_watchlist_with_quotes(watchlist_id: int, db: Session = Depends(get_db)):
                 'price': quote.price,
                 'change': quote.change,
                 'change_percent': quote.change_percent,
-                'volume': quote.volume
+                'volume': quote.volume,
+                'stale': quote.stale,
+                'age_seconds': quote.age_seconds
             })
 
     return {
@@ -0,0 +1,52 @@
+import math
+import threading
+import time
+from typing import Dict, Hashable, Tuple
+from app.core.config import settings
+
+
+class AccessTracker:
+    """Exponentially decayed access counts per key.
+
+    Each access adds 1 to a key's score and scores halve every ``half_life``
+    seconds, so the score approximates recent request frequency. Keys not
+    seen for ``window`` seconds are forgotten.
+    """
+
+    def __init__(self, half_life: float, window: float, max_keys: int = 10000):
+        self.half_life = half_life
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (score at last access, last access time)
+        self._scores: Dict[Hashable, Tuple[float, float]] = {}
+
+    def _decayed(self, score: float, last: float, now: float) -> float:
+        return score * math.pow(0.5, (now - last) / self.half_life)
+
+    def record(self, key: Hashable):
+        now = time.monotonic()
+        with self._lock:
+            score, last = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, last, now) + 1, now)
+            if len(self._scores) > self.max_keys:
+                self._prune(now)
+
+    def _prune(self, now: float):
+        """Forget keys outside the window, then the lowest scoring ones beyond max_keys"""
+        cutoff = now - self.window
+        self._scores = {k: v for k, v in self._scores.items() if v[1] >= cutoff}
+        if len(self._scores) > self.max_keys:
+            ranked = sorted(self._scores.items(), key=lambda item: self._decayed(*item[1], now), reverse=True)
+            self._scores = dict(ranked[:self.max_keys])
+
+    def scores(self) -> Dict[Hashable, float]:
+        """Current decayed score for every key accessed within the window"""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            return {key: self._decayed(score, last, now) for key, (score, last) in self._scores.items()}
+
+
+# Quote requests per ticker; drives the hot-symbol refresh scheduler
+quote_access = AccessTracker(settings.QUOTE_REFRESH_ACCESS_HALF_LIFE, settings.QUOTE_REFRESH_RECENT_WINDOW)
@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Set
+from app.core.config import settings
+
+
+class BackgroundRefresher:
+    """Runs cache refreshes off the request path, at most one per key at a time"""
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-refresh")
+        self._lock = threading.Lock()
+        self._pending: Set[Hashable] = set()
+        self.scheduled = 0
+        self.skipped = 0
+
+    def schedule(self, key: Hashable, fn: Callable[[], object]) -> bool:
+        """Queue fn unless a refresh for key is already queued or running"""
+        with self._lock:
+            if key in self._pending:
+                self.skipped += 1
+                return False
+            self._pending.add(key)
+            self.scheduled += 1
+
+        def run():
+            try:
+                fn()
+            except Exception as e:
+                print(f"Background refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        try:
+            self._executor.submit(run)
+        except RuntimeError:
+            # Executor already shut down
+            with self._lock:
+                self._pending.discard(key)
+            return False
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self._pending), "scheduled": self.scheduled, "skipped": self.skipped}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+background_refresher = BackgroundRefresher(settings.BACKGROUND_REFRESH_WORKERS)
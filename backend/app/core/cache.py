@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+from app.core.config import settings
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    age: float  # seconds since the value was stored
+    stale: bool  # past its TTL but still inside the namespace's grace window
+
+
+class CacheStore:
+    """Bounded, thread-safe LRU cache with a TTL per namespace.
+
+    Entries are keyed by (namespace, key). Reads refresh recency; once the
+    store holds ``max_entries`` the least recently used entry is evicted.
+    Expired entries are dropped when they are next read or reach the LRU end.
+
+    Namespaces with a stale grace window keep entries for that long past
+    their TTL so get_entry can serve them while a refresh runs elsewhere.
+
+    An optional shared L2 tier (see RedisCacheTier) backs selected
+    namespaces: L1 misses fall through to it and writes go to both tiers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        namespace_ttls: Dict[str, float],
+        default_ttl: float = 60,
+        namespace_grace: Optional[Dict[str, float]] = None
+    ):
+        self.max_entries = max_entries
+        self.namespace_ttls = dict(namespace_ttls)
+        self.namespace_grace = dict(namespace_grace or {})
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        # (namespace, key) -> (value, stored_at, expires_at)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, float, float]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self.l2 = None
+        self.l2_namespaces = set()
+
+    def ttl_for(self, namespace: str) -> float:
+        return self.namespace_ttls.get(namespace, self.default_ttl)
+
+    def grace_for(self, namespace: str) -> float:
+        return self.namespace_grace.get(namespace, 0)
+
+    def _counter(self, namespace: str) -> Dict[str, int]:
+        counter = self._stats.get(namespace)
+        if counter is None:
+            counter = self._stats[namespace] = {
+                "hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "l2_hits": 0
+            }
+        return counter
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or default on a miss"""
+        entry = self.get_entry(namespace, key, allow_stale=False)
+        return entry.value if entry else default
+
+    def get_entry(self, namespace: str, key: Hashable, allow_stale: bool = True) -> Optional[CacheEntry]:
+        """Return the entry with its age, including stale ones inside the grace window"""
+        now = time.monotonic()
+        grace = self.grace_for(namespace)
+        with self._lock:
+            counter = self._counter(namespace)
+            entry = self._entries.get((namespace, key))
+            if entry is not None:
+                value, stored_at, expires_at = entry
+                if expires_at > now or (allow_stale and expires_at + grace > now):
+                    self._entries.move_to_end((namespace, key))
+                    stale = expires_at <= now
+                    counter["stale_hits" if stale else "hits"] += 1
+                    return CacheEntry(value, now - stored_at, stale)
+                if expires_at + grace <= now:
+                    del self._entries[(namespace, key)]
+                    counter["expirations"] += 1
+            counter["misses"] += 1
+
+        if self.l2 is None or namespace not in self.l2_namespaces:
+            return None
+
+        try:
+            found, value, remaining = self.l2.get(namespace, key)
+        except Exception as e:
+            print(f"Shared cache read failed for {namespace}: {e}")
+            return None
+        if not found:
+            return None
+
+        # L2 keys live for TTL + grace; split the remaining lifetime back out
+        ttl = self.ttl_for(namespace)
+        fresh_for = (remaining if remaining is not None else ttl + grace) - grace
+        if fresh_for <= 0 and not allow_stale:
+            return None
+
+        age = max(0.0, ttl - fresh_for)
+        self._set_local(namespace, key, value, fresh_for, age)
+        with self._lock:
+            self._counter(namespace)["l2_hits"] += 1
+        return CacheEntry(value, age, fresh_for <= 0)
+
+    def remaining_ttl(self, namespace: str, key: Hashable) -> Optional[float]:
+        """Seconds until a local entry expires (negative once stale), or None if absent.
+
+        Does not count as a lookup or refresh LRU recency.
+        """
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+        return entry[2] - time.monotonic() if entry is not None else None
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value in every tier, evicting least recently used entries beyond max_entries"""
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        self._set_local(namespace, key, value, ttl)
+
+        if self.l2 is not None and namespace in self.l2_namespaces:
+            try:
+                self.l2.set(namespace, key, value, ttl + self.grace_for(namespace))
+            except Exception as e:
+                print(f"Shared cache write failed for {namespace}: {e}")
+
+    def _set_local(self, namespace: str, key: Hashable, value: Any, ttl: float, age: float = 0.0):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[(namespace, key)] = (value, now - age, now + ttl)
+            self._entries.move_to_end((namespace, key))
+
+            while len(self._entries) > self.max_entries:
+                (evicted_namespace, _), _ = self._entries.popitem(last=False)
+                self._counter(evicted_namespace)["evictions"] += 1
+
+    def delete(self, namespace: str, key: Hashable):
+        self.invalidate_local(namespace, key)
+
+        if self.l2 is not None and namespace in self.l2_namespaces:
+            try:
+                self.l2.delete(namespace, key)
+            except Exception as e:
+                print(f"Shared cache delete failed for {namespace}: {e}")
+
+    def invalidate_local(self, namespace: str, key: Hashable):
+        """Drop an L1 entry only, e.g. when another process wrote a newer value to L2"""
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def attach_l2(self, tier, namespaces):
+        """Back the given namespaces with a shared tier and follow its invalidations"""
+        self.l2_namespaces = set(namespaces)
+        self.l2 = tier
+        tier.listen(self.invalidate_local)
+
+    def detach_l2(self):
+        if self.l2 is not None:
+            self.l2.close()
+        self.l2 = None
+        self.l2_namespaces = set()
+
+    def clear(self, namespace: Optional[str] = None):
+        """Drop every entry, or only those in one namespace"""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[entry_key]
+
+    def stats(self) -> Dict:
+        """Size plus hit/miss/eviction counters, overall and per namespace"""
+        with self._lock:
+            sizes: Dict[str, int] = {}
+            for namespace, _ in self._entries:
+                sizes[namespace] = sizes.get(namespace, 0) + 1
+
+            namespaces = {}
+            for namespace in set(self._stats) | set(sizes):
+                counter = dict(self._counter(namespace))
+                lookups = counter["hits"] + counter["misses"]
+                namespaces[namespace] = {
+                    **counter,
+                    "size": sizes.get(namespace, 0),
+                    "ttl": self.ttl_for(namespace),
+                    "stale_grace": self.grace_for(namespace),
+                    "hit_rate": round(counter["hits"] / lookups, 4) if lookups else None
+                }
+
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "l2": sorted(self.l2_namespaces) if self.l2 is not None else None,
+                "hits": sum(n["hits"] for n in namespaces.values()),
+                "misses": sum(n["misses"] for n in namespaces.values()),
+                "evictions": sum(n["evictions"] for n in namespaces.values()),
+                "namespaces": namespaces
+            }
+
+
+# Shared by every service; TTLs in seconds
+cache = CacheStore(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    namespace_ttls={
+        "quote": settings.CACHE_TTL_QUOTE,
+        "chart": settings.CACHE_TTL_CHART,
+        "series": settings.CACHE_TTL_CHART,
+        "intraday": settings.CACHE_TTL_INTRADAY,
+        "company": settings.CACHE_TTL_COMPANY,
+        "fred": settings.CACHE_TTL_FRED,
+        "news": settings.CACHE_TTL_NEWS,
+        "indicators": settings.CACHE_TTL_INDICATORS,
+        "search_miss": settings.CACHE_TTL_SEARCH_MISS,
+    },
+    namespace_grace={
+        "quote": settings.CACHE_STALE_GRACE_QUOTE,
+        "chart": settings.CACHE_STALE_GRACE_CHART,
+        "series": settings.CACHE_STALE_GRACE_CHART,
+        "intraday": settings.CACHE_STALE_GRACE_INTRADAY,
+    }
+)
+
+
+def configure_shared_tier():
+    """Attach the Redis L2 tier if enabled; the cache keeps working L1-only if Redis is unreachable"""
+    if not settings.REDIS_CACHE_ENABLED or cache.l2 is not None:
+        return
+
+    from app.core.redis_cache import RedisCacheTier
+
+    try:
+        tier = RedisCacheTier.from_url(settings.REDIS_URL)
+        tier.client.ping()
+        namespaces = [ns.strip() for ns in settings.REDIS_CACHE_NAMESPACES.split(",") if ns.strip()]
+        cache.attach_l2(tier, namespaces)
+        print(f"Shared cache tier enabled for: {', '.join(namespaces)}")
+    except Exception as e:
+        print(f"Shared cache tier unavailable, using in-process cache only: {e}")
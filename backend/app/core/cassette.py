@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import httpx
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from app.core.config import settings
+
+# Credentials never enter cassette keys or stored URLs
+SECRET_PARAMS = {"apikey", "api_key", "apiKey", "token"}
+# Only these response headers are kept
+KEPT_HEADERS = {"content-type", "content-encoding"}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised on replay when no recording matches the request; callers treat it like a network failure"""
+
+
+def _redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def request_key(method: str, url: str, body: Optional[bytes]) -> Tuple[str, str]:
+    """(key, redacted url) identifying a request regardless of credentials and parameter order"""
+    redacted = _redact_url(url)
+    digest = hashlib.sha256(f"{method.upper()} {redacted}".encode())
+    if body:
+        digest.update(body)
+    return digest.hexdigest(), redacted
+
+
+class CassetteStore:
+    """Recorded upstream responses in one SQLite file, bodies zlib-compressed.
+
+    Each request key keeps its latest recording together with the time the
+    live call took, so replay can reproduce (or scale) upstream latency.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats_counters = {"recorded": 0, "replayed": 0, "misses": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, method TEXT, url TEXT, status INTEGER, "
+                "headers BLOB, body BLOB, elapsed REAL, recorded_at REAL)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def save(self, key: str, method: str, url: str, status: int, headers: Dict[str, str], body: bytes, elapsed: float):
+        kept = {k.lower(): v for k, v in headers.items() if k.lower() in KEPT_HEADERS}
+        # Bodies are stored decoded, so the transfer encoding no longer applies
+        kept.pop("content-encoding", None)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, method.upper(), url, status, orjson.dumps(kept), zlib.compress(body, 6), elapsed, time.time())
+            )
+        finally:
+            conn.close()
+        self._count("recorded")
+
+    def load(self, key: str) -> Optional[Tuple[int, Dict[str, str], bytes, float]]:
+        """(status, headers, body, recorded elapsed seconds), or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT status, headers, body, elapsed FROM responses WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("replayed")
+        status, headers, body, elapsed = row
+        return status, orjson.loads(headers), zlib.decompress(body), elapsed
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats_counters[name] += 1
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        try:
+            size, = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        finally:
+            conn.close()
+        with self._lock:
+            return {"path": self.path, "recordings": size, **self.stats_counters}
+
+
+class Cassette:
+    """Record/replay policy shared by the sync and async transports"""
+
+    def __init__(self, store: CassetteStore, mode: str, latency_ms: float = 0, latency_scale: float = 0,
+                 jitter_ms: float = 0, seed: Optional[int] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.store = store
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.latency_scale = latency_scale
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+
+    def replay_delay(self, recorded_elapsed: float) -> float:
+        """Synthetic latency in seconds: fixed + scaled recorded latency + uniform jitter"""
+        jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        return (self.latency_ms + jitter) / 1000 + self.latency_scale * (recorded_elapsed or 0.0)
+
+    def replay(self, method: str, url: str, body: Optional[bytes]):
+        key, redacted = request_key(method, url, body)
+        recording = self.store.load(key)
+        if recording is None:
+            raise CassetteMiss(f"No recording for {method.upper()} {redacted}")
+        return recording
+
+    def record(self, method: str, url: str, body: Optional[bytes], status: int, headers, content: bytes, elapsed: float):
+        key, redacted = request_key(method, url, body)
+        self.store.save(key, method, redacted, status, dict(headers), content, elapsed)
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests transport adapter that records live responses or replays them"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        body = request.body.encode() if isinstance(request.body, str) else request.body
+
+        if self.cassette.mode == "replay":
+            status, headers, content, elapsed = self.cassette.replay(request.method, request.url, body)
+            time.sleep(self.cassette.replay_delay(elapsed))
+            return self._build(request, status, headers, content)
+
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        self.cassette.record(request.method, request.url, body, response.status_code,
+                             response.headers, content, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def _build(request, status: int, headers: Dict[str, str], content: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """httpx async transport that records live responses or replays them"""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+
+        if self.cassette.mode == "replay":
+            status, headers, content, elapsed = await asyncio.to_thread(
+                self.cassette.replay, request.method, str(request.url), body
+            )
+            await asyncio.sleep(self.cassette.replay_delay(elapsed))
+            return httpx.Response(status, headers=headers, content=content, request=request)
+
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        await asyncio.to_thread(
+            self.cassette.record, request.method, str(request.url), body,
+            response.status_code, response.headers, content, time.perf_counter() - start
+        )
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length")]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def _configured_cassette() -> Optional[Cassette]:
+    if settings.HTTP_CASSETTE_MODE == "off":
+        return None
+    return Cassette(
+        CassetteStore(settings.HTTP_CASSETTE_PATH),
+        settings.HTTP_CASSETTE_MODE,
+        latency_ms=settings.HTTP_REPLAY_LATENCY_MS,
+        latency_scale=settings.HTTP_REPLAY_LATENCY_SCALE,
+        jitter_ms=settings.HTTP_REPLAY_JITTER_MS,
+        seed=settings.SYNTHETIC_SEED
+    )
+
+
+# Shared by every upstream client; None when HTTP_CASSETTE_MODE is "off"
+cassette = _configured_cassette()
+
+
+def http_session() -> requests.Session:
+    """A requests session routed through the cassette when recording or replaying"""
+    session = requests.Session()
+    if cassette is not None:
+        adapter = CassetteAdapter(cassette)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+
+def async_http_client(**kwargs) -> httpx.AsyncClient:
+    """An httpx AsyncClient routed through the cassette when recording or replaying"""
+    if cassette is not None:
+        kwargs["transport"] = AsyncCassetteTransport(cassette)
+    return httpx.AsyncClient(**kwargs)
@@ -0,0 +1,162 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+from app.core import deadline
+from app.core.config import settings
+from app.core.rate_limit import RateLimitExceeded
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the upstream while its circuit is open"""
+
+
+def _is_upstream_failure(error: Exception) -> bool:
+    """False for HTTP 4xx answers (bad symbol, not found): the upstream is up, the request was wrong.
+
+    429 still counts, since the upstream is refusing work.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status is None or status >= 500 or status == 429
+
+
+class CircuitBreaker:
+    """Per-upstream circuit breaker.
+
+    Closed: calls go through; ``failure_threshold`` consecutive failures
+    open the circuit. Open: calls fail fast with CircuitOpenError for
+    ``reset_timeout`` seconds. Half-open: a single probe call is let
+    through; success closes the circuit, failure opens it again. Other
+    callers keep failing fast while the probe runs.
+
+    Local refusals (rate limit budget, an expired request deadline) say
+    nothing about the upstream and are not counted, nor are errors of calls
+    that started with less than ``MIN_BUDGET`` seconds of request deadline
+    left, since those never gave the upstream a fair chance.
+    """
+
+    MIN_BUDGET = 1.0
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; in half-open state only the first caller gets through"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self._state = HALF_OPEN
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """End a call that proved nothing either way, freeing the half-open probe slot"""
+        with self._lock:
+            self._probing = False
+
+    @contextmanager
+    def guard(self):
+        """Wrap one upstream call: fail fast while open, record the outcome otherwise"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open; not calling upstream")
+        budget = deadline.remaining()
+        try:
+            yield
+        except (RateLimitExceeded, deadline.DeadlineExceeded, deadline.CallCancelled):
+            self.release()
+            raise
+        except Exception as e:
+            if budget is not None and budget < self.MIN_BUDGET:
+                self.release()
+            elif _is_upstream_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # Cancelled (or the generator closed) mid-call: nothing learned, but a probe must give its slot back
+            self.release()
+            raise
+        self.record_success()
+
+    def stats(self) -> Dict:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected
+            }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per upstream, shared by every client and service"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(key, self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def guard(self, key: str):
+        return self.get(key).guard()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.stats() for key, breaker in breakers.items()}
+
+
+circuit_breakers = CircuitBreakerRegistry(settings.CIRCUIT_BREAKER_FAILURES, settings.CIRCUIT_BREAKER_RESET_TIMEOUT)
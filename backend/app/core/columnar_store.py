@@ -0,0 +1,260 @@
+import os
+import re
+import shutil
+import threading
+from datetime import date
+from typing import Dict, Optional, Union
+import numpy as np
+from app.core.config import settings
+
+# Column name -> on-disk dtype; "date" is the sorted index, stored as days since epoch
+COLUMNS = {
+    "date": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<i8"),
+}
+
+DateLike = Union[date, str, np.datetime64]
+
+
+def _day(value: DateLike) -> int:
+    return int(np.datetime64(value, "D").astype("<i8"))
+
+
+class ColumnarBarStore:
+    """Daily OHLCV bars as fixed-width column files, one directory per ticker.
+
+    Layout: ``<root>/<TICKER>/CURRENT`` names the live generation directory,
+    which holds one raw little-endian file per column (``date.i8``,
+    ``close.f8``, ...). Reads memory-map the files read-only and binary-search
+    the date column, so a range read returns views into the page cache
+    without copying.
+
+    Appends extend the live column files in place, writing ``date`` last so
+    a torn append is ignored (readers use the shortest column). Corrections
+    (rewrite(), or an append that restates stored bars with new values)
+    write a new generation and swap CURRENT with an atomic rename; readers
+    holding the old maps are unaffected. The replaced generation is kept
+    until the next swap, so a reader that resolved CURRENT just before one
+    can still open it, and a reader that loses even that race re-reads
+    CURRENT once.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _ticker_dir(self, ticker: str) -> str:
+        # Tickers like ^GSPC or BRK.B: keep the name readable but filesystem safe
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper()))
+
+    def _current(self, ticker: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._ticker_dir(ticker), "CURRENT")) as f:
+                return os.path.join(self._ticker_dir(ticker), f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _column_path(generation: str, column: str) -> str:
+        return os.path.join(generation, f"{column}.{COLUMNS[column].kind}{COLUMNS[column].itemsize}")
+
+    def open(self, ticker: str) -> Dict[str, np.ndarray]:
+        """Read-only memory maps of every column (empty arrays if the ticker is not stored)"""
+        try:
+            return self._open(ticker)
+        except FileNotFoundError:
+            # Two swaps since CURRENT was read deleted its generation; CURRENT names a newer one now
+            return self._open(ticker)
+
+    def _open(self, ticker: str) -> Dict[str, np.ndarray]:
+        generation = self._current(ticker)
+        if generation is None:
+            return {column: np.empty(0, dtype) for column, dtype in COLUMNS.items()}
+
+        # Trailing bytes from a torn append are ignored
+        lengths = {
+            column: os.path.getsize(self._column_path(generation, column)) // dtype.itemsize
+            for column, dtype in COLUMNS.items()
+        }
+        length = min(lengths.values())
+        if length == 0:
+            return {column: np.empty(0, dtype) for column, dtype in COLUMNS.items()}
+
+        return {
+            column: np.memmap(self._column_path(generation, column), dtype=dtype, mode="r", shape=(length,))
+            for column, dtype in COLUMNS.items()
+        }
+
+    def load(self, ticker: str, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Copies of the latest `limit` bars (all if None), "date" as datetime64[D].
+
+        For callers that copy the bars anyway: one read per column of just
+        the bars asked for, instead of setting up memory maps over whole
+        files, which dominates when loading hundreds of tickers at once.
+        """
+        try:
+            return self._load(ticker, limit)
+        except FileNotFoundError:
+            # As in open(): the generation went away under us, so start again from CURRENT
+            return self._load(ticker, limit)
+
+    def _load(self, ticker: str, limit: Optional[int]) -> Dict[str, np.ndarray]:
+        generation = self._current(ticker)
+        if generation is None:
+            arrays = {column: np.empty(0, dtype) for column, dtype in COLUMNS.items()}
+        else:
+            # "date" is written last, so its length bounds every column's
+            length = os.path.getsize(self._column_path(generation, "date")) // COLUMNS["date"].itemsize
+            start = max(length - limit, 0) if limit is not None else 0
+            arrays = {
+                column: np.fromfile(
+                    self._column_path(generation, column), dtype=dtype,
+                    count=length - start, offset=start * dtype.itemsize
+                )
+                for column, dtype in COLUMNS.items()
+            }
+            length = min(len(values) for values in arrays.values())
+            arrays = {column: values[:length] for column, values in arrays.items()}
+        arrays["date"] = arrays["date"].view("datetime64[D]")
+        return arrays
+
+    def read(
+        self,
+        ticker: str,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Bars with start <= date <= end (then the latest `limit` of them), as zero-copy views.
+
+        The returned "date" column is a datetime64[D] view of the stored day numbers.
+        """
+        columns = self.open(ticker)
+        days = columns["date"]
+
+        lo = int(np.searchsorted(days, _day(start), side="left")) if start is not None else 0
+        hi = int(np.searchsorted(days, _day(end), side="right")) if end is not None else len(days)
+        if limit is not None:
+            lo = max(lo, hi - limit)
+
+        view = {column: values[lo:hi] for column, values in columns.items()}
+        view["date"] = view["date"].view("datetime64[D]")
+        return view
+
+    def first_date(self, ticker: str) -> Optional[np.datetime64]:
+        days = self.open(ticker)["date"]
+        return np.datetime64(int(days[0]), "D") if len(days) else None
+
+    def last_date(self, ticker: str) -> Optional[np.datetime64]:
+        days = self.open(ticker)["date"]
+        return np.datetime64(int(days[-1]), "D") if len(days) else None
+
+    def append(self, ticker: str, bars: Dict[str, np.ndarray]) -> int:
+        """Append date-ordered bars, replacing stored bars from their first date on; returns how many were written.
+
+        Restated bars that match the stored ones are skipped, so re-sending
+        the latest stored bar only costs a comparison unless its values changed.
+        """
+        with self._lock:
+            arrays = self._normalize(bars)
+            generation = self._current(ticker)
+            if generation is None:
+                self._write_generation(ticker, arrays)
+                return len(arrays["date"])
+
+            stored = self.open(ticker)
+            if len(stored["date"]) and len(arrays["date"]):
+                start = int(np.searchsorted(stored["date"], arrays["date"][0], side="left"))
+                overlap = len(stored["date"]) - start
+                if overlap:
+                    unchanged = overlap <= len(arrays["date"]) and all(
+                        np.array_equal(stored[column][start:], arrays[column][:overlap]) for column in COLUMNS
+                    )
+                    if not unchanged:
+                        merged = {
+                            column: np.concatenate((stored[column][:start], arrays[column])) for column in COLUMNS
+                        }
+                        self._write_generation(ticker, merged)
+                        return len(arrays["date"])
+                    arrays = {column: values[overlap:] for column, values in arrays.items()}
+            if not len(arrays["date"]):
+                return 0
+
+            # Drop any torn tail first so every column stays aligned
+            length = len(stored["date"])
+            for column, dtype in COLUMNS.items():
+                path = self._column_path(generation, column)
+                if os.path.getsize(path) != length * dtype.itemsize:
+                    os.truncate(path, length * dtype.itemsize)
+
+            for column in [c for c in COLUMNS if c != "date"] + ["date"]:
+                with open(self._column_path(generation, column), "ab") as f:
+                    f.write(arrays[column].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            return len(arrays["date"])
+
+    def rewrite(self, ticker: str, bars: Dict[str, np.ndarray]):
+        """Atomically replace a ticker's whole history, e.g. after a split adjustment"""
+        with self._lock:
+            self._write_generation(ticker, bars)
+
+    def delete(self, ticker: str):
+        with self._lock:
+            shutil.rmtree(self._ticker_dir(ticker), ignore_errors=True)
+
+    def _write_generation(self, ticker: str, bars: Dict[str, np.ndarray]):
+        arrays = self._normalize(bars)
+        order = np.argsort(arrays["date"], kind="stable")
+        if np.any(np.diff(arrays["date"][order]) <= 0):
+            # Duplicate dates: the last occurrence wins
+            _, last = np.unique(arrays["date"][::-1], return_index=True)
+            order = (len(arrays["date"]) - 1 - last)
+        arrays = {column: values[order] for column, values in arrays.items()}
+
+        ticker_dir = self._ticker_dir(ticker)
+        os.makedirs(ticker_dir, exist_ok=True)
+        previous = self._current(ticker)
+        name = f"gen-{int(os.path.basename(previous).split('-')[1]) + 1 if previous else 1}"
+        generation = os.path.join(ticker_dir, name)
+        shutil.rmtree(generation, ignore_errors=True)
+        os.makedirs(generation)
+
+        for column in COLUMNS:
+            with open(self._column_path(generation, column), "wb") as f:
+                f.write(arrays[column].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        pointer = os.path.join(ticker_dir, "CURRENT.tmp")
+        with open(pointer, "w") as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer, os.path.join(ticker_dir, "CURRENT"))
+
+        # Keep the generation just replaced for readers that resolved CURRENT before the swap
+        keep = {name, os.path.basename(previous) if previous else None}
+        for entry in os.listdir(ticker_dir):
+            if entry.startswith("gen-") and entry not in keep:
+                shutil.rmtree(os.path.join(ticker_dir, entry), ignore_errors=True)
+
+    @staticmethod
+    def _normalize(bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Coerce input columns to the on-disk dtypes; dates may be datetime64, date objects or strings"""
+        dates = np.asarray(bars["date"])
+        if dates.dtype.kind != "i":
+            dates = dates.astype("datetime64[D]").astype("<i8")
+        arrays = {"date": dates.astype(COLUMNS["date"])}
+        for column, dtype in COLUMNS.items():
+            if column != "date":
+                arrays[column] = np.asarray(bars[column]).astype(dtype)
+        return arrays
+
+
+# Memory-mapped mirror of the daily_bars table, maintained by PriceHistoryService
+bar_store = ColumnarBarStore(settings.PRICE_STORE_DIR)
@@ -12,8 +12,108 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
 
+    # Market Data
+    QUOTE_FETCH_CONCURRENCY: int = 8
+    # Use REALTIME_BULK_QUOTES (premium keys) before per-ticker GLOBAL_QUOTE calls
+    ALPHA_VANTAGE_BULK_QUOTES: bool = True
+    BULK_QUOTE_BATCH_SIZE: int = 100
+
+    # Quote/bars/intraday/search/overview providers in priority order; yfinance needs the
+    # package installed and alpaca an ALPACA_API_KEY, otherwise they are skipped
+    MARKET_DATA_PROVIDERS: str = "alpha_vantage,yfinance,alpaca"
+    # Fire the next provider if the current one hasn't answered within this budget (0 disables hedging)
+    MARKET_DATA_HEDGE_DELAY_MS: int = 1500
+    MARKET_DATA_TIMEOUT: float = 10.0
+    MARKET_DATA_WORKERS: int = 16
+    ALPACA_DATA_URL: str = "https://data.alpaca.markets/v2"
+    ALPACA_DATA_FEED: str = "iex"
+
+    # Per-upstream circuit breakers: consecutive failures that open one, seconds before a half-open probe
+    CIRCUIT_BREAKER_FAILURES: int = 5
+    CIRCUIT_BREAKER_RESET_TIMEOUT: int = 30
+    # Time budget (seconds) a request's upstream calls share; what isn't fetched by then falls back
+    REQUEST_DEADLINE: float = 8.0
+
+    # Upstream rate limits in requests per minute (0 disables limiting)
+    ALPHA_VANTAGE_RATE_LIMIT: int = 5
+    YFINANCE_RATE_LIMIT: int = 60
+    ALPACA_RATE_LIMIT: int = 200
+    FRED_RATE_LIMIT: int = 120
+    NEWS_API_RATE_LIMIT: int = 30
+    # Longest a caller queues for a token before giving up
+    RATE_LIMIT_MAX_WAIT: float = 15.0
+    # "memory" (per process) or "sqlite" (shared by all workers via RATE_LIMIT_SQLITE_PATH)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = "./rate_limits.db"
+
+    # In-process cache: total entry bound and per-namespace TTLs in seconds
+    CACHE_MAX_ENTRIES: int = 5000
+    CACHE_TTL_QUOTE: int = 60
+    CACHE_TTL_CHART: int = 900
+    CACHE_TTL_INTRADAY: int = 60
+    CACHE_TTL_COMPANY: int = 86400
+    CACHE_TTL_FRED: int = 3600
+    CACHE_TTL_NEWS: int = 300
+    CACHE_TTL_INDICATORS: int = 7 * 86400  # streaming indicator checkpoints, advanced as new bars arrive
+    CACHE_TTL_SEARCH_MISS: int = 600  # symbol searches the providers had no match for
+    # How long past its TTL an entry may still be served while it refreshes (stale-while-revalidate)
+    CACHE_STALE_GRACE_QUOTE: int = 300
+    CACHE_STALE_GRACE_CHART: int = 3600
+    # An expired 1min intraday base is kept this long so a compact tail can extend it instead of a full download
+    CACHE_STALE_GRACE_INTRADAY: int = 21600
+    STOCK_CACHE_STALE_GRACE: int = 3600
+    BACKGROUND_REFRESH_WORKERS: int = 4
+    # Quote and fundamentals cache rows are committed in batches off the request path, every interval or at this many pending rows
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 2.0
+    WRITE_BEHIND_MAX_PENDING: int = 500
+
+    # Hot-symbol quote refresh: watchlists, positions, indices and recently requested tickers
+    QUOTE_REFRESH_ENABLED: bool = True
+    QUOTE_REFRESH_INTERVAL: int = 30  # seconds between refresh cycles
+    QUOTE_REFRESH_BUDGET_SHARE: float = 0.5  # share of the Alpha Vantage rate limit it may use
+    QUOTE_REFRESH_RECENT_WINDOW: int = 1800  # seconds a requested ticker stays hot
+    QUOTE_REFRESH_ACCESS_HALF_LIFE: int = 600
+
+    # Persistent daily bars: seconds before a ticker's history is checked for new bars
+    PRICE_HISTORY_SYNC_INTERVAL: int = 3600
+    PRICE_STORE_DIR: str = "./price_store"  # memory-mapped columnar copy of the daily bars
+    # Intraday intervals are resampled from one 1min series; "full" covers ~30 days, "compact" 100 bars
+    INTRADAY_BASE_OUTPUTSIZE: str = "full"
+    # Tickers whose streaming indicator state is kept live in process; the rest resume from cached checkpoints
+    INDICATOR_STREAM_MAX_TICKERS: int = 500
+    # Batch technical indicators: most tickers per request, and bars of lookback before the period so EMAs settle
+    TECHNICAL_BATCH_MAX_TICKERS: int = 500
+    INDICATOR_WARMUP_BARS: int = 250
+
+    # Company fundamentals table: missing rows are backfilled, rows older than the max age re-fetched
+    FUNDAMENTALS_REFRESH_ENABLED: bool = True
+    FUNDAMENTALS_REFRESH_INTERVAL: int = 60  # seconds between refresh cycles
+    FUNDAMENTALS_REFRESH_BUDGET_SHARE: float = 0.2  # share of the Alpha Vantage rate limit it may use
+    FUNDAMENTALS_MAX_AGE: int = 86400
+
+    # Local symbol search index, built from an Alpha Vantage LISTING_STATUS file (downloaded if missing or older than the max age)
+    SYMBOL_LISTING_PATH: str = "./symbols/listing_status.csv"
+    SYMBOL_LISTING_MAX_AGE: int = 7 * 86400
+
+    # "synthetic" serves seeded GBM data instead of calling upstream APIs (offline development, load tests)
+    MARKET_DATA_SOURCE: str = "alpha_vantage"
+    SYNTHETIC_SEED: int = 42
+    SYNTHETIC_HISTORY_YEARS: int = 10
+    SYNTHETIC_INTRADAY_DAYS: int = 5
+
+    # Upstream HTTP record/replay: "off", "record" (live calls saved) or "replay" (no network)
+    HTTP_CASSETTE_MODE: str = "off"
+    HTTP_CASSETTE_PATH: str = "./cassettes/upstream.db"
+    # Replay latency = fixed ms + scale x recorded latency + uniform jitter
+    HTTP_REPLAY_LATENCY_MS: float = 0
+    HTTP_REPLAY_LATENCY_SCALE: float = 0
+    HTTP_REPLAY_JITTER_MS: float = 0
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Shared L2 cache across workers; REDIS_URL=fakeredis:// runs an in-process fake
+    REDIS_CACHE_ENABLED: bool = False
+    REDIS_CACHE_NAMESPACES: str = "quote,chart,intraday,company,fred,news,indicators"
 
     # API Configuration
     API_V1_PREFIX: str = "/api/v1"
@@ -0,0 +1,99 @@
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+from app.core.config import settings
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the current request's time budget ran out before an upstream call could start or finish"""
+
+
+class CallCancelled(Exception):
+    """Raised when a call that was abandoned (e.g. a losing hedged request) checks in before spending upstream quota"""
+
+
+# Monotonic time by which the current request must answer; None means unbounded
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+# Set once nobody is waiting for the current call's answer any more
+_cancelled: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar("call_cancelled", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Bound everything called inside the block to `seconds`; nested scopes can only shorten it.
+
+    The deadline lives in a context variable, so it follows the call into
+    asyncio tasks and asyncio.to_thread. Code handing work to other thread
+    pools must carry it over with contextvars.copy_context().
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+
+    current = _deadline.get()
+    new = time.monotonic() + seconds
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def with_deadline(seconds: Optional[float] = None) -> Callable:
+    """Route decorator running the endpoint inside a deadline_scope, REQUEST_DEADLINE by default"""
+    def decorator(endpoint: Callable) -> Callable:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            with deadline_scope(settings.REQUEST_DEADLINE if seconds is None else seconds):
+                return endpoint(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget (never negative), or None if there is no deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def bounded(timeout: Optional[float]) -> Optional[float]:
+    """A timeout clipped to the remaining budget; raises if the budget is already spent"""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return left if timeout is None else min(timeout, left)
+
+
+@contextmanager
+def cancel_scope(event: threading.Event):
+    """Let code inside the block give up before its next upstream request once `event` is set"""
+    token = _cancelled.set(event)
+    try:
+        yield
+    finally:
+        _cancelled.reset(token)
+
+
+def cancel_event() -> Optional[threading.Event]:
+    """The current call's cancel event, if it runs inside a cancel_scope"""
+    return _cancelled.get()
+
+
+def check_cancelled():
+    """Raise CallCancelled if the current call was abandoned"""
+    event = _cancelled.get()
+    if event is not None and event.is_set():
+        raise CallCancelled("Call abandoned before reaching upstream")
@@ -0,0 +1,227 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from app.core import deadline
+from app.core.config import settings
+
+
+class RateLimitExceeded(Exception):
+    """Raised when no upstream token became available within the caller's wait budget"""
+
+
+class TokenBucket:
+    """Token bucket with FIFO queueing of waiting callers.
+
+    Tokens refill continuously at ``rate_per_minute`` up to ``burst``. Callers
+    queue in arrival order and only the head of the queue may take a token, so
+    a burst of requests is served fairly instead of racing each other.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = float(burst or max(1, int(rate_per_minute)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self.granted = 0
+        self.rejected = 0
+
+    def _take(self) -> float:
+        """Consume a token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _set_tokens(self, tokens: float):
+        self._tokens = tokens
+        self._updated = time.monotonic()
+
+    def acquire(self, timeout: Optional[float] = None, cancelled: Optional[threading.Event] = None) -> bool:
+        """Wait in line for a token; returns False if none arrives within timeout or `cancelled` gets set"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waiter = object()
+
+        with self._cond:
+            self._queue.append(waiter)
+            try:
+                while True:
+                    # Checked before every take, so an abandoned caller never spends a token
+                    if cancelled is not None and cancelled.is_set():
+                        return False
+                    wait = None
+                    if self._queue[0] is waiter:
+                        wait = self._take()
+                        if wait == 0:
+                            self.granted += 1
+                            return True
+
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected += 1
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(waiter)
+                self._cond.notify_all()
+
+    def drain(self):
+        """Empty the bucket, e.g. after the upstream reports its quota is exhausted"""
+        with self._cond:
+            self._set_tokens(0.0)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "rate_per_minute": round(self.rate * 60, 2),
+                "burst": self.capacity,
+                "waiting": len(self._queue),
+                "granted": self.granted,
+                "rejected": self.rejected
+            }
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """Token bucket whose token count lives in SQLite, shared by all worker processes.
+
+    Callers within a process still queue FIFO on the in-memory condition; the
+    refill-and-take step runs in an IMMEDIATE transaction so processes never
+    hand out the same token twice.
+    """
+
+    def __init__(self, path: str, key: str, rate_per_minute: float, burst: Optional[int] = None):
+        super().__init__(rate_per_minute, burst)
+        self.path = path
+        self.key = key
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, self.capacity, time.time())
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _take(self) -> float:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            tokens, updated_at = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (self.key,)
+            ).fetchone()
+
+            now = time.time()
+            tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+
+            conn.execute(
+                "UPDATE rate_limit_buckets SET tokens = ?, updated_at = ? WHERE key = ?",
+                (tokens, now, self.key)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            # BEGIN IMMEDIATE itself fails when the lock wait times out; there is nothing to roll back then
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _set_tokens(self, tokens: float):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE rate_limit_buckets SET tokens = ?, updated_at = ? WHERE key = ?",
+                (tokens, time.time(), self.key)
+            )
+        finally:
+            conn.close()
+
+
+class RateLimiterRegistry:
+    """Per-upstream token buckets shared by every service instance"""
+
+    # Upstream key -> requests-per-minute setting
+    RATE_SETTINGS = {
+        "alpha_vantage": "ALPHA_VANTAGE_RATE_LIMIT",
+        "yfinance": "YFINANCE_RATE_LIMIT",
+        "alpaca": "ALPACA_RATE_LIMIT",
+        "fred": "FRED_RATE_LIMIT",
+        "newsapi": "NEWS_API_RATE_LIMIT",
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+
+    def get(self, key: str) -> Optional[TokenBucket]:
+        """Bucket for an upstream, or None if that upstream is not rate limited"""
+        with self._lock:
+            if key not in self._buckets:
+                rate = getattr(settings, self.RATE_SETTINGS.get(key, ""), 0)
+                self._buckets[key] = self._create(key, rate) if rate > 0 else None
+            return self._buckets[key]
+
+    def configure(self, key: str, rate_per_minute: float, burst: Optional[int] = None):
+        """Override the bucket for an upstream; a rate of 0 disables limiting"""
+        with self._lock:
+            self._buckets[key] = self._create(key, rate_per_minute, burst) if rate_per_minute > 0 else None
+
+    def _create(self, key: str, rate_per_minute: float, burst: Optional[int] = None) -> TokenBucket:
+        if settings.RATE_LIMIT_BACKEND == "sqlite":
+            return SQLiteTokenBucket(settings.RATE_LIMIT_SQLITE_PATH, key, rate_per_minute, burst)
+        return TokenBucket(rate_per_minute, burst)
+
+    def acquire(self, key: str, timeout: Optional[float] = None):
+        """Wait for a token for an upstream call; raises RateLimitExceeded on timeout.
+
+        The wait never outlasts the current request deadline, and a call
+        cancelled meanwhile raises CallCancelled without taking a token.
+        """
+        deadline.check_cancelled()
+        bucket = self.get(key)
+        if bucket is None:
+            return
+        if timeout is None:
+            timeout = settings.RATE_LIMIT_MAX_WAIT
+        timeout = deadline.bounded(timeout)
+        if not bucket.acquire(timeout, deadline.cancel_event()):
+            deadline.check_cancelled()
+            raise RateLimitExceeded(f"{key} rate limit: no request budget within {timeout}s")
+
+    def drain(self, key: str):
+        """Mark an upstream's quota as exhausted until tokens refill"""
+        bucket = self.get(key)
+        if bucket is not None:
+            bucket.drain()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {key: bucket.stats() for key, bucket in buckets.items() if bucket is not None}
+
+
+# Shared across all services in this process (and across processes with the sqlite backend)
+rate_limiter = RateLimiterRegistry()
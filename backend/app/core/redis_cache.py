@@ -0,0 +1,122 @@
+import uuid
+from typing import Any, Callable, Hashable, Optional, Tuple
+import msgpack
+import numpy as np
+from pydantic import BaseModel
+from app.models.schemas import ChartData, Quote
+from app.services.av_series import PriceSeries
+
+# Pydantic models that may be stored in the shared tier, by name
+_MODELS = {model.__name__: model for model in (Quote, ChartData)}
+_MODEL_TAG = "__model__"
+_SERIES_TAG = "__series__"
+
+
+def encode_value(value: Any) -> bytes:
+    """Pack a cache value (plain data, a known pydantic model or a PriceSeries) as msgpack"""
+    def default(obj):
+        if isinstance(obj, BaseModel) and type(obj).__name__ in _MODELS:
+            return {_MODEL_TAG: type(obj).__name__, "fields": obj.model_dump()}
+        if isinstance(obj, PriceSeries):
+            columns = {name: getattr(obj, name) for name in PriceSeries.__slots__}
+            return {_SERIES_TAG: {name: [values.dtype.str, values.tobytes()] for name, values in columns.items()}}
+        if hasattr(obj, "isoformat"):
+            return obj.isoformat()
+        raise TypeError(f"Cannot encode {type(obj).__name__} for the shared cache")
+
+    return msgpack.packb(value, default=default, use_bin_type=True)
+
+
+def decode_value(payload: bytes) -> Any:
+    """Inverse of encode_value"""
+    def object_hook(obj):
+        if _SERIES_TAG in obj:
+            columns = obj[_SERIES_TAG]
+            return PriceSeries(*(
+                np.frombuffer(columns[name][1], dtype=columns[name][0]) for name in PriceSeries.__slots__
+            ))
+        model = _MODELS.get(obj.get(_MODEL_TAG)) if _MODEL_TAG in obj else None
+        return model(**obj["fields"]) if model else obj
+
+    return msgpack.unpackb(payload, object_hook=object_hook, raw=False)
+
+
+def _key_part(key: Hashable) -> str:
+    return ":".join(str(part) for part in key) if isinstance(key, tuple) else str(key)
+
+
+class RedisCacheTier:
+    """Shared L2 cache tier in Redis.
+
+    Values are stored msgpack-encoded with a Redis TTL. Every write or delete
+    is announced on a pub/sub channel so other processes drop their L1 copy
+    and pick up the new value from Redis on their next read.
+    """
+
+    CHANNEL = "hedgeedge:cache:invalidate"
+
+    def __init__(self, client, prefix: str = "hedgeedge:cache"):
+        self.client = client
+        self.prefix = prefix
+        # Lets the listener skip invalidations this process sent itself
+        self.instance_id = uuid.uuid4().hex
+        self._listener = None
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheTier":
+        """Connect to redis:// URLs, or an in-process fake for fakeredis:// (offline tests)"""
+        if url.startswith("fakeredis://"):
+            import fakeredis
+            return cls(fakeredis.FakeRedis())
+
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+
+    def _redis_key(self, namespace: str, key: Hashable) -> str:
+        return f"{self.prefix}:{namespace}:{_key_part(key)}"
+
+    def get(self, namespace: str, key: Hashable) -> Tuple[bool, Any, Optional[float]]:
+        """Return (found, value, remaining ttl in seconds)"""
+        pipe = self.client.pipeline()
+        redis_key = self._redis_key(namespace, key)
+        pipe.get(redis_key)
+        pipe.pttl(redis_key)
+        payload, pttl = pipe.execute()
+
+        if payload is None:
+            return False, None, None
+        return True, decode_value(payload), (pttl / 1000 if pttl and pttl > 0 else None)
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: float):
+        self.client.set(self._redis_key(namespace, key), encode_value(value), px=max(1, int(ttl * 1000)))
+        self._publish(namespace, key)
+
+    def delete(self, namespace: str, key: Hashable):
+        self.client.delete(self._redis_key(namespace, key))
+        self._publish(namespace, key)
+
+    def _publish(self, namespace: str, key: Hashable):
+        message = {"origin": self.instance_id, "namespace": namespace, "key": key}
+        self.client.publish(self.CHANNEL, msgpack.packb(message, use_bin_type=True))
+
+    def listen(self, on_invalidate: Callable[[str, Hashable], None]):
+        """Start a background thread that calls on_invalidate for other processes' writes"""
+        def handler(message):
+            try:
+                data = msgpack.unpackb(message["data"], raw=False)
+            except Exception as e:
+                print(f"Ignoring malformed cache invalidation: {e}")
+                return
+            if data.get("origin") == self.instance_id:
+                return
+            key = data.get("key")
+            on_invalidate(data.get("namespace"), tuple(key) if isinstance(key, list) else key)
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.CHANNEL: handler})
+        self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
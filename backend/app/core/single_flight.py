@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+from app.core import deadline
+
+
+class _Call:
+    """An in-flight call that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical upstream calls into a single execution.
+
+    Keys are tuples of (function, symbol, params). While a call for a key is
+    in flight, every other caller with the same key blocks until it finishes
+    and receives the same result (or exception) instead of firing its own
+    request. Nothing is cached once the call completes. Waiters give up with
+    DeadlineExceeded when their own request deadline runs out first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def do(self, key: tuple, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the identical call already in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            counters = self._counters.setdefault(str(key[0]), {"executed": 0, "coalesced": 0})
+            counters["executed" if leader else "coalesced"] += 1
+
+        if not leader:
+            if not call.done.wait(deadline.remaining()):
+                raise deadline.DeadlineExceeded(f"Request deadline exceeded waiting for {key[0]}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result
+
+    def stats(self) -> Dict:
+        """Executed/coalesced counters, overall and per function"""
+        with self._lock:
+            by_function = {name: dict(counts) for name, counts in self._counters.items()}
+            in_flight = len(self._calls)
+
+        return {
+            "executed": sum(c["executed"] for c in by_function.values()),
+            "coalesced": sum(c["coalesced"] for c in by_function.values()),
+            "in_flight": in_flight,
+            "by_function": by_function
+        }
+
+
+# Shared by every service so identical calls coalesce across instances
+single_flight = SingleFlight()
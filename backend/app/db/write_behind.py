@@ -0,0 +1,175 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.base import SessionLocal
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE; others fall back to ORM merges
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Bound parameters per upsert statement, under SQLite's default limit of 32766
+MAX_UPSERT_PARAMS = 30000
+
+Writer = Callable[[Session, List[Dict]], None]
+
+
+def upsert_rows(db: Session, model, rows: List[Dict], key: Union[str, Sequence[str]], columns: Iterable[str]):
+    """Insert rows, or update only `columns` of rows whose `key` (a column or primary-key tuple) already exists"""
+    keys = [key] if isinstance(key, str) else list(key)
+    columns = list(columns)
+    if not rows:
+        return
+    insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        for values in rows:
+            identity = tuple(values[k] for k in keys)
+            row = db.get(model, identity if len(keys) > 1 else identity[0])
+            if row is None:
+                row = model(**{k: values[k] for k in keys})
+                db.add(row)
+            for column in columns:
+                setattr(row, column, values[column])
+        return
+
+    # Long histories go in several statements rather than one over the parameter limit
+    chunk = max(1, MAX_UPSERT_PARAMS // len(rows[0]))
+    for offset in range(0, len(rows), chunk):
+        stmt = insert(model).values(rows[offset:offset + chunk])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: stmt.excluded[column] for column in columns}
+        ))
+
+
+class WriteBehindQueue:
+    """Collects cache-style table writes off the request path and commits them in batches.
+
+    Writes are queued by kind and key; a later write to the same key
+    replaces the pending one, so a hot ticker costs one row per flush no
+    matter how often it was refreshed. A background thread flushes every
+    ``flush_interval`` seconds, or as soon as ``max_pending`` writes are
+    queued, with one transaction per kind. A failed batch is logged and
+    dropped, so only data that can be fetched again belongs here (quote
+    and fundamentals caches); anything that cannot be recreated, such as
+    portfolio snapshots, is written synchronously instead.
+    """
+
+    def __init__(self, max_pending: int, flush_interval: float):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._writers: Dict[str, Writer] = {}
+        self._pending: Dict[str, Dict[Hashable, Dict]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.queued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed = 0
+        self.last_flush: Optional[Dict] = None
+
+    def register(self, kind: str, writer: Writer):
+        """Set the function that writes a batch of `kind` rows inside an open session; kinds flush in registration order"""
+        with self._lock:
+            self._writers[kind] = writer
+            self._pending.setdefault(kind, {})
+
+    def put(self, kind: str, key: Hashable, values: Dict):
+        """Queue a write; returns immediately, merging into any pending write for the same key"""
+        with self._lock:
+            pending = self._pending[kind]
+            if key in pending:
+                pending[key] = {**pending[key], **values}
+                self.coalesced += 1
+            else:
+                pending[key] = values
+            self.queued += 1
+            size = sum(len(rows) for rows in self._pending.values())
+
+        self.start()
+        if size >= self.max_pending:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(rows) for rows in self._pending.values())
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns how many rows were committed"""
+        with self._flush_lock:
+            with self._lock:
+                batches = [(kind, list(rows.values())) for kind, rows in self._pending.items() if rows]
+                for kind, _ in batches:
+                    self._pending[kind] = {}
+
+            if not batches:
+                return 0
+
+            start = time.monotonic()
+            written = 0
+            db = SessionLocal()
+            try:
+                for kind, rows in batches:
+                    try:
+                        self._writers[kind](db, rows)
+                        db.commit()
+                        written += len(rows)
+                    except Exception as e:
+                        print(f"Error writing {len(rows)} queued {kind} rows: {e}")
+                        db.rollback()
+                        self.failed += len(rows)
+            finally:
+                db.close()
+
+            self.flushes += 1
+            self.written += written
+            self.last_flush = {"at": time.time(), "rows": written, "ms": round((time.monotonic() - start) * 1000, 1)}
+            return written
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write whatever is still queued"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Write-behind flush failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "pending": self.pending(),
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush": self.last_flush
+        }
+
+
+write_behind = WriteBehindQueue(settings.WRITE_BEHIND_MAX_PENDING, settings.WRITE_BEHIND_FLUSH_INTERVAL)
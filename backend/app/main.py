@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.background import background_refresher
+from app.core.cache import cache, configure_shared_tier
 from app.core.config import settings
 from app.db.base import Base, engine
-from app.api.v1 import market, portfolio, watchlist, macro, screener, news, analysis
+from app.db.write_behind import write_behind
+from app.services.fundamentals import fundamentals_refresh_scheduler
+from app.services.market_data import market_data
+from app.services.quote_refresh import quote_refresh_scheduler
+from app.services.symbol_index import symbol_index
+from app.api.v1 import market, portfolio, watchlist, macro, screener, news, analysis, system
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -29,6 +36,27 @@ app.include_router(macro.router, prefix=f"{settings.API_V1_PREFIX}/macro", tags=
 app.include_router(screener.router, prefix=f"{settings.API_V1_PREFIX}/screener", tags=["screener"])
 app.include_router(news.router, prefix=f"{settings.API_V1_PREFIX}/news", tags=["news"])
 app.include_router(analysis.router, prefix=f"{settings.API_V1_PREFIX}/analysis", tags=["analysis"])
+app.include_router(system.router, prefix=f"{settings.API_V1_PREFIX}/system", tags=["system"])
+
+
+@app.on_event("startup")
+def startup():
+    configure_shared_tier()
+    symbol_index.ensure_loaded()
+    if settings.QUOTE_REFRESH_ENABLED:
+        quote_refresh_scheduler.start()
+    if settings.FUNDAMENTALS_REFRESH_ENABLED:
+        fundamentals_refresh_scheduler.start()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    quote_refresh_scheduler.stop()
+    fundamentals_refresh_scheduler.stop()
+    background_refresher.shutdown()
+    market_data.shutdown()
+    write_behind.stop()
+    cache.detach_l2()
 
 
 @app.get("/")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, BigInteger, Numeric
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, BigInteger, Numeric, Text, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -93,6 +93,50 @@ class StockCache(Base):
     updated_at = Column(DateTime, default=datetime.utcnow)
 
 
+class Fundamentals(Base):
+    __tablename__ = "fundamentals"
+
+    ticker = Column(String(10), primary_key=True)
+    name = Column(String(255))
+    description = Column(Text)
+    sector = Column(String(100))
+    industry = Column(String(255))
+    exchange = Column(String(50))
+    country = Column(String(100))
+    market_cap = Column(BigInteger)
+    pe_ratio = Column(Numeric(10, 2))
+    peg_ratio = Column(Numeric(10, 2))
+    dividend_yield = Column(Numeric(10, 4))
+    eps = Column(Numeric(15, 4))
+    beta = Column(Numeric(10, 4))
+    week_52_high = Column(Numeric(15, 4))
+    week_52_low = Column(Numeric(15, 4))
+    ma_50_day = Column(Numeric(15, 4))
+    ma_200_day = Column(Numeric(15, 4))
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DailyBar(Base):
+    __tablename__ = "daily_bars"
+
+    ticker = Column(String(10), primary_key=True)
+    date = Column(Date, primary_key=True)
+    open = Column(Numeric(15, 4), nullable=False)
+    high = Column(Numeric(15, 4), nullable=False)
+    low = Column(Numeric(15, 4), nullable=False)
+    close = Column(Numeric(15, 4), nullable=False)
+    volume = Column(BigInteger, nullable=False)
+
+
+class PriceHistorySync(Base):
+    __tablename__ = "price_history_sync"
+
+    ticker = Column(String(10), primary_key=True)
+    first_date = Column(Date)
+    last_date = Column(Date)
+    synced_at = Column(DateTime, default=datetime.utcnow)
+
+
 class EconomicIndicator(Base):
     __tablename__ = "economic_indicators"
 
@@ -101,3 +145,11 @@ class EconomicIndicator(Base):
     value = Column(Numeric(15, 4), nullable=False)
     date = Column(Date, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IndicatorCheckpoint(Base):
+    __tablename__ = "indicator_checkpoints"
+
+    ticker = Column(String(10), primary_key=True)
+    state = Column(LargeBinary, nullable=False)  # msgpack-encoded TickerIndicators.checkpoint()
+    updated_at = Column(DateTime, default=datetime.utcnow)
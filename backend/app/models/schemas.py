@@ -124,6 +124,14 @@ class Quote(BaseModel):
     low: Optional[float] = None
     open: Optional[float] = None
     previous_close: Optional[float] = None
+    # Freshness of a cached response; stale quotes are being refreshed in the background
+    stale: bool = False
+    age_seconds: Optional[float] = None
+
+
+class QuoteBatch(BaseModel):
+    quotes: List[Quote]
+    errors: Dict[str, str] = {}
 
 
 class MarketIndex(BaseModel):
@@ -149,6 +157,8 @@ class ChartData(BaseModel):
     low: List[float]
     close: List[float]
     volume: List[int]
+    stale: bool = False
+    age_seconds: Optional[float] = None
 
 
 # Portfolio Performance Schemas
@@ -1,20 +1,61 @@
-import requests
+import orjson
 from typing import Optional, Dict, List
 from datetime import datetime, timedelta
+from app.core.cache import cache
+from app.core import deadline
+from app.core.cassette import http_session
+from app.core.circuit_breaker import circuit_breakers
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.single_flight import single_flight
+from app.services.av_series import PriceSeries, interval_minutes, parse_time_series, resample_ohlcv
 
 
 class AlphaVantageClient:
     """Client for Alpha Vantage API"""
 
     BASE_URL = "https://www.alphavantage.co/query"
+    # REALTIME_BULK_QUOTES accepts at most 100 symbols per request
+    BULK_QUOTE_MAX_SYMBOLS = 100
 
-    def __init__(self):
+    def __init__(self, raise_errors: bool = False):
         self.api_key = settings.ALPHA_VANTAGE_API_KEY
-        self.session = requests.Session()
+        self.session = http_session()
+        # Propagate request errors instead of returning None, so callers can tell failures from missing data
+        self.raise_errors = raise_errors
+        self.bulk_batch_size = min(settings.BULK_QUOTE_BATCH_SIZE, self.BULK_QUOTE_MAX_SYMBOLS)
+
+    @staticmethod
+    def is_throttled(data: Dict) -> bool:
+        """True if a response is Alpha Vantage's rate-limit notice rather than data"""
+        notice = data.get("Note") or data.get("Information") or ""
+        return "frequency" in notice or "rate limit" in notice.lower()
+
+    def _request(self, params: Dict, timeout: float = 10):
+        """GET the Alpha Vantage API within the shared rate limit, circuit breaker and request deadline"""
+        with circuit_breakers.guard("alpha_vantage"):
+            rate_limiter.acquire("alpha_vantage")
+            response = self.session.get(self.BASE_URL, params=params, timeout=deadline.bounded(timeout))
+            response.raise_for_status()
+        return response
+
+    def _get(self, params: Dict) -> Dict:
+        data = orjson.loads(self._request(params).content)
+
+        if self.is_throttled(data):
+            # The quota tripped anyway (another client on the same key); stop spending tokens
+            rate_limiter.drain("alpha_vantage")
+        return data
 
     def get_quote(self, ticker: str) -> Optional[Dict]:
         """Get real-time quote for a ticker"""
+        return single_flight.do(
+            ("alpha_vantage.quote", ticker, ()),
+            lambda: self._fetch_quote(ticker)
+        )
+
+    def _fetch_quote(self, ticker: str) -> Optional[Dict]:
+        """Fetch a quote from Alpha Vantage"""
         try:
             params = {
                 "function": "GLOBAL_QUOTE",
@@ -22,9 +63,7 @@ class AlphaVantageClient:
                 "apikey": self.api_key
             }
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(params)
 
             if "Global Quote" not in data or not data["Global Quote"]:
                 return None
@@ -44,11 +83,81 @@ class AlphaVantageClient:
                 "updated_at": datetime.utcnow()
             }
         except Exception as e:
+            if self.raise_errors:
+                raise
             print(f"Error fetching quote for {ticker}: {e}")
             return None
 
-    def get_historical_prices(self, ticker: str, interval: str = "daily") -> List[Dict]:
-        """Get historical price data"""
+    def bulk_quote_batches(self, tickers: List[str]) -> List[List[str]]:
+        """Split tickers into chunks that fit in one bulk quote request"""
+        unique = list(dict.fromkeys(tickers))
+        size = max(self.bulk_batch_size, 1)
+        return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+    def bulk_quote_params(self, tickers: List[str]) -> Dict:
+        """Request parameters for one REALTIME_BULK_QUOTES call"""
+        return {
+            "function": "REALTIME_BULK_QUOTES",
+            "symbol": ",".join(tickers),
+            "apikey": self.api_key
+        }
+
+    def parse_bulk_quotes(self, data: Dict) -> Dict[str, Dict]:
+        """Parse a REALTIME_BULK_QUOTES response into quote dicts keyed by ticker.
+
+        Symbols the upstream could not price are simply absent from the result,
+        as is everything when the key lacks bulk quote entitlement.
+        """
+        quotes = {}
+        for row in data.get("data") or []:
+            ticker = row.get("symbol")
+            if not ticker or not row.get("close"):
+                continue
+
+            try:
+                price = float(row["close"])
+                previous_close = float(row.get("previous_close") or price)
+                quotes[ticker] = {
+                    "ticker": ticker,
+                    "price": price,
+                    "change": float(row.get("change") or price - previous_close),
+                    "change_percent": float(str(row.get("change_percent") or 0).strip("%")),
+                    "volume": int(float(row["volume"])) if row.get("volume") else 0,
+                    "high": float(row["high"]) if row.get("high") else None,
+                    "low": float(row["low"]) if row.get("low") else None,
+                    "open": float(row["open"]) if row.get("open") else None,
+                    "previous_close": previous_close,
+                    "updated_at": datetime.utcnow()
+                }
+            except (TypeError, ValueError) as e:
+                print(f"Skipping malformed bulk quote for {ticker}: {e}")
+
+        return quotes
+
+    def get_bulk_quotes(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Get quotes for many tickers using batched REALTIME_BULK_QUOTES calls"""
+        quotes = {}
+        for batch in self.bulk_quote_batches(tickers):
+            try:
+                quotes.update(self.parse_bulk_quotes(self._get(self.bulk_quote_params(batch))))
+            except Exception as e:
+                print(f"Error fetching bulk quotes for {len(batch)} tickers: {e}")
+        return quotes
+
+    def get_historical_prices(self, ticker: str, interval: str = "daily", outputsize: str = "full") -> List[Dict]:
+        """Get historical price data; outputsize 'compact' returns only the latest 100 bars"""
+        series = self.get_price_series(ticker, interval, outputsize)
+        return self._series_rows(series, "date") if series else []
+
+    def get_price_series(self, ticker: str, interval: str = "daily", outputsize: str = "full") -> Optional[PriceSeries]:
+        """Get daily/weekly/monthly bars as NumPy columns"""
+        return single_flight.do(
+            ("alpha_vantage.historical", ticker, (interval, outputsize)),
+            lambda: self._fetch_price_series(ticker, interval, outputsize)
+        )
+
+    def _fetch_price_series(self, ticker: str, interval: str = "daily", outputsize: str = "full") -> Optional[PriceSeries]:
+        """Fetch historical prices from Alpha Vantage"""
         try:
             function_map = {
                 "daily": "TIME_SERIES_DAILY",
@@ -59,71 +168,91 @@ class AlphaVantageClient:
             params = {
                 "function": function_map.get(interval, "TIME_SERIES_DAILY"),
                 "symbol": ticker,
-                "outputsize": "full",
+                "outputsize": outputsize,
                 "apikey": self.api_key
             }
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            # Parse time series data
-            time_series_key = f"Time Series ({interval.capitalize()})" if interval == "daily" else f"{interval.capitalize()} Time Series"
-
-            if time_series_key not in data:
-                return []
-
-            prices = []
-            for date_str, values in data[time_series_key].items():
-                prices.append({
-                    "date": datetime.strptime(date_str, "%Y-%m-%d"),
-                    "open": float(values["1. open"]),
-                    "high": float(values["2. high"]),
-                    "low": float(values["3. low"]),
-                    "close": float(values["4. close"]),
-                    "volume": int(values["5. volume"])
-                })
-
-            return sorted(prices, key=lambda x: x["date"])
+            return parse_time_series(self._get(params))
         except Exception as e:
+            if self.raise_errors:
+                raise
             print(f"Error fetching historical prices for {ticker}: {e}")
-            return []
+            return None
 
     def get_intraday_prices(self, ticker: str, interval: str = "60min") -> List[Dict]:
         """Get intraday price data"""
-        try:
-            params = {
-                "function": "TIME_SERIES_INTRADAY",
-                "symbol": ticker,
-                "interval": interval,
-                "apikey": self.api_key,
-                "outputsize": "compact"
-            }
+        series = self.get_intraday_series(ticker, interval)
+        return self._series_rows(series, "datetime") if series else []
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+    def get_intraday_series(self, ticker: str, interval: str = "60min") -> Optional[PriceSeries]:
+        """Intraday bars for any interval, resampled locally from the cached 1min series"""
+        base = self.get_intraday_base(ticker)
+        if base is None:
+            return None
+        minutes = interval_minutes(interval)
+        return base if minutes == 1 else resample_ohlcv(base, minutes)
 
-            time_series_key = f"Time Series ({interval})"
+    def get_intraday_base(self, ticker: str) -> Optional[PriceSeries]:
+        """The 1min series every intraday interval is built from; the only intraday upstream call"""
+        entry = cache.get_entry("intraday", ticker)
+        if entry is not None and not entry.stale:
+            return entry.value
 
-            if time_series_key not in data:
-                return []
+        base = entry.value if entry is not None else None
+        return single_flight.do(
+            ("alpha_vantage.intraday", ticker, ("1min",)),
+            lambda: self._fetch_intraday_base(ticker, base)
+        )
+
+    def _fetch_intraday_base(self, ticker: str, base: Optional[PriceSeries] = None) -> Optional[PriceSeries]:
+        """Fetch 1min intraday prices from Alpha Vantage and cache them.
 
-            prices = []
-            for datetime_str, values in data[time_series_key].items():
-                prices.append({
-                    "datetime": datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S"),
-                    "open": float(values["1. open"]),
-                    "high": float(values["2. high"]),
-                    "low": float(values["3. low"]),
-                    "close": float(values["4. close"]),
-                    "volume": int(values["5. volume"])
-                })
-
-            return sorted(prices, key=lambda x: x["datetime"])
+        An expired base is brought up to date with the compact (latest 100
+        bars) response when that still reaches the base's last bar, keeping
+        the base's time span; the full series is only downloaded when there
+        is no base or the compact tail would leave a gap.
+        """
+        try:
+            if base is not None and settings.INTRADAY_BASE_OUTPUTSIZE == "full":
+                tail = self._fetch_intraday_1min(ticker, "compact")
+                if tail and tail.timestamps[0] <= base.timestamps[-1]:
+                    series = base.extend(tail)
+                    series = series.since(series.timestamps[-1] - (base.timestamps[-1] - base.timestamps[0]))
+                    cache.set("intraday", ticker, series)
+                    return series
+
+            series = self._fetch_intraday_1min(ticker, settings.INTRADAY_BASE_OUTPUTSIZE)
         except Exception as e:
+            if self.raise_errors:
+                raise
             print(f"Error fetching intraday prices for {ticker}: {e}")
-            return []
+            return None
+
+        if series:
+            cache.set("intraday", ticker, series)
+        return series
+
+    def _fetch_intraday_1min(self, ticker: str, outputsize: str) -> Optional[PriceSeries]:
+        params = {
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": ticker,
+            "interval": "1min",
+            "apikey": self.api_key,
+            "outputsize": outputsize
+        }
+        return parse_time_series(self._get(params))
+
+    @staticmethod
+    def _series_rows(series: PriceSeries, time_key: str) -> List[Dict]:
+        """Per-bar dicts with datetime timestamps, for callers that work on lists"""
+        times = series.timestamps.astype("datetime64[us]").tolist()
+        return [
+            {time_key: t, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+            for t, o, h, lo, c, v in zip(
+                times, series.open.tolist(), series.high.tolist(), series.low.tolist(),
+                series.close.tolist(), series.volume.tolist()
+            )
+        ]
 
     def search_symbols(self, keywords: str) -> List[Dict]:
         """Search for stock symbols"""
@@ -134,9 +263,7 @@ class AlphaVantageClient:
                 "apikey": self.api_key
             }
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(params)
 
             if "bestMatches" not in data:
                 return []
@@ -151,11 +278,36 @@ class AlphaVantageClient:
                 for match in data["bestMatches"][:10]
             ]
         except Exception as e:
+            if self.raise_errors:
+                raise
             print(f"Error searching symbols: {e}")
             return []
 
+    def get_listing_status(self) -> Optional[str]:
+        """CSV of every active US listing (symbol, name, exchange, assetType, ...); None on failure"""
+        try:
+            response = self._request({"function": "LISTING_STATUS", "apikey": self.api_key}, timeout=60)
+            text = response.text
+            # Errors and rate-limit notices come back as JSON instead of CSV
+            if not text.startswith("symbol,"):
+                print(f"Unexpected LISTING_STATUS response: {text[:200]}")
+                return None
+            return text
+        except Exception as e:
+            if self.raise_errors:
+                raise
+            print(f"Error fetching listing status: {e}")
+            return None
+
     def get_company_overview(self, ticker: str) -> Optional[Dict]:
         """Get company overview and fundamentals"""
+        return single_flight.do(
+            ("alpha_vantage.overview", ticker, ()),
+            lambda: self._fetch_company_overview(ticker)
+        )
+
+    def _fetch_company_overview(self, ticker: str) -> Optional[Dict]:
+        """Fetch a company overview from Alpha Vantage"""
         try:
             params = {
                 "function": "OVERVIEW",
@@ -163,29 +315,43 @@ class AlphaVantageClient:
                 "apikey": self.api_key
             }
 
-            response = self.session.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(params)
 
             if not data or "Symbol" not in data:
                 return None
 
-            return {
-                "ticker": data.get("Symbol"),
-                "name": data.get("Name"),
-                "description": data.get("Description"),
-                "sector": data.get("Sector"),
-                "industry": data.get("Industry"),
-                "market_cap": int(data.get("MarketCapitalization", 0)),
-                "pe_ratio": float(data.get("PERatio", 0)) if data.get("PERatio") != "None" else None,
-                "peg_ratio": float(data.get("PEGRatio", 0)) if data.get("PEGRatio") != "None" else None,
-                "eps": float(data.get("EPS", 0)) if data.get("EPS") != "None" else None,
-                "revenue": int(data.get("RevenueTTM", 0)) if data.get("RevenueTTM") != "None" else None,
-                "profit_margin": float(data.get("ProfitMargin", 0)) if data.get("ProfitMargin") != "None" else None,
-                "52_week_high": float(data.get("52WeekHigh", 0)),
-                "52_week_low": float(data.get("52WeekLow", 0)),
-                "dividend_yield": float(data.get("DividendYield", 0)) if data.get("DividendYield") != "None" else None
-            }
+            return self.parse_overview(data)
         except Exception as e:
+            if self.raise_errors:
+                raise
             print(f"Error fetching company overview for {ticker}: {e}")
             return None
+
+    @staticmethod
+    def parse_overview(data: Dict) -> Dict:
+        """Company overview dict from an OVERVIEW response; missing or "None" fields become None"""
+        def number(field: str, cast=float):
+            value = data.get(field)
+            if not value or value in ("None", "-"):
+                return None
+            return cast(float(value))
+
+        return {
+            "symbol": data.get("Symbol"),
+            "name": data.get("Name"),
+            "description": data.get("Description"),
+            "sector": data.get("Sector"),
+            "industry": data.get("Industry"),
+            "exchange": data.get("Exchange"),
+            "country": data.get("Country"),
+            "market_cap": number("MarketCapitalization", int),
+            "pe_ratio": number("PERatio"),
+            "peg_ratio": number("PEGRatio"),
+            "dividend_yield": number("DividendYield"),
+            "eps": number("EPS"),
+            "beta": number("Beta"),
+            "52_week_high": number("52WeekHigh"),
+            "52_week_low": number("52WeekLow"),
+            "50_day_ma": number("50DayMovingAverage"),
+            "200_day_ma": number("200DayMovingAverage"),
+        }
@@ -3,6 +3,7 @@ import pandas as pd
 from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.services.fundamentals import fundamentals_store
 from app.services.market_service import market_service
 from app.models.models import Portfolio, Position
 
@@ -30,9 +31,9 @@ class AnalysisService:
             # Fetch historical data for all tickers
             price_data = {}
             for ticker in tickers:
-                chart_data = market_service.get_chart_data(ticker, period)
-                if chart_data and len(chart_data.close) > 0:
-                    price_data[ticker] = chart_data.close
+                closes = self._get_closes(ticker, period)
+                if len(closes) > 0:
+                    price_data[ticker] = closes
 
             if len(price_data) < 2:
                 return {
@@ -176,20 +177,12 @@ class AnalysisService:
             # Sort by contribution
             position_contributions.sort(key=lambda x: x["weighted_return"], reverse=True)
 
-            # Group by sector (simplified - using ticker prefix as proxy)
-            # In production, would use actual sector data
-            sector_map = {
-                "AAPL": "Technology", "MSFT": "Technology", "GOOGL": "Technology",
-                "AMZN": "Technology", "TSLA": "Consumer Cyclical", "META": "Technology",
-                "NVDA": "Technology", "AMD": "Technology", "JPM": "Financial",
-                "BAC": "Financial", "WMT": "Consumer Defensive", "V": "Financial",
-                "MA": "Financial", "DIS": "Communication", "NFLX": "Communication",
-                "PYPL": "Financial"
-            }
+            # Group by sector from the fundamentals table; tickers not fetched yet count as "Other"
+            fundamentals = fundamentals_store.get_many([contrib["ticker"] for contrib in position_contributions])
 
             sector_contributions = {}
             for contrib in position_contributions:
-                sector = sector_map.get(contrib["ticker"], "Other")
+                sector = fundamentals.get(contrib["ticker"], {}).get("sector") or "Other"
                 if sector not in sector_contributions:
                     sector_contributions[sector] = {
                         "sector": sector,
@@ -356,6 +349,16 @@ class AnalysisService:
 
     # Helper methods
 
+    def _get_closes(self, ticker: str, period: str):
+        """Daily closes for a calendar period as a NumPy array, or chart data if the ticker is not stored"""
+        if period not in ('1D', '5D'):
+            series = market_service.get_period_series(ticker, period)
+            if series is not None and len(series) > 0:
+                return series.close
+
+        chart_data = market_service.get_chart_data(ticker, period)
+        return chart_data.close if chart_data else []
+
     def _get_portfolio_returns(
         self,
         positions: List[Position],
@@ -366,10 +369,10 @@ class AnalysisService:
         position_data = {}
 
         for position in positions:
-            chart_data = market_service.get_chart_data(position.ticker, period)
-            if chart_data and len(chart_data.close) > 0:
+            closes = self._get_closes(position.ticker, period)
+            if len(closes) > 0:
                 position_data[position.ticker] = {
-                    "prices": chart_data.close,
+                    "prices": closes,
                     "shares": float(position.shares)
                 }
 
@@ -392,9 +395,9 @@ class AnalysisService:
         portfolio_returns = portfolio_series.pct_change().dropna().tolist()
 
         # Get market returns (S&P 500)
-        market_data = market_service.get_chart_data("^GSPC", period)
-        if market_data and len(market_data.close) > 0:
-            market_series = pd.Series(market_data.close[-min_len:])
+        market_closes = self._get_closes("^GSPC", period)
+        if len(market_closes) > 0:
+            market_series = pd.Series(market_closes[-min_len:])
             market_returns = market_series.pct_change().dropna().tolist()
         else:
             market_returns = [0] * len(portfolio_returns)
@@ -0,0 +1,189 @@
+from itertools import chain
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+import orjson
+
+# Alpha Vantage bar fields are "1. open", "2. high", ... ("5. adjusted close" and others in adjusted series)
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+class PriceSeries:
+    """Time-ordered OHLCV bars as typed NumPy columns.
+
+    ``timestamps`` is datetime64[D] for daily/weekly/monthly series and
+    datetime64[s] for intraday ones; prices are float64, volume int64.
+    """
+
+    __slots__ = ("timestamps", "open", "high", "low", "close", "volume")
+
+    def __init__(self, timestamps, open, high, low, close, volume):
+        self.timestamps = timestamps
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index) -> "PriceSeries":
+        """Slice or mask every column together"""
+        return PriceSeries(*(getattr(self, name)[index] for name in self.__slots__))
+
+    def since(self, start) -> "PriceSeries":
+        """Bars at or after start, found by binary search on the time index"""
+        return self[int(np.searchsorted(self.timestamps, np.datetime64(start), side="left")):]
+
+    def extend(self, newer: "PriceSeries") -> "PriceSeries":
+        """These bars up to where newer starts, then newer's; newer wins where they overlap"""
+        head = self[:int(np.searchsorted(self.timestamps, newer.timestamps[0], side="left"))]
+        return PriceSeries(*(np.concatenate((getattr(head, name), getattr(newer, name))) for name in self.__slots__))
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Columns keyed the way ColumnarBarStore expects"""
+        return {
+            "date": self.timestamps,
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume
+        }
+
+    def labels(self) -> List[str]:
+        """Timestamps formatted as Alpha Vantage keys ("2024-01-02" or "2024-01-02 16:00:00")"""
+        return np.char.replace(np.datetime_as_string(self.timestamps), "T", " ").tolist()
+
+    def to_rows(self, time_key: str = "timestamp", decimals: Optional[int] = None) -> List[Dict]:
+        """Per-bar dicts for JSON payloads; prices optionally rounded"""
+        prices = [getattr(self, name) for name in PRICE_FIELDS]
+        if decimals is not None:
+            prices = [np.round(values, decimals) for values in prices]
+        return [
+            {time_key: label, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+            for label, o, h, lo, c, v in zip(self.labels(), *(p.tolist() for p in prices), self.volume.tolist())
+        ]
+
+
+def _time_series_key(data: Dict) -> Optional[str]:
+    return next((key for key in data if "Time Series" in key), None)
+
+
+def parse_time_series(data: Union[bytes, Dict]) -> Optional[PriceSeries]:
+    """Decode a TIME_SERIES_* response (raw bytes or decoded dict) into a PriceSeries.
+
+    Returns None if the response carries no bars (errors, rate-limit notices).
+    Values are converted in bulk with np.fromiter instead of per-field
+    float()/int() calls and per-bar dicts.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = orjson.loads(data)
+
+    key = _time_series_key(data)
+    bars = data.get(key) if key else None
+    if not bars:
+        return None
+
+    values = list(bars.values())
+    field_names = [field.split(". ", 1)[-1] for field in values[0]]
+    width = len(field_names)
+    if any(len(bar) != width for bar in values):
+        raise ValueError(f"Inconsistent fields in {key}")
+
+    flat = np.fromiter(
+        chain.from_iterable(bar.values() for bar in values),
+        dtype=np.float64,
+        count=len(values) * width
+    ).reshape(len(values), width)
+
+    labels = list(bars)
+    unit = "D" if len(labels[0]) == 10 else "s"
+    timestamps = np.array(labels, dtype=f"datetime64[{unit}]")
+
+    # Alpha Vantage lists newest first
+    order = np.argsort(timestamps, kind="stable")
+    flat = flat[order]
+
+    def column(name: str) -> np.ndarray:
+        return np.ascontiguousarray(flat[:, field_names.index(name)])
+
+    return PriceSeries(
+        timestamps[order],
+        column("open"),
+        column("high"),
+        column("low"),
+        column("close"),
+        column("volume").astype(np.int64)
+    )
+
+
+def align_panel(series: List[PriceSeries], fields=PRICE_FIELDS) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Align several series on the union of their timestamps.
+
+    Returns the shared time index and, per field, a (time x series) float64
+    array with NaN where a series has no bar.
+    """
+    if not series:
+        return np.array([], dtype="datetime64[D]"), {name: np.empty((0, 0)) for name in fields}
+
+    stamps = np.concatenate([s.timestamps for s in series])
+    ticks = stamps.view(np.int64)
+    low = int(ticks.min()) if len(ticks) else 0
+    span = int(ticks.max()) - low + 1 if len(ticks) else 0
+    if span <= len(ticks):
+        # Daily bars cover a calendar span not much longer than one series: mark the days present and
+        # number them, instead of sorting every bar of every series
+        present = np.zeros(span, dtype=bool)
+        present[ticks - low] = True
+        index = (np.flatnonzero(present) + low).view(stamps.dtype)
+        rows = (np.cumsum(present) - 1)[ticks - low]
+    else:
+        index, rows = np.unique(stamps, return_inverse=True)
+
+    # Every bar's cell in the flattened (time x series) array, filled with one scatter per field
+    cells = rows * len(series) + np.repeat(np.arange(len(series)), [len(s) for s in series])
+    panel = {}
+    for name in fields:
+        values = np.full((len(index), len(series)), np.nan)
+        values.reshape(-1)[cells] = np.concatenate([getattr(s, name) for s in series])
+        panel[name] = values
+    return index, panel
+
+
+def interval_minutes(interval: str) -> int:
+    """Minutes per bar for an Alpha Vantage intraday interval like "15min" """
+    return int(interval.replace("min", ""))
+
+
+def resample_ohlcv(series: PriceSeries, minutes: int, anchor: int = 0) -> PriceSeries:
+    """Aggregate intraday bars into `minutes`-wide bars labelled by their start time.
+
+    Buckets start every `minutes` from `anchor` minutes past midnight (0 aligns
+    to the clock like Alpha Vantage; 570 would align to a 09:30 open) and
+    never span two trading days, so a session's last partial bucket is not
+    merged with the next session's first bars. Bars are aggregated with
+    reduceat over contiguous runs: first open, max high, min low, last
+    close, summed volume.
+    """
+    if not len(series):
+        return series
+
+    stamps = series.timestamps.astype("datetime64[m]").astype(np.int64)
+    day, minute_of_day = np.divmod(stamps, 1440)
+    bucket = (minute_of_day - anchor) // minutes
+
+    # Input is time ordered, so each (day, bucket) pair is one contiguous run
+    key = day * 4096 + (bucket + 2048)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(key)) + 1))
+    ends = np.concatenate((starts[1:], [len(key)])) - 1
+
+    bucket_start = day[starts] * 1440 + anchor + bucket[starts] * minutes
+    return PriceSeries(
+        bucket_start.astype("datetime64[m]").astype(series.timestamps.dtype),
+        series.open[starts],
+        np.maximum.reduceat(series.high, starts),
+        np.minimum.reduceat(series.low, starts),
+        series.close[ends],
+        np.add.reduceat(series.volume, starts)
+    )
@@ -0,0 +1,301 @@
+import os
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set
+import numpy as np
+import orjson
+import pandas as pd
+from app.core import deadline
+from app.core.cassette import http_session
+from app.core.circuit_breaker import circuit_breakers
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.services.alpha_vantage import AlphaVantageClient
+from app.services.av_series import PriceSeries
+
+# Intraday timestamps are exchange-local wall-clock times, as Alpha Vantage reports them
+EXCHANGE_TZ = "America/New_York"
+
+# Capabilities a provider can offer; each is also the name of the provider method serving it
+CAPABILITIES = ("quote", "daily_bars", "intraday", "search", "overview")
+
+
+class MarketDataProvider(ABC):
+    """One upstream source of market data.
+
+    Every provider serves quotes and daily bars. The other capabilities
+    are optional: a provider that lists one in ``capabilities`` implements
+    the method of the same name, and the registry only routes listed
+    capabilities to it. Data comes back in the shapes AlphaVantageClient
+    established: quote dicts (ticker, price, change, ..., updated_at),
+    PriceSeries for daily bars, ``intraday()`` 1min bars for recent
+    sessions (every other interval is resampled from them), ``search()``
+    matches (ticker, name, type, region) and ``overview()`` company dicts.
+    Returning None (or no matches) means the upstream has no data for the
+    request; raising means the provider failed.
+    """
+
+    name = ""
+    capabilities: Set[str] = {"quote", "daily_bars"}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        missing = sorted(capability for capability in cls.capabilities if not callable(getattr(cls, capability, None)))
+        if missing:
+            raise TypeError(f"{cls.__name__} lists capabilities it does not implement: {', '.join(missing)}")
+
+    def available(self) -> bool:
+        """False if the provider cannot be used in this deployment (missing package or credentials)"""
+        return True
+
+    def handles(self, ticker: str) -> bool:
+        """False for symbols the upstream never covers, so they are not routed to it"""
+        return True
+
+    @abstractmethod
+    def quote(self, ticker: str) -> Optional[Dict]:
+        """Latest price and session stats"""
+
+    @abstractmethod
+    def daily_bars(self, ticker: str, outputsize: str = "full") -> Optional[PriceSeries]:
+        """Daily bars; outputsize "compact" needs only the latest ~100 sessions"""
+
+
+class AlphaVantageProvider(MarketDataProvider):
+    name = "alpha_vantage"
+    capabilities = {"quote", "daily_bars", "intraday", "search", "overview"}
+
+    def __init__(self):
+        self.client = AlphaVantageClient(raise_errors=True)
+
+    def handles(self, ticker: str) -> bool:
+        # GLOBAL_QUOTE and the time series functions have no index symbols
+        return not ticker.startswith("^")
+
+    def quote(self, ticker: str) -> Optional[Dict]:
+        return self.client.get_quote(ticker)
+
+    def daily_bars(self, ticker: str, outputsize: str = "full") -> Optional[PriceSeries]:
+        return self.client.get_price_series(ticker, "daily", outputsize)
+
+    def intraday(self, ticker: str) -> Optional[PriceSeries]:
+        return self.client.get_intraday_base(ticker)
+
+    def search(self, query: str) -> List[Dict]:
+        return self.client.search_symbols(query)
+
+    def overview(self, ticker: str) -> Optional[Dict]:
+        return self.client.get_company_overview(ticker)
+
+
+def _exchange_times(stamps, unit: str) -> np.ndarray:
+    """Timezone-aware timestamps as naive exchange-local datetime64 values"""
+    index = pd.DatetimeIndex(stamps)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    return index.tz_convert(EXCHANGE_TZ).tz_localize(None).values.astype(f"datetime64[{unit}]")
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance through the yfinance package, if it is installed"""
+
+    name = "yfinance"
+    capabilities = {"quote", "daily_bars", "intraday", "overview"}
+
+    def __init__(self):
+        try:
+            import yfinance
+        except ImportError:
+            yfinance = None
+        self._yf = yfinance
+
+    def available(self) -> bool:
+        return self._yf is not None
+
+    def _ticker(self, ticker: str):
+        rate_limiter.acquire("yfinance")
+        return self._yf.Ticker(ticker)
+
+    def quote(self, ticker: str) -> Optional[Dict]:
+        # yfinance fetches lazily, so the breaker has to wrap attribute access too
+        with circuit_breakers.guard(self.name):
+            info = self._ticker(ticker).fast_info
+            price = info.last_price
+            if not price:
+                return None
+            fields = {name: info[name] for name in ("previous_close", "last_volume", "day_high", "day_low", "open")}
+
+        previous_close = fields["previous_close"] or price
+        return {
+            "ticker": ticker,
+            "price": float(price),
+            "change": float(price - previous_close),
+            "change_percent": float((price / previous_close - 1) * 100),
+            "volume": int(fields["last_volume"] or 0),
+            "high": float(fields["day_high"]) if fields["day_high"] else None,
+            "low": float(fields["day_low"]) if fields["day_low"] else None,
+            "open": float(fields["open"]) if fields["open"] else None,
+            "previous_close": float(previous_close),
+            "updated_at": datetime.utcnow()
+        }
+
+    @staticmethod
+    def _series(frame: pd.DataFrame, unit: str) -> Optional[PriceSeries]:
+        if frame is None or frame.empty:
+            return None
+        frame = frame.dropna(subset=["Close"])
+        if frame.empty:
+            return None
+        return PriceSeries(
+            _exchange_times(frame.index, unit),
+            frame["Open"].to_numpy(dtype=np.float64),
+            frame["High"].to_numpy(dtype=np.float64),
+            frame["Low"].to_numpy(dtype=np.float64),
+            frame["Close"].to_numpy(dtype=np.float64),
+            frame["Volume"].fillna(0).to_numpy().astype(np.int64)
+        )
+
+    def daily_bars(self, ticker: str, outputsize: str = "full") -> Optional[PriceSeries]:
+        with circuit_breakers.guard(self.name):
+            frame = self._ticker(ticker).history(
+                period="max" if outputsize == "full" else "6mo",
+                interval="1d",
+                auto_adjust=False,
+                actions=False,
+                timeout=deadline.bounded(10)
+            )
+        return self._series(frame, "D")
+
+    def intraday(self, ticker: str) -> Optional[PriceSeries]:
+        # Yahoo keeps 1min bars for the last 7 days
+        with circuit_breakers.guard(self.name):
+            frame = self._ticker(ticker).history(
+                period="7d", interval="1m", auto_adjust=False, actions=False, timeout=deadline.bounded(10)
+            )
+        return self._series(frame, "s")
+
+    def overview(self, ticker: str) -> Optional[Dict]:
+        with circuit_breakers.guard(self.name):
+            info = self._ticker(ticker).info or {}
+        if not info.get("longName") and not info.get("shortName"):
+            return None
+
+        def number(field: str, cast=float):
+            value = info.get(field)
+            return cast(value) if value is not None else None
+
+        return {
+            "symbol": ticker,
+            "name": info.get("longName") or info.get("shortName"),
+            "description": info.get("longBusinessSummary"),
+            "sector": info.get("sector"),
+            "industry": info.get("industry"),
+            "exchange": info.get("exchange"),
+            "country": info.get("country"),
+            "market_cap": number("marketCap", int),
+            "pe_ratio": number("trailingPE"),
+            "peg_ratio": number("pegRatio"),
+            "dividend_yield": number("dividendYield"),
+            "eps": number("trailingEps"),
+            "beta": number("beta"),
+            "52_week_high": number("fiftyTwoWeekHigh"),
+            "52_week_low": number("fiftyTwoWeekLow"),
+            "50_day_ma": number("fiftyDayAverage"),
+            "200_day_ma": number("twoHundredDayAverage"),
+        }
+
+
+class AlpacaProvider(MarketDataProvider):
+    """Alpaca market data API, using the same credentials as the Alpaca portfolio routes"""
+
+    name = "alpaca"
+    capabilities = {"quote", "daily_bars", "intraday"}
+
+    # Most bars one request may return; longer ranges are paged
+    PAGE_LIMIT = 10000
+
+    def __init__(self):
+        self.base_url = settings.ALPACA_DATA_URL
+        self.feed = settings.ALPACA_DATA_FEED
+        self.session = http_session()
+
+    def available(self) -> bool:
+        return bool(os.environ.get("ALPACA_API_KEY"))
+
+    def handles(self, ticker: str) -> bool:
+        return not ticker.startswith("^")
+
+    def _get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        with circuit_breakers.guard(self.name):
+            rate_limiter.acquire("alpaca")
+            response = self.session.get(
+                f"{self.base_url}{path}",
+                params={**(params or {}), "feed": self.feed},
+                headers={
+                    "APCA-API-KEY-ID": os.environ.get("ALPACA_API_KEY", ""),
+                    "APCA-API-SECRET-KEY": os.environ.get("ALPACA_SECRET_KEY", ""),
+                },
+                timeout=deadline.bounded(10)
+            )
+            response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def quote(self, ticker: str) -> Optional[Dict]:
+        data = self._get(f"/stocks/{ticker}/snapshot")
+        trade = data.get("latestTrade") or {}
+        daily = data.get("dailyBar") or {}
+        price = trade.get("p") or daily.get("c")
+        if not price:
+            return None
+
+        previous_close = (data.get("prevDailyBar") or {}).get("c") or price
+        return {
+            "ticker": ticker,
+            "price": float(price),
+            "change": float(price - previous_close),
+            "change_percent": float((price / previous_close - 1) * 100),
+            "volume": int(daily.get("v") or 0),
+            "high": daily.get("h"),
+            "low": daily.get("l"),
+            "open": daily.get("o"),
+            "previous_close": float(previous_close),
+            "updated_at": datetime.utcnow()
+        }
+
+    def _bars(self, ticker: str, timeframe: str, start: date, unit: str) -> Optional[PriceSeries]:
+        """All bars since start, following next_page_token"""
+        bars: List[Dict] = []
+        params = {"timeframe": timeframe, "start": start.isoformat(), "limit": self.PAGE_LIMIT, "adjustment": "raw"}
+        while True:
+            data = self._get(f"/stocks/{ticker}/bars", params)
+            bars.extend(data.get("bars") or [])
+            token = data.get("next_page_token")
+            if not token:
+                break
+            params = {**params, "page_token": token}
+
+        if not bars:
+            return None
+        return PriceSeries(
+            _exchange_times([bar["t"] for bar in bars], unit),
+            np.array([bar["o"] for bar in bars], dtype=np.float64),
+            np.array([bar["h"] for bar in bars], dtype=np.float64),
+            np.array([bar["l"] for bar in bars], dtype=np.float64),
+            np.array([bar["c"] for bar in bars], dtype=np.float64),
+            np.array([bar["v"] for bar in bars], dtype=np.int64)
+        )
+
+    def daily_bars(self, ticker: str, outputsize: str = "full") -> Optional[PriceSeries]:
+        span = timedelta(days=365 * 30 if outputsize == "full" else 150)
+        return self._bars(ticker, "1Day", date.today() - span, "D")
+
+    def intraday(self, ticker: str) -> Optional[PriceSeries]:
+        return self._bars(ticker, "1Min", date.today() - timedelta(days=7), "s")
+
+
+# Provider name (as listed in MARKET_DATA_PROVIDERS) -> class
+PROVIDERS = {
+    AlphaVantageProvider.name: AlphaVantageProvider,
+    YFinanceProvider.name: YFinanceProvider,
+    AlpacaProvider.name: AlpacaProvider,
+}
@@ -1,7 +1,12 @@
-import requests
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from app.core.cache import cache
+from app.core import deadline
+from app.core.cassette import http_session
+from app.core.circuit_breaker import circuit_breakers
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.single_flight import single_flight
 
 
 class FREDClient:
@@ -10,54 +15,51 @@ class FREDClient:
     def __init__(self):
         self.api_key = settings.FRED_API_KEY
         self.base_url = "https://api.stlouisfed.org/fred"
-        # Cache to reduce API calls
-        self.cache = {}
-        self.cache_ttl = 3600  # 1 hour cache
-
-    def _get_cache_key(self, series_id: str) -> str:
-        """Generate cache key with timestamp bucket"""
-        timestamp = int(datetime.now().timestamp() // self.cache_ttl)
-        return f"{series_id}_{timestamp}"
+        self.session = http_session()
 
     def get_series_latest(self, series_id: str) -> Optional[Dict]:
         """Get latest observation for a FRED series"""
         try:
             # Check cache
-            cache_key = self._get_cache_key(series_id)
-            if cache_key in self.cache:
-                return self.cache[cache_key]
+            cached = cache.get('fred', series_id)
+            if cached:
+                return cached
 
-            # Fetch from FRED
-            url = f"{self.base_url}/series/observations"
-            params = {
-                'series_id': series_id,
-                'api_key': self.api_key,
-                'file_type': 'json',
-                'sort_order': 'desc',
-                'limit': 1
-            }
+            return single_flight.do(
+                ('fred.series_latest', series_id, ()),
+                lambda: self._fetch_series_latest(series_id)
+            )
 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+        except Exception as e:
+            print(f"Error fetching FRED series {series_id}: {e}")
+            return None
 
-            if 'observations' in data and data['observations']:
-                observation = data['observations'][0]
-                result = {
-                    'series_id': series_id,
-                    'date': observation['date'],
-                    'value': float(observation['value']) if observation['value'] != '.' else None
-                }
+    def _fetch_series_latest(self, series_id: str) -> Optional[Dict]:
+        """Fetch the latest observation from FRED and cache it"""
+        url = f"{self.base_url}/series/observations"
+        params = {
+            'series_id': series_id,
+            'api_key': self.api_key,
+            'file_type': 'json',
+            'sort_order': 'desc',
+            'limit': 1
+        }
 
-                # Cache result
-                self.cache[cache_key] = result
-                return result
+        data = self._get_json(url, params)
 
-            return None
+        if 'observations' in data and data['observations']:
+            observation = data['observations'][0]
+            result = {
+                'series_id': series_id,
+                'date': observation['date'],
+                'value': float(observation['value']) if observation['value'] != '.' else None
+            }
 
-        except Exception as e:
-            print(f"Error fetching FRED series {series_id}: {e}")
-            return None
+            # Cache result
+            cache.set('fred', series_id, result)
+            return result
+
+        return None
 
     def get_series_historical(self, series_id: str, start_date: str = None,
                              end_date: str = None, limit: int = 100) -> List[Dict]:
@@ -77,9 +79,10 @@ class FREDClient:
             if end_date:
                 params['observation_end'] = end_date
 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = single_flight.do(
+                ('fred.series_historical', series_id, (start_date, end_date, limit)),
+                lambda: self._get_json(url, params)
+            )
 
             if 'observations' in data:
                 observations = []
@@ -97,6 +100,14 @@ class FREDClient:
             print(f"Error fetching historical FRED series {series_id}: {e}")
             return []
 
+    def _get_json(self, url: str, params: Dict) -> Dict:
+        """GET a FRED endpoint within the shared rate limit and decode the JSON body"""
+        with circuit_breakers.guard('fred'):
+            rate_limiter.acquire('fred')
+            response = self.session.get(url, params=params, timeout=deadline.bounded(10))
+            response.raise_for_status()
+        return response.json()
+
     def get_treasury_yields(self) -> Dict[str, float]:
         """Get treasury yields for yield curve"""
         # Treasury series IDs
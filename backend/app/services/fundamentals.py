@@ -0,0 +1,231 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.single_flight import single_flight
+from app.db.base import SessionLocal
+from app.db.write_behind import upsert_rows, write_behind
+from app.models.models import Fundamentals, StockCache
+from app.services.market_data import market_data
+from app.services.synthetic_market import synthetic_market
+
+# Overview dict key -> Fundamentals column, for the keys stored as numbers
+NUMERIC_FIELDS = {
+    'market_cap': 'market_cap',
+    'pe_ratio': 'pe_ratio',
+    'peg_ratio': 'peg_ratio',
+    'dividend_yield': 'dividend_yield',
+    'eps': 'eps',
+    'beta': 'beta',
+    '52_week_high': 'week_52_high',
+    '52_week_low': 'week_52_low',
+    '50_day_ma': 'ma_50_day',
+    '200_day_ma': 'ma_200_day',
+}
+TEXT_FIELDS = ('name', 'description', 'sector', 'industry', 'exchange', 'country')
+COLUMNS = (*TEXT_FIELDS, *NUMERIC_FIELDS.values(), 'updated_at')
+
+
+def _overview_from_row(row: Fundamentals) -> Dict:
+    overview = {'symbol': row.ticker, **{field: getattr(row, field) for field in TEXT_FIELDS}}
+    for key, column in NUMERIC_FIELDS.items():
+        value = getattr(row, column)
+        if value is None:
+            overview[key] = None
+        else:
+            overview[key] = int(value) if key == 'market_cap' else float(value)
+    return overview
+
+
+class FundamentalsStore:
+    """Company overviews persisted in the fundamentals table.
+
+    Reads (get, get_many) never call upstream; rows are kept current by
+    FundamentalsRefreshScheduler. Only overview() fetches on the request
+    path, and only for a ticker that has no row yet. Fetched overviews are
+    written behind, together with the market_cap and pe_ratio StockCache
+    keeps for quotes.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self.synthetic = settings.MARKET_DATA_SOURCE == 'synthetic'
+
+    def get(self, ticker: str) -> Optional[Dict]:
+        """Stored overview for a ticker, or None if it has never been fetched"""
+        cached = cache.get('company', ticker)
+        if cached is not None:
+            return cached
+
+        overview = self.get_many([ticker]).get(ticker)
+        if overview is not None:
+            cache.set('company', ticker, overview)
+        return overview
+
+    def get_many(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Stored overviews keyed by ticker, in one query"""
+        tickers = [ticker for ticker in dict.fromkeys(tickers) if not ticker.startswith('^')]
+        if not tickers:
+            return {}
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(select(Fundamentals).where(Fundamentals.ticker.in_(tickers))).scalars().all()
+        except Exception as e:
+            print(f"Error reading fundamentals for {len(tickers)} tickers: {e}")
+            rows = []
+        finally:
+            db.close()
+
+        return {row.ticker: _overview_from_row(row) for row in rows}
+
+    def overview(self, ticker: str) -> Optional[Dict]:
+        """Stored overview, fetching it upstream only if the ticker has none yet"""
+        return self.get(ticker) or self.refresh(ticker)
+
+    def refresh(self, ticker: str) -> Optional[Dict]:
+        """Fetch a ticker's overview and store it, coalescing identical fetches"""
+        return single_flight.do(('fundamentals.fetch', ticker, ()), lambda: self._fetch(ticker))
+
+    def _fetch(self, ticker: str) -> Optional[Dict]:
+        overview = synthetic_market.overview(ticker) if self.synthetic else market_data.overview(ticker)
+        if overview:
+            self.save(ticker, overview)
+        return overview
+
+    def save(self, ticker: str, overview: Dict):
+        """Cache an overview and queue its table writes"""
+        cache.set('company', ticker, overview)
+
+        row = {'ticker': ticker, 'updated_at': datetime.utcnow()}
+        row.update((field, overview.get(field)) for field in TEXT_FIELDS)
+        row.update((column, overview.get(key)) for key, column in NUMERIC_FIELDS.items())
+        write_behind.put('fundamentals', ticker, row)
+        write_behind.put('stock_fundamentals', ticker, {
+            'ticker': ticker,
+            'market_cap': overview.get('market_cap'),
+            'pe_ratio': overview.get('pe_ratio')
+        })
+
+    def outdated(self, tickers: List[str]) -> List[str]:
+        """Tickers with no stored overview or one older than max_age, never-fetched first"""
+        db = SessionLocal()
+        try:
+            updated = dict(db.execute(
+                select(Fundamentals.ticker, Fundamentals.updated_at).where(Fundamentals.ticker.in_(tickers))
+            ).all())
+        finally:
+            db.close()
+
+        now = datetime.utcnow()
+        due = [
+            ticker for ticker in tickers
+            if not ticker.startswith('^')
+            and (updated.get(ticker) is None or (now - updated[ticker]).total_seconds() >= self.max_age)
+        ]
+        return sorted(due, key=lambda ticker: updated.get(ticker) or datetime.min)
+
+
+class FundamentalsRefreshScheduler:
+    """Backfills and re-fetches the overviews of the hot tickers within a share of the rate limit.
+
+    Each overview costs one upstream call, so a cycle runs every
+    FUNDAMENTALS_REFRESH_INTERVAL and fetches as many as its share of the
+    Alpha Vantage rate limit allows. Tickers that were never fetched come
+    first, so a fresh database is bulk loaded at that pace before rows
+    older than FUNDAMENTALS_MAX_AGE are refreshed. Synthetic overviews are
+    generated locally and all load in one cycle.
+    """
+
+    def __init__(self, interval: float, budget_share: float):
+        self.interval = interval
+        self.budget_share = budget_share
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.last_cycle: Optional[Dict] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fundamentals-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Fundamentals refresh cycle failed: {e}")
+
+    def request_budget(self) -> int:
+        """Upstream requests one cycle may spend"""
+        per_cycle = settings.ALPHA_VANTAGE_RATE_LIMIT * self.interval / 60
+        return max(1, int(per_cycle * self.budget_share))
+
+    def run_once(self) -> Dict:
+        """Run one refresh cycle and return what it did"""
+        # Imported here: the quote refresh scheduler imports the market service, which imports this module
+        from app.services.quote_refresh import quote_refresh_scheduler
+        from app.services.screener_service import SCREENER_UNIVERSE
+
+        hot = list(dict.fromkeys([*quote_refresh_scheduler.hot_symbols(), *SCREENER_UNIVERSE]))
+        due = fundamentals_store.outdated(hot)
+        batch = due if fundamentals_store.synthetic else due[:self.request_budget()]
+
+        refreshed = sum(fundamentals_store.refresh(ticker) is not None for ticker in batch)
+
+        self.cycles += 1
+        self.refreshed += refreshed
+        self.failed += len(batch) - refreshed
+        self.last_cycle = {
+            'at': time.time(),
+            'hot': len(hot),
+            'due': len(due),
+            'refreshed': refreshed,
+            'failed': len(batch) - refreshed,
+            'deferred': len(due) - len(batch)
+        }
+        return self.last_cycle
+
+    def stats(self) -> Dict:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'interval': self.interval,
+            'request_budget': self.request_budget(),
+            'cycles': self.cycles,
+            'refreshed': self.refreshed,
+            'failed': self.failed,
+            'last_cycle': self.last_cycle
+        }
+
+
+def _write_fundamentals(db: Session, rows: List[Dict]):
+    upsert_rows(db, Fundamentals, rows, 'ticker', COLUMNS)
+
+
+def _write_stock_fundamentals(db: Session, rows: List[Dict]):
+    upsert_rows(db, StockCache, rows, 'ticker', ('market_cap', 'pe_ratio'))
+
+
+write_behind.register('fundamentals', _write_fundamentals)
+write_behind.register('stock_fundamentals', _write_stock_fundamentals)
+
+fundamentals_store = FundamentalsStore(settings.FUNDAMENTALS_MAX_AGE)
+fundamentals_refresh_scheduler = FundamentalsRefreshScheduler(
+    settings.FUNDAMENTALS_REFRESH_INTERVAL,
+    settings.FUNDAMENTALS_REFRESH_BUDGET_SHARE
+)
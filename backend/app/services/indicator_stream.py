@@ -0,0 +1,510 @@
+import math
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import msgpack
+import numpy as np
+from sqlalchemy.orm import Session
+from app.core.cache import cache
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.write_behind import upsert_rows, write_behind
+from app.models.models import IndicatorCheckpoint
+from app.services import indicators
+from app.services.av_series import PriceSeries
+
+NAN = float('nan')
+
+# Rounded indicator values kept per ticker; covers the technical endpoint's 6M window
+HISTORY_BARS = 260
+
+
+class StreamingSMA:
+    """Simple moving average over the last `period` values, O(1) per update.
+
+    The running total is re-summed from the window every `period` updates
+    so rounding drift stays bounded, which keeps updates amortized O(1).
+    """
+
+    def __init__(self, period: int, window=()):
+        self.period = period
+        self.window = deque(window, maxlen=period)
+        self._resync()
+
+    def _resync(self):
+        self.total = math.fsum(self.window)
+        self._updates = 0
+
+    def _push(self, value: float):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        self._updates += 1
+        if self._updates >= self.period:
+            self._resync()
+
+    def update(self, value: float) -> float:
+        """Add a closed bar's value and return the new average (NaN until the window fills)"""
+        self._push(value)
+        return self.value
+
+    def preview(self, value: float) -> float:
+        """The average if the forming bar closed at value; state is unchanged"""
+        if len(self.window) + 1 < self.period:
+            return NAN
+        oldest = self.window[0] if len(self.window) == self.period else 0.0
+        return (self.total - oldest + value) / self.period
+
+    @property
+    def value(self) -> float:
+        return self.total / self.period if len(self.window) == self.period else NAN
+
+    def checkpoint(self) -> Dict:
+        return {'period': self.period, 'window': list(self.window)}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "StreamingSMA":
+        return cls(state['period'], state['window'])
+
+    @classmethod
+    def seed(cls, values: np.ndarray, period: int) -> "StreamingSMA":
+        return cls(period, values[-period:].tolist())
+
+
+class StreamingBollinger(StreamingSMA):
+    """Bollinger bands (SMA +/- width population standard deviations) from running sums"""
+
+    def __init__(self, period: int, width: float = 2.0, window=()):
+        self.width = width
+        super().__init__(period, window)
+
+    def _resync(self):
+        super()._resync()
+        self.total_sq = math.fsum(value * value for value in self.window)
+
+    def _push(self, value: float):
+        if len(self.window) == self.period:
+            self.total_sq -= self.window[0] * self.window[0]
+        self.total_sq += value * value
+        super()._push(value)
+
+    def _bands(self, total: float, total_sq: float) -> Tuple[float, float, float]:
+        middle = total / self.period
+        std = math.sqrt(max(total_sq / self.period - middle * middle, 0.0))
+        return middle, middle + self.width * std, middle - self.width * std
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        """Add a closed bar's value and return (middle, upper, lower)"""
+        self._push(value)
+        return self.value
+
+    def preview(self, value: float) -> Tuple[float, float, float]:
+        if len(self.window) + 1 < self.period:
+            return NAN, NAN, NAN
+        oldest = self.window[0] if len(self.window) == self.period else 0.0
+        return self._bands(self.total - oldest + value, self.total_sq - oldest * oldest + value * value)
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        if len(self.window) < self.period:
+            return NAN, NAN, NAN
+        return self._bands(self.total, self.total_sq)
+
+    def checkpoint(self) -> Dict:
+        return {**super().checkpoint(), 'width': self.width}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "StreamingBollinger":
+        return cls(state['period'], state['width'], state['window'])
+
+    @classmethod
+    def seed(cls, values: np.ndarray, period: int, width: float = 2.0) -> "StreamingBollinger":
+        return cls(period, width, values[-period:].tolist())
+
+
+class StreamingEMA:
+    """Exponential smoothing seeded with the SMA of the first `period` values, matching indicators.smooth.
+
+    alpha defaults to 2 / (period + 1); Wilder smoothing is alpha = 1 / period.
+    """
+
+    def __init__(self, period: int, alpha: Optional[float] = None, value: float = NAN, count: int = 0,
+                 total: float = 0.0):
+        self.period = period
+        self.alpha = 2 / (period + 1) if alpha is None else alpha
+        self.value = value
+        self.count = count
+        # Sum of the values seen while the seed window fills
+        self.total = total
+
+    def _next(self, value: float) -> float:
+        if self.count + 1 < self.period:
+            return NAN
+        if self.count + 1 == self.period:
+            return (self.total + value) / self.period
+        return self.value + self.alpha * (value - self.value)
+
+    def update(self, value: float) -> float:
+        self.value = self._next(value)
+        if self.count < self.period:
+            self.total += value
+        self.count += 1
+        return self.value
+
+    def preview(self, value: float) -> float:
+        return self._next(value)
+
+    def checkpoint(self) -> Dict:
+        return {'period': self.period, 'alpha': self.alpha, 'value': self.value, 'count': self.count,
+                'total': self.total}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "StreamingEMA":
+        return cls(state['period'], state['alpha'], state['value'], state['count'], state['total'])
+
+    @classmethod
+    def seed(cls, values: np.ndarray, period: int, alpha: Optional[float] = None) -> "StreamingEMA":
+        """State after every value in a NaN-free array, computed in one vectorized pass"""
+        state = cls(period, alpha)
+        if not len(values):
+            return state
+        state.value = float(indicators.smooth(values, period, state.alpha)[-1])
+        state.count = len(values)
+        state.total = float(values[:period].sum())
+        return state
+
+
+class StreamingRSI:
+    """Wilder RSI from the previous close and smoothed average gain and loss"""
+
+    def __init__(self, period: int = 14, last: Optional[float] = None, gain: Optional[StreamingEMA] = None,
+                 loss: Optional[StreamingEMA] = None):
+        self.period = period
+        self.last = last
+        self.gain = gain or StreamingEMA(period, 1 / period)
+        self.loss = loss or StreamingEMA(period, 1 / period)
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        if math.isnan(loss):
+            return NAN
+        return 100.0 if loss == 0 else 100 * gain / (gain + loss)
+
+    def update(self, close: float) -> float:
+        if self.last is None:
+            self.last = close
+            return NAN
+        delta = close - self.last
+        self.last = close
+        return self._rsi(self.gain.update(max(delta, 0.0)), self.loss.update(max(-delta, 0.0)))
+
+    def preview(self, close: float) -> float:
+        if self.last is None:
+            return NAN
+        delta = close - self.last
+        return self._rsi(self.gain.preview(max(delta, 0.0)), self.loss.preview(max(-delta, 0.0)))
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.gain.value, self.loss.value)
+
+    def checkpoint(self) -> Dict:
+        return {'period': self.period, 'last': self.last, 'gain': self.gain.checkpoint(),
+                'loss': self.loss.checkpoint()}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "StreamingRSI":
+        return cls(state['period'], state['last'], StreamingEMA.restore(state['gain']),
+                   StreamingEMA.restore(state['loss']))
+
+    @classmethod
+    def seed(cls, closes: np.ndarray, period: int = 14) -> "StreamingRSI":
+        if not len(closes):
+            return cls(period)
+        delta = np.diff(closes)
+        return cls(
+            period,
+            float(closes[-1]),
+            StreamingEMA.seed(np.clip(delta, 0, None), period, 1 / period),
+            StreamingEMA.seed(np.clip(-delta, 0, None), period, 1 / period)
+        )
+
+
+class StreamingMACD:
+    """MACD line, signal and histogram; the signal EMA starts once the MACD line has values"""
+
+    def __init__(self, fast: StreamingEMA, slow: StreamingEMA, signal: StreamingEMA):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+
+    @classmethod
+    def create(cls, fast: int = 12, slow: int = 26, signal: int = 9) -> "StreamingMACD":
+        return cls(StreamingEMA(fast), StreamingEMA(slow), StreamingEMA(signal))
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        line = self.fast.update(close) - self.slow.update(close)
+        if math.isnan(line):
+            return NAN, NAN, NAN
+        signal = self.signal.update(line)
+        return line, signal, line - signal
+
+    def preview(self, close: float) -> Tuple[float, float, float]:
+        line = self.fast.preview(close) - self.slow.preview(close)
+        if math.isnan(line):
+            return NAN, NAN, NAN
+        signal = self.signal.preview(line)
+        return line, signal, line - signal
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        line = self.fast.value - self.slow.value
+        return line, self.signal.value, line - self.signal.value
+
+    def checkpoint(self) -> Dict:
+        return {'fast': self.fast.checkpoint(), 'slow': self.slow.checkpoint(), 'signal': self.signal.checkpoint()}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "StreamingMACD":
+        return cls(*(StreamingEMA.restore(state[name]) for name in ('fast', 'slow', 'signal')))
+
+    @classmethod
+    def seed(cls, closes: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> "StreamingMACD":
+        line = indicators.macd(closes, fast, slow, signal)[0]
+        return cls(
+            StreamingEMA.seed(closes, fast),
+            StreamingEMA.seed(closes, slow),
+            StreamingEMA.seed(line[np.isfinite(line)], signal)
+        )
+
+
+# Indicators TickerIndicators keeps in streaming state
+STREAMED_INDICATORS = ('SMA', 'RSI', 'MACD', 'BOLLINGER')
+
+
+def indicator_outputs(closes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Every TickerIndicators output over a whole close series, vectorized"""
+    return indicators.outputs(STREAMED_INDICATORS, closes)
+
+
+def _round(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(value, 2)
+
+
+class TickerIndicators:
+    """The technical endpoint's indicators for one ticker, advanced one daily bar at a time.
+
+    Keeps the streaming state of every indicator plus the last HISTORY_BARS
+    rounded outputs, so a new bar costs one O(1) update per indicator
+    instead of recomputing the series. The last bar's close is kept too, so
+    a bar taken while its session was still trading is recognised once its
+    close changes. checkpoint()/restore() round-trip through plain data for
+    the cache.
+    """
+
+    OUTPUTS = (
+        'sma_20', 'sma_50', 'sma_200', 'rsi', 'macd', 'macd_signal', 'macd_histogram',
+        'bollinger_middle', 'bollinger_upper', 'bollinger_lower'
+    )
+
+    def __init__(self, sma_20: StreamingSMA, sma_50: StreamingSMA, sma_200: StreamingSMA, rsi: StreamingRSI,
+                 macd: StreamingMACD, bollinger: StreamingBollinger, last: Optional[str] = None,
+                 last_close: Optional[float] = None, timestamps=(), history: Optional[Dict[str, List]] = None):
+        self.sma_20 = sma_20
+        self.sma_50 = sma_50
+        self.sma_200 = sma_200
+        self.rsi = rsi
+        self.macd = macd
+        self.bollinger = bollinger
+        self.last = last
+        self.last_close = last_close
+        self.timestamps = deque(timestamps, maxlen=HISTORY_BARS)
+        self.history = {name: deque((history or {}).get(name, ()), maxlen=HISTORY_BARS) for name in self.OUTPUTS}
+
+    @classmethod
+    def seed(cls, series: PriceSeries) -> "TickerIndicators":
+        """State and output history for a whole daily series, from one vectorized pass"""
+        closes = series.close.astype(np.float64)
+        outputs = indicator_outputs(closes)
+        labels = series[-HISTORY_BARS:].labels()
+        return cls(
+            StreamingSMA.seed(closes, 20),
+            StreamingSMA.seed(closes, 50),
+            StreamingSMA.seed(closes, 200),
+            StreamingRSI.seed(closes, 14),
+            StreamingMACD.seed(closes),
+            StreamingBollinger.seed(closes, 20),
+            last=labels[-1] if labels else None,
+            last_close=float(closes[-1]) if len(closes) else None,
+            timestamps=labels,
+            history={name: indicators.to_list(values[-HISTORY_BARS:]) for name, values in outputs.items()}
+        )
+
+    def _values(self, sma_20, sma_50, sma_200, rsi, macd, bollinger) -> Dict[str, Optional[float]]:
+        values = dict(zip(('macd', 'macd_signal', 'macd_histogram'), macd))
+        values.update(zip(('bollinger_middle', 'bollinger_upper', 'bollinger_lower'), bollinger))
+        values.update(sma_20=sma_20, sma_50=sma_50, sma_200=sma_200, rsi=rsi)
+        return {name: _round(values[name]) for name in self.OUTPUTS}
+
+    def _parts(self):
+        return self.sma_20, self.sma_50, self.sma_200, self.rsi, self.macd, self.bollinger
+
+    def update(self, label: str, close: float) -> Dict[str, Optional[float]]:
+        """Advance every indicator by one closed bar and record its outputs"""
+        values = self._values(*(part.update(close) for part in self._parts()))
+        self.last = label
+        self.last_close = close
+        self.timestamps.append(label)
+        for name, value in values.items():
+            self.history[name].append(value)
+        return values
+
+    def preview(self, price: float) -> Dict[str, Optional[float]]:
+        """Latest outputs if the forming bar closed at price, e.g. a live quote; state is unchanged"""
+        return self._values(*(part.preview(price) for part in self._parts()))
+
+    def latest(self) -> Dict[str, Optional[float]]:
+        return self._values(*(part.value for part in self._parts()))
+
+    def checkpoint(self) -> Dict:
+        return {
+            'last': self.last,
+            'last_close': self.last_close,
+            'state': {
+                'sma_20': self.sma_20.checkpoint(),
+                'sma_50': self.sma_50.checkpoint(),
+                'sma_200': self.sma_200.checkpoint(),
+                'rsi': self.rsi.checkpoint(),
+                'macd': self.macd.checkpoint(),
+                'bollinger': self.bollinger.checkpoint()
+            },
+            'timestamps': list(self.timestamps),
+            'history': {name: list(values) for name, values in self.history.items()}
+        }
+
+    @classmethod
+    def restore(cls, checkpoint: Dict) -> "TickerIndicators":
+        state = checkpoint['state']
+        return cls(
+            StreamingSMA.restore(state['sma_20']),
+            StreamingSMA.restore(state['sma_50']),
+            StreamingSMA.restore(state['sma_200']),
+            StreamingRSI.restore(state['rsi']),
+            StreamingMACD.restore(state['macd']),
+            StreamingBollinger.restore(state['bollinger']),
+            last=checkpoint['last'],
+            last_close=checkpoint.get('last_close'),
+            timestamps=checkpoint['timestamps'],
+            history=checkpoint['history']
+        )
+
+
+class IndicatorStreams:
+    """Per-ticker TickerIndicators kept current with the daily series.
+
+    Live objects stay in a bounded in-process LRU. Their checkpoints go to
+    the cache's "indicators" namespace (shared through Redis when that
+    namespace is configured for it) and, written behind, to the
+    indicator_checkpoints table, so another worker or a restart resumes
+    from the checkpoint instead of recomputing, with or without Redis. A series whose bars no
+    longer line up with the checkpoint, including a checkpointed bar whose
+    close has changed since (it was still trading), is reseeded in one
+    vectorized pass.
+    """
+
+    def __init__(self, max_tickers: int):
+        self.max_tickers = max_tickers
+        self._lock = threading.Lock()
+        self._streams: "OrderedDict[str, TickerIndicators]" = OrderedDict()
+        self.seeded = 0
+        self.restored = 0
+        self.advanced = 0
+
+    def get(self, ticker: str, series: PriceSeries) -> Optional[TickerIndicators]:
+        """Indicators for a ticker advanced through the last bar of its daily series"""
+        if not len(series):
+            return None
+
+        with self._lock:
+            stream = self._streams.get(ticker)
+        if stream is None:
+            checkpoint = self._load_checkpoint(ticker)
+            if checkpoint is not None:
+                stream = TickerIndicators.restore(checkpoint)
+                self.restored += 1
+
+        with self._lock:
+            # Another request may have restored or advanced this ticker meanwhile
+            stream = self._streams.get(ticker) or stream
+            changed = True
+            if stream is None or stream.last is None:
+                stream = self._seed(series)
+            else:
+                position = int(np.searchsorted(series.timestamps, np.datetime64(stream.last)))
+                new = series[position + 1:]
+                # Checkpoint bar missing (history rewritten) or restated (a forming bar that moved on), or a long gap
+                if position >= len(series) or series.timestamps[position] != np.datetime64(stream.last) \
+                        or float(series.close[position]) != stream.last_close or len(new) > HISTORY_BARS:
+                    stream = self._seed(series)
+                elif not len(new):
+                    changed = False
+                else:
+                    for label, close in zip(new.labels(), new.close.tolist()):
+                        stream.update(label, close)
+                    self.advanced += len(new)
+
+            self._streams[ticker] = stream
+            self._streams.move_to_end(ticker)
+            while len(self._streams) > self.max_tickers:
+                self._streams.popitem(last=False)
+            checkpoint = stream.checkpoint() if changed else None
+
+        if checkpoint is not None:
+            cache.set('indicators', ticker, checkpoint)
+            write_behind.put('indicator_checkpoint', ticker, {
+                'ticker': ticker,
+                'state': msgpack.packb(checkpoint, use_bin_type=True),
+                'updated_at': datetime.utcnow()
+            })
+        return stream
+
+    @staticmethod
+    def _load_checkpoint(ticker: str) -> Optional[Dict]:
+        """A ticker's checkpoint from the cache, else from the indicator_checkpoints table"""
+        checkpoint = cache.get('indicators', ticker)
+        if checkpoint is not None:
+            return checkpoint
+
+        db = SessionLocal()
+        try:
+            row = db.get(IndicatorCheckpoint, ticker)
+        except Exception as e:
+            print(f"Error reading indicator checkpoint for {ticker}: {e}")
+            return None
+        finally:
+            db.close()
+        return msgpack.unpackb(row.state, raw=False) if row is not None else None
+
+    def _seed(self, series: PriceSeries) -> TickerIndicators:
+        self.seeded += 1
+        return TickerIndicators.seed(series)
+
+    def stats(self) -> Dict:
+        return {
+            'tickers': len(self._streams),
+            'max_tickers': self.max_tickers,
+            'seeded': self.seeded,
+            'restored': self.restored,
+            'advanced_bars': self.advanced
+        }
+
+
+def _write_checkpoints(db: Session, rows: List[Dict]):
+    upsert_rows(db, IndicatorCheckpoint, rows, 'ticker', ('state', 'updated_at'))
+
+
+write_behind.register('indicator_checkpoint', _write_checkpoints)
+
+indicator_streams = IndicatorStreams(settings.INDICATOR_STREAM_MAX_TICKERS)
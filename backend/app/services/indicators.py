@@ -0,0 +1,317 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Every indicator takes float64 values along axis 0: a 1-D series or a 2-D
+# (time x ticker) panel. Outputs have the input's shape and are NaN wherever
+# the lookback is not yet filled or the window contains a missing value.
+
+# Indicator names accepted by the technical endpoints -> the output series each one produces
+INDICATOR_OUTPUTS = {
+    'SMA': ('sma_20', 'sma_50', 'sma_200'),
+    'EMA': ('ema_20', 'ema_50'),
+    'RSI': ('rsi',),
+    'MACD': ('macd', 'macd_signal', 'macd_histogram'),
+    'BOLLINGER': ('bollinger_middle', 'bollinger_upper', 'bollinger_lower'),
+    'ATR': ('atr',),
+}
+
+
+# Panels with fewer rows than this many times their columns are smoothed block by block (see smooth)
+WIDE_PANEL_RATIO = 4
+
+# Rows per block of the wide-panel scan: one small matrix product per block
+SCAN_BLOCK = 16
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _rows(values: np.ndarray) -> np.ndarray:
+    """Row numbers shaped to broadcast against values"""
+    return np.arange(len(values)).reshape(-1, *([1] * (values.ndim - 1)))
+
+
+def _difference(cumulative: np.ndarray, period: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Sum of each trailing `period`-row window from running totals, for the rows from period - 1 on"""
+    if out is None:
+        out = np.empty((len(cumulative) - period + 1, *cumulative.shape[1:]), dtype=cumulative.dtype)
+    out[0] = cumulative[period - 1]
+    np.subtract(cumulative[period:], cumulative[:-period], out=out[1:])
+    return out
+
+
+class _Windows:
+    """Trailing-window sums of one array along axis 0, every period read off the same running totals.
+
+    outputs() builds one for the closes and shares it between the SMAs,
+    the EMA and MACD seeds and the Bollinger middle band, so a panel's
+    closes are scanned for missing values and summed once.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.valid = np.isfinite(values)
+        self.complete = bool(self.valid.all())
+        # Each column's first valid row, and whether every column is valid from there on: late
+        # listings leave only leading gaps, where first full windows need no missing-value counts
+        self.start = np.zeros(values.shape[1:], dtype=np.int64)
+        self.suffix = self.complete
+        if not self.complete:
+            counts = np.count_nonzero(self.valid, axis=0)
+            self.start = np.where(counts > 0, self.valid.argmax(axis=0), len(values))
+            self.suffix = bool((counts == len(values) - self.start).all())
+        self._totals = None
+        self._missing = None
+
+    @property
+    def filled(self) -> np.ndarray:
+        """The values with missing ones as zero"""
+        return self.values if self.complete else np.where(self.valid, self.values, 0.0)
+
+    def totals(self) -> np.ndarray:
+        """Running sums, missing values counted as zero"""
+        if self._totals is None:
+            self._totals = np.cumsum(self.filled, axis=0)
+        return self._totals
+
+    def full(self, period: int) -> np.ndarray:
+        """Which trailing windows (from row period - 1 on) hold no missing value"""
+        if self._missing is None:
+            # An int32 running count is several times cheaper than cumsum over booleans
+            self._missing = np.cumsum(~self.valid, axis=0, dtype=np.int32)
+        return _difference(self._missing, period) == 0
+
+    def mean(self, period: int) -> np.ndarray:
+        out = np.empty(self.values.shape)
+        out[:period - 1] = np.nan
+        if len(out) < period:
+            return out
+        means = _difference(self.totals(), period, out[period - 1:])
+        means /= period
+        if self.suffix:
+            if not self.complete:
+                np.copyto(out, np.nan, where=_rows(out) < self.start + period - 1)
+        else:
+            np.copyto(means, np.nan, where=~self.full(period))
+        return out
+
+    def first_full(self, period: int) -> np.ndarray:
+        """Per column, the row its first full window ends on; len(values) if it never fills"""
+        if self.suffix:
+            first = self.start + period - 1
+            return np.where(first < len(self.values), first, len(self.values))
+        full = self.full(period)
+        return np.where(full.any(axis=0), full.argmax(axis=0) + period - 1, len(self.values))
+
+
+def sma(values, period: int, windows: Optional[_Windows] = None) -> np.ndarray:
+    """Simple moving average from one cumulative sum: O(n) regardless of period"""
+    return (windows or _Windows(_as_float(values))).mean(period)
+
+
+def smooth(values, period: int, alpha: float, windows: Optional[_Windows] = None) -> np.ndarray:
+    """Exponential smoothing y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded with the first full-window SMA.
+
+    Values before each column's seed are masked so the filter starts
+    exactly at the seed; a missing value holds the previous output. Long
+    series run through pandas' compiled ewm (adjust=False), which loops
+    over columns; wide panels are scanned a block of rows at a time
+    across all columns at once (see _scan).
+    """
+    values = _as_float(values)
+    if len(values) < period:
+        return np.full(values.shape, np.nan)
+
+    windows = windows or _Windows(values)
+    flat = values.reshape(len(values), -1)
+    # Each column's first window of `period` valid values: the row it ends on, and its mean as the seed
+    first = windows.first_full(period).reshape(-1)
+    columns = np.flatnonzero(first < len(flat))
+    window = first[columns] - np.arange(period)[:, None]
+    seed = np.zeros(flat.shape[1])
+    seed[columns] = flat[window, columns].mean(axis=0)
+
+    before = _rows(flat) < first
+    if len(flat) < WIDE_PANEL_RATIO * flat.shape[1]:
+        # Rows up to the seed hold the seed itself, so the filter sits on it until it starts
+        out = np.where(before, seed, flat)
+        out[first[columns], columns] = seed[columns]
+        _scan(out, alpha, gaps=not windows.suffix)
+    else:
+        seeded = np.where(before, np.nan, flat)
+        seeded[first[columns], columns] = seed[columns]
+        out = pd.DataFrame(seeded).ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()
+    # With only leading gaps every missing value is before its column's seed
+    np.copyto(out, np.nan, where=before if windows.suffix else before | ~windows.valid.reshape(flat.shape))
+    return out.reshape(values.shape)
+
+
+def _scan(values: np.ndarray, alpha: float, gaps: bool = True):
+    """Exponential smoothing, in place, down the rows of a panel whose first row is already its output.
+
+    Within a block of SCAN_BLOCK rows each output is a decay-weighted sum of
+    the block's inputs plus the decayed output carried in from the previous
+    block, so a block is one (block x block) @ (block x columns) product
+    instead of a Python step per row. The weights are powers of
+    (1 - alpha) <= 1, so nothing grows however long the panel. Blocks with a
+    missing value step row by row, holding the previous output there;
+    ``gaps=False`` promises there are none.
+    """
+    decay = 1 - alpha
+    steps = np.arange(SCAN_BLOCK)
+    lag = steps[:, None] - steps
+    weights = np.where(lag >= 0, alpha * decay ** np.maximum(lag, 0), 0.0)
+    carry = decay ** (steps + 1)[:, None]
+
+    previous = values[0].copy()
+    missing = np.isnan(values).any(axis=1) if gaps else np.zeros(len(values), dtype=bool)
+    for start in range(0, len(values), SCAN_BLOCK):
+        block = values[start:start + SCAN_BLOCK]
+        size = len(block)
+        if missing[start:start + size].any():
+            for current in block:
+                previous = current[:] = np.where(
+                    np.isnan(current), previous, previous + alpha * (current - previous)
+                )
+        else:
+            step = weights[:size, :size] @ block
+            step += carry[:size] * previous
+            block[:] = step
+            previous = step[-1]
+
+
+def ema(values, period: int, windows: Optional[_Windows] = None) -> np.ndarray:
+    """Exponential moving average (alpha = 2 / (period + 1)) seeded with the SMA"""
+    return smooth(values, period, 2 / (period + 1), windows)
+
+
+def wilder(values, period: int) -> np.ndarray:
+    """Wilder's smoothing (alpha = 1 / period), as used by RSI and ATR"""
+    return smooth(values, period, 1 / period)
+
+
+def _lagged(values: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """values[t] - previous[t - 1] along axis 0; NaN on the first row"""
+    out = np.empty(values.shape)
+    out[0] = np.nan
+    np.subtract(values[1:], previous[:-1], out=out[1:])
+    return out
+
+
+def rsi(closes, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder-smoothed gains and losses"""
+    closes = _as_float(closes)
+    delta = _lagged(closes, closes)
+
+    # Gains and losses side by side: one smoothing pass over both
+    moves = np.empty((len(closes), 2, *closes.shape[1:]))
+    np.maximum(delta, 0, out=moves[:, 0])
+    np.maximum(np.negative(delta, out=delta), 0, out=moves[:, 1])
+    smoothed = wilder(moves, period)
+    avg_gain, avg_loss = smoothed[:, 0], smoothed[:, 1]
+    out = avg_gain + avg_loss
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(np.multiply(avg_gain, 100, out=avg_gain), out, out=out)
+    np.copyto(out, 100.0, where=avg_loss == 0)
+    return out
+
+
+def macd(closes, fast: int = 12, slow: int = 26, signal: int = 9,
+         windows: Optional[_Windows] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(MACD line, signal line, histogram); the signal is seeded once `signal` MACD values exist"""
+    closes = _as_float(closes)
+    windows = windows or _Windows(closes)
+    line = ema(closes, fast, windows)
+    line -= ema(closes, slow, windows)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(closes, period: int = 20, width: float = 2.0,
+              windows: Optional[_Windows] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(middle, upper, lower) bands: the SMA +/- width population standard deviations"""
+    closes = _as_float(closes)
+    windows = windows or _Windows(closes)
+    middle = windows.mean(period)
+    if len(closes) < period:
+        return middle, middle.copy(), middle.copy()
+
+    # Variance is shift-invariant; centring each column keeps the sum of squares well conditioned
+    centre = windows.filled.sum(axis=0) / np.maximum(windows.valid.sum(axis=0), 1)
+    centred = closes - centre
+    if not windows.complete:
+        np.copyto(centred, 0.0, where=~windows.valid)
+    totals = np.cumsum(centred, axis=0)
+    shifted = _difference(totals, period)
+    shifted /= period
+    np.cumsum(np.square(centred, out=centred), axis=0, out=totals)
+    spread = _difference(totals, period)
+    spread /= period
+    spread -= np.square(shifted, out=shifted)
+    np.sqrt(np.maximum(spread, 0.0, out=spread), out=spread)
+    spread *= width
+
+    # Windows with a missing close are already NaN in the middle band
+    upper, lower = middle.copy(), middle.copy()
+    upper[period - 1:] += spread
+    lower[period - 1:] -= spread
+    return middle, upper, lower
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average True Range: Wilder-smoothed true range (the first bar's is its high - low)"""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    true_range = high - low
+    missing = np.isnan(true_range)
+    up, down = _lagged(high, close), _lagged(low, close)
+    np.maximum(np.abs(up, out=up), np.abs(down, out=down), out=up)
+    # fmax skips the missing previous close on the first bar; a missing high or low stays NaN
+    np.fmax(true_range, up, out=true_range)
+    np.copyto(true_range, np.nan, where=missing)
+    return wilder(true_range, period)
+
+
+def outputs(indicators: Iterable[str], close, high=None, low=None) -> Dict[str, np.ndarray]:
+    """Output series of the requested INDICATOR_OUTPUTS indicators; ATR needs high and low"""
+    close = _as_float(close)
+    windows = _Windows(close)
+    results = {}
+    for indicator in dict.fromkeys(indicators):
+        if indicator == 'SMA':
+            results.update(sma_20=sma(close, 20, windows), sma_50=sma(close, 50, windows),
+                           sma_200=sma(close, 200, windows))
+        elif indicator == 'EMA':
+            results.update(ema_20=ema(close, 20, windows), ema_50=ema(close, 50, windows))
+        elif indicator == 'RSI':
+            results['rsi'] = rsi(close, 14)
+        elif indicator == 'MACD':
+            results.update(zip(INDICATOR_OUTPUTS['MACD'], macd(close, windows=windows)))
+        elif indicator == 'BOLLINGER':
+            results.update(zip(INDICATOR_OUTPUTS['BOLLINGER'], bollinger(close, 20, windows=windows)))
+        elif indicator == 'ATR':
+            results['atr'] = atr(high, low, close, 14)
+    return results
+
+
+def to_list(values, decimals: Optional[int] = 2) -> List:
+    """An indicator array as JSON-ready (nested) lists, rounded, with NaN as None"""
+    values = _as_float(values)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+def to_columns(values, decimals: int = 2) -> Dict[str, np.ndarray]:
+    """An indicator array flattened into one column of integers scaled by 10 ** decimals, for orjson.
+
+    Undefined (NaN) values are 0 in ``values`` and listed by flat position
+    in ``nulls``; values / 10 ** decimals equals np.round(values, decimals).
+    """
+    scaled = np.rint(_as_float(values) * 10 ** decimals).reshape(-1)
+    nulls = np.flatnonzero(np.isnan(scaled))
+    scaled[nulls] = 0
+    return {'values': scaled.astype(np.int64), 'nulls': nulls}
@@ -0,0 +1,264 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+from app.core import deadline
+from app.core.cache import cache
+from app.core.circuit_breaker import OPEN, circuit_breakers
+from app.core.config import settings
+from app.core.single_flight import single_flight
+from app.services.av_series import PriceSeries, interval_minutes, resample_ohlcv
+from app.services.data_providers import CAPABILITIES, PROVIDERS, MarketDataProvider
+
+
+class ProviderHealth:
+    """Latency and outcome counters for one provider.
+
+    Whether a provider is healthy is up to its upstream's circuit breaker;
+    empty answers (no data for that symbol) are misses, not failures.
+    """
+
+    # Weight of the newest sample in the latency moving average
+    LATENCY_ALPHA = 0.2
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.successes = 0
+        self.misses = 0
+        self.failures = 0
+        self.backup_wins = 0
+        self.last_error: Optional[str] = None
+
+    def record(self, elapsed: float, answered: bool):
+        self.latency = elapsed if self.latency is None else (
+            self.LATENCY_ALPHA * elapsed + (1 - self.LATENCY_ALPHA) * self.latency
+        )
+        if answered:
+            self.successes += 1
+        else:
+            self.misses += 1
+
+    def record_failure(self, error: BaseException):
+        self.failures += 1
+        self.last_error = str(error) or error.__class__.__name__
+
+    def stats(self) -> Dict:
+        return {
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "successes": self.successes,
+            "misses": self.misses,
+            "failures": self.failures,
+            "backup_wins": self.backup_wins,
+            "last_error": self.last_error
+        }
+
+
+class MarketDataRegistry:
+    """Routes market-data calls to providers by capability and health, with hedged requests.
+
+    Providers are tried in configured order, those whose upstream circuit is
+    open last (they would only fail fast). If the
+    current provider has not answered within ``hedge_delay`` the next one is
+    fired as well and whichever returns data first wins; a provider that
+    fails or has no data hands over to the next immediately. Hedging trades
+    some extra upstream quota for a bounded tail latency. Once a call is
+    settled, losers that have not started are cancelled and those still
+    waiting for a rate-limit token give up without spending it; losers
+    already upstream run to completion so their outcome still counts
+    towards provider health. Every call is bounded by the current request
+    deadline as well as ``timeout``.
+    """
+
+    def __init__(
+        self,
+        providers: List[MarketDataProvider],
+        hedge_delay: float,
+        timeout: float,
+        max_workers: int
+    ):
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-data")
+        self._lock = threading.Lock()
+        self._health = {provider.name: ProviderHealth() for provider in providers}
+        self._counters = {"calls": 0, "hedged": 0, "failovers": 0, "unanswered": 0}
+
+    def route(self, capability: str, ticker: Optional[str] = None) -> List[MarketDataProvider]:
+        """Providers able to serve a call in configured order, open circuits last"""
+        candidates = [
+            provider for provider in self.providers
+            if capability in provider.capabilities
+            and provider.available()
+            and (ticker is None or provider.handles(ticker))
+        ]
+        return sorted(candidates, key=lambda provider: circuit_breakers.get(provider.name).state == OPEN)
+
+    def _invoke(self, provider: MarketDataProvider, capability: str, args: tuple, cancelled: threading.Event) -> Any:
+        """Run one provider call on a pool thread, recording its latency and outcome"""
+        start = time.monotonic()
+        try:
+            with deadline.cancel_scope(cancelled):
+                result = getattr(provider, capability)(*args)
+        except deadline.CallCancelled:
+            # Abandoned before reaching upstream: says nothing about the provider
+            raise
+        except Exception as e:
+            with self._lock:
+                self._health[provider.name].record_failure(e)
+            raise
+        with self._lock:
+            self._health[provider.name].record(time.monotonic() - start, bool(result))
+        return result
+
+    def call(self, capability: str, *args, ticker: Optional[str] = None) -> Any:
+        """First non-empty answer from the routed providers, or None if none answered in time"""
+        if capability not in CAPABILITIES:
+            raise ValueError(f"Unknown market data capability: {capability}")
+
+        queue = self.route(capability, ticker)
+        with self._lock:
+            self._counters["calls"] += 1
+        if not queue:
+            return None
+
+        expires_at = time.monotonic() + deadline.bounded(self.timeout)
+        in_flight: Dict[Future, MarketDataProvider] = {}
+        first = queue[0]
+        cancelled = threading.Event()
+
+        def launch():
+            provider = queue.pop(0)
+            # Pool threads run in a copy of this context so providers see the request deadline
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, self._invoke, provider, capability, args, cancelled)
+            in_flight[future] = provider
+
+        try:
+            launch()
+            while in_flight:
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                budget = min(self.hedge_delay, remaining) if queue and self.hedge_delay > 0 else remaining
+                done, _ = wait(in_flight, timeout=budget, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Nobody answered within the hedge budget: fire the next provider too
+                    if queue and self.hedge_delay > 0:
+                        with self._lock:
+                            self._counters["hedged"] += 1
+                        launch()
+                    continue
+
+                for future in done:
+                    provider = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None and future.result():
+                        if provider is not first:
+                            with self._lock:
+                                self._health[provider.name].backup_wins += 1
+                        return future.result()
+                    if error is not None:
+                        print(f"{provider.name} {capability} failed for {args}: {error}")
+
+                # Nothing useful came back and nothing else is running: fail over
+                if queue and not in_flight:
+                    with self._lock:
+                        self._counters["failovers"] += 1
+                    launch()
+
+            with self._lock:
+                self._counters["unanswered"] += 1
+            return None
+        finally:
+            # The call is settled: losers not yet started are dropped, the rest stop before spending quota
+            cancelled.set()
+            for future in in_flight:
+                future.cancel()
+
+    def quote(self, ticker: str) -> Optional[Dict]:
+        return self.call("quote", ticker, ticker=ticker)
+
+    def daily_bars(self, ticker: str, outputsize: str = "full") -> Optional[PriceSeries]:
+        return self.call("daily_bars", ticker, outputsize, ticker=ticker)
+
+    def search(self, query: str) -> List[Dict]:
+        return self.call("search", query) or []
+
+    def overview(self, ticker: str) -> Optional[Dict]:
+        return self.call("overview", ticker, ticker=ticker)
+
+    def intraday_base(self, ticker: str) -> Optional[PriceSeries]:
+        """The cached 1min series every intraday interval is built from, from whichever provider answered.
+
+        Cached under its own key: "intraday"/ticker belongs to the Alpha
+        Vantage client, whose expired base is extended in place and must
+        not be replaced by another provider's bars.
+        """
+        cached = cache.get("intraday", ("market_data", ticker))
+        if cached is not None:
+            return cached
+
+        return single_flight.do(("market_data.intraday", ticker, ()), lambda: self._fetch_intraday_base(ticker))
+
+    def _fetch_intraday_base(self, ticker: str) -> Optional[PriceSeries]:
+        series = self.call("intraday", ticker, ticker=ticker)
+        if series:
+            cache.set("intraday", ("market_data", ticker), series)
+        return series
+
+    def intraday_series(self, ticker: str, interval: str = "60min") -> Optional[PriceSeries]:
+        """Intraday bars for any interval, resampled locally from the 1min series"""
+        base = self.intraday_base(ticker)
+        if base is None:
+            return None
+        minutes = interval_minutes(interval)
+        return base if minutes == 1 else resample_ohlcv(base, minutes)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            health = {name: record.stats() for name, record in self._health.items()}
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "hedge_delay_ms": round(self.hedge_delay * 1000),
+            "providers": [
+                {
+                    "name": provider.name,
+                    "available": provider.available(),
+                    "capabilities": sorted(provider.capabilities),
+                    "circuit": circuit_breakers.get(provider.name).state,
+                    **health[provider.name]
+                }
+                for provider in self.providers
+            ]
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_registry() -> MarketDataRegistry:
+    """Registry for the providers listed in MARKET_DATA_PROVIDERS, in that order"""
+    providers = []
+    for name in settings.MARKET_DATA_PROVIDERS.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in PROVIDERS:
+            print(f"Unknown market data provider '{name}', skipping")
+            continue
+        providers.append(PROVIDERS[name]())
+
+    return MarketDataRegistry(
+        providers,
+        hedge_delay=settings.MARKET_DATA_HEDGE_DELAY_MS / 1000,
+        timeout=settings.MARKET_DATA_TIMEOUT,
+        max_workers=settings.MARKET_DATA_WORKERS
+    )
+
+
+# Shared by every service so provider health is tracked across all callers
+market_data = build_registry()
@@ -1,60 +1,106 @@
-import requests
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-import random
+import asyncio
+import calendar
+import contextvars
+import httpx
+import orjson
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from app.core import deadline
+from app.core.access_tracker import quote_access
+from app.core.background import background_refresher
+from app.core.cache import CacheEntry, cache
+from app.core.cassette import async_http_client
+from app.core.circuit_breaker import circuit_breakers
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.single_flight import single_flight
 from app.models.schemas import Quote, IndexData, ChartData
+from app.services.alpha_vantage import AlphaVantageClient
+from app.services.av_series import PriceSeries, align_panel, interval_minutes, resample_ohlcv
+from app.services.fundamentals import fundamentals_store
+from app.services.indicator_stream import STREAMED_INDICATORS, indicator_outputs, indicator_streams
+from app.services.indicators import INDICATOR_OUTPUTS, outputs, to_columns, to_list
+from app.services.market_data import market_data
+from app.services.price_history import price_history
+from app.services.quote_lookup import quote_from_dict, quote_lookup
+from app.services.symbol_index import symbol_index
+from app.services.synthetic_market import synthetic_market
+
+# Major market indices shown on the dashboard
+INDEX_SYMBOLS = {
+    '^GSPC': 'S&P 500',
+    '^IXIC': 'NASDAQ',
+    '^DJI': 'Dow Jones',
+    '^RUT': 'Russell 2000'
+}
+
+# 60min bars shown for intraday chart periods
+INTRADAY_PERIOD_BARS = {'1D': 10, '5D': 40}
+
+# Latest bars returned per intraday interval (the size of a compact Alpha Vantage response)
+INTRADAY_BARS = 100
+
+# Calendar length of daily chart periods; YTD starts on Jan 1 and MAX is the whole history
+PERIOD_MONTHS = {'1M': 1, '3M': 3, '6M': 6, '1Y': 12, '5Y': 60}
+
+# Technical endpoint indicators: those kept in streaming per-ticker state
+TECHNICAL_OUTPUTS = {name: INDICATOR_OUTPUTS[name] for name in STREAMED_INDICATORS}
+
+
+def period_start(period: str, end: date) -> Optional[date]:
+    """First calendar day of a daily chart period ending on `end`, or None for the whole history"""
+    if period == 'MAX':
+        return None
+    if period == 'YTD':
+        return date(end.year, 1, 1)
+
+    year, month = divmod(end.year * 12 + end.month - 1 - PERIOD_MONTHS.get(period, 1), 12)
+    month += 1
+    return date(year, month, min(end.day, calendar.monthrange(year, month)[1]))
+
+
+def period_days(period: str) -> Optional[int]:
+    """Most calendar days a daily chart period can span, whatever day it ends on; None for the whole history"""
+    if period == 'MAX':
+        return None
+    if period == 'YTD':
+        return 366
+    return PERIOD_MONTHS.get(period, 1) * 31 + 1
 
 
 class MarketService:
     def __init__(self):
-        self.av_key = settings.ALPHA_VANTAGE_API_KEY
         self.av_base_url = "https://www.alphavantage.co/query"
-        # In-memory cache to reduce API calls
-        self.quote_cache = {}
-        self.chart_cache = {}
-        self.cache_ttl = 60  # seconds
+        # Used for REALTIME_BULK_QUOTES batching; single-symbol calls go through the provider registry
+        self.av_client = AlphaVantageClient()
+        # Upper bound on in-flight upstream requests for multi-quote fetches
+        self.max_concurrency = settings.QUOTE_FETCH_CONCURRENCY
+        # Serve seeded synthetic data instead of calling Alpha Vantage
+        self.synthetic = settings.MARKET_DATA_SOURCE == 'synthetic'
+
+    async def _av_get_async(self, client: httpx.AsyncClient, params: Dict) -> Dict:
+        """GET the Alpha Vantage API within the shared rate limit, waiting for a token off the event loop"""
+        with circuit_breakers.guard('alpha_vantage'):
+            await asyncio.to_thread(rate_limiter.acquire, 'alpha_vantage')
+            response = await client.get(self.av_base_url, params=params, timeout=deadline.bounded(10))
+            response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        if self.av_client.is_throttled(data):
+            rate_limiter.drain('alpha_vantage')
+        return data
 
     def get_quote(self, ticker: str) -> Quote:
-        """Get real-time quote for a ticker using Alpha Vantage"""
+        """Get real-time quote for a ticker from the first quote tier that has it"""
         try:
-            # Check cache first
-            cache_key = f"{ticker}_{int(datetime.now().timestamp() // self.cache_ttl)}"
-            if cache_key in self.quote_cache:
-                return self.quote_cache[cache_key]
-
-            # Fetch from Alpha Vantage
-            params = {
-                'function': 'GLOBAL_QUOTE',
-                'symbol': ticker,
-                'apikey': self.av_key
-            }
+            quote_access.record(ticker)
 
-            response = requests.get(self.av_base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'Global Quote' in data and data['Global Quote']:
-                quote_data = data['Global Quote']
-                current_price = float(quote_data.get('05. price', 0))
-                previous_close = float(quote_data.get('08. previous close', current_price))
-                change = float(quote_data.get('09. change', 0))
-                change_percent = float(quote_data.get('10. change percent', '0').replace('%', ''))
-
-                quote = Quote(
-                    ticker=ticker,
-                    price=round(current_price, 2),
-                    change=round(change, 2),
-                    change_percent=round(change_percent, 2),
-                    volume=int(quote_data.get('06. volume', 0)) if quote_data.get('06. volume') else None,
-                    high=float(quote_data.get('03. high', 0)) if quote_data.get('03. high') else None,
-                    low=float(quote_data.get('04. low', 0)) if quote_data.get('04. low') else None,
-                    open=float(quote_data.get('02. open', 0)) if quote_data.get('02. open') else None,
-                    previous_close=previous_close
-                )
-
-                # Cache the result
-                self.quote_cache[cache_key] = quote
+            # A stale quote is served while it refreshes in the background
+            quote = quote_lookup.get(ticker)
+
+            if quote:
                 return quote
             else:
                 # Fallback to mock data if API limit reached
@@ -65,56 +111,173 @@ class MarketService:
             print(f"Error fetching quote for {ticker}: {e}")
             return self._get_mock_quote(ticker)
 
-    def _get_mock_quote(self, ticker: str) -> Quote:
-        """Return mock data when API is unavailable (for development/testing)"""
-        # Mock prices for common tickers
-        mock_prices = {
-            'AAPL': 175.43, 'MSFT': 380.50, 'GOOGL': 140.25, 'AMZN': 155.80,
-            'TSLA': 242.15, 'META': 485.90, 'NVDA': 495.20, 'AMD': 165.75,
-            '^GSPC': 4550.50, '^IXIC': 14200.30, '^DJI': 35800.20, '^RUT': 2050.75,
-            'JPM': 145.30, 'BAC': 28.75, 'WMT': 165.20, 'V': 245.80,
-            'MA': 385.50, 'DIS': 95.40, 'NFLX': 425.60, 'PYPL': 62.30
-        }
+    def _serve_cached(self, namespace: str, key: Hashable, refresh: Callable[[], object]):
+        """Return a cached model annotated with its age, scheduling a refresh if it is stale"""
+        entry = cache.get_entry(namespace, key)
+        if entry is None:
+            return None
 
-        base_price = mock_prices.get(ticker, 100.0)
-        # Add some random variation
-        change_percent = random.uniform(-3, 3)
-        change = base_price * (change_percent / 100)
-
-        return Quote(
-            ticker=ticker,
-            price=round(base_price, 2),
-            change=round(change, 2),
-            change_percent=round(change_percent, 2),
-            volume=random.randint(5000000, 50000000),
-            market_cap=random.randint(10000000000, 2000000000000),
-            pe_ratio=round(random.uniform(10, 50), 2),
-            high=round(base_price * 1.02, 2),
-            low=round(base_price * 0.98, 2),
-            open=round(base_price * 0.99, 2),
-            previous_close=round(base_price - change, 2)
-        )
+        if entry.stale:
+            background_refresher.schedule((namespace, key), refresh)
+        return entry.value.model_copy(update={'stale': entry.stale, 'age_seconds': round(entry.age, 1)})
+
+    def _get_mock_quote(self, ticker: str) -> Quote:
+        """Return synthetic data when API is unavailable (for development/testing)"""
+        return synthetic_market.quote(ticker)
 
     def get_multiple_quotes(self, tickers: List[str]) -> List[Quote]:
-        """Get quotes for multiple tickers"""
+        """Get quotes for multiple tickers, falling back to mock data per failed ticker"""
+        results, errors = self._run_async(self._gather_quotes(tickers))
+
         quotes = []
-        for ticker in tickers:
-            quote = self.get_quote(ticker)
+        for ticker, quote in zip(tickers, results):
+            if quote is None:
+                print(f"Error fetching quote for {ticker}: {errors.get(ticker)}, using mock data")
+                quote = self._get_mock_quote(ticker)
             quotes.append(quote)
         return quotes
 
+    def fetch_quotes(self, tickers: List[str]) -> Dict:
+        """Get quotes for multiple tickers concurrently without mock fallback.
+
+        Successful quotes are returned in input order; failed tickers are
+        reported in ``errors`` instead of failing the whole batch.
+        """
+        results, errors = self._run_async(self._gather_quotes(tickers))
+        return {
+            'quotes': [quote for quote in results if quote is not None],
+            'errors': errors
+        }
+
+    def refresh_quotes(self, tickers: List[str], bulk: bool = True) -> Dict:
+        """Re-fetch quotes into the cache regardless of freshness; used by the refresh scheduler"""
+        results, errors = self._run_async(self._gather_quotes(tickers, use_cache=False, bulk=bulk))
+        return {
+            'refreshed': sum(quote is not None for quote in results),
+            'errors': errors
+        }
+
+    def refresh_bulk_quotes(self, tickers: List[str]) -> Dict[str, Quote]:
+        """Re-fetch quotes with REALTIME_BULK_QUOTES only, no per-ticker fallback; returns the tickers it got"""
+        async def fetch():
+            async with async_http_client(timeout=10) as client:
+                return await self._fetch_bulk_quotes_async(client, asyncio.Semaphore(self.max_concurrency), tickers)
+
+        return self._run_async(fetch())
+
+    async def _gather_quotes(
+        self,
+        tickers: List[str],
+        use_cache: bool = True,
+        bulk: bool = True
+    ) -> Tuple[List[Optional[Quote]], Dict[str, str]]:
+        """Fetch uncached quotes concurrently; returns per-position results and per-ticker errors"""
+        results: List[Optional[Quote]] = [None] * len(tickers)
+        errors: Dict[str, str] = {}
+
+        # Serve what we can from cache and collapse duplicate tickers
+        pending: Dict[str, List[int]] = {}
+        for i, ticker in enumerate(tickers):
+            if not use_cache:
+                pending.setdefault(ticker, []).append(i)
+                continue
+
+            quote_access.record(ticker)
+            cached = quote_lookup.get_cached(ticker)
+            if cached:
+                results[i] = cached
+            else:
+                pending.setdefault(ticker, []).append(i)
+
+        if not pending:
+            return results, errors
+
+        if self.synthetic:
+            for ticker, quote in zip(pending, quote_lookup.store(synthetic_market.quotes(list(pending)))):
+                for i in pending[ticker]:
+                    results[i] = quote
+            return results, errors
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Batched upstream calls first; whatever they miss goes per-ticker through the provider registry
+        if bulk and settings.ALPHA_VANTAGE_BULK_QUOTES and len(pending) > 1:
+            async with async_http_client(timeout=10) as client:
+                bulk_quotes = await self._fetch_bulk_quotes_async(client, semaphore, list(pending))
+            for ticker, quote in bulk_quotes.items():
+                for i in pending.pop(ticker, []):
+                    results[i] = quote
+
+        # Tickers still outstanding when the request deadline passes are reported as errors
+        budget = deadline.remaining()
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(self._fetch_quote_async(semaphore, ticker), budget) for ticker in pending),
+            return_exceptions=True
+        )
+
+        for (ticker, positions), outcome in zip(pending.items(), outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                errors[ticker] = "Request deadline exceeded"
+                continue
+            if isinstance(outcome, Exception):
+                errors[ticker] = str(outcome) or outcome.__class__.__name__
+                continue
+            for i in positions:
+                results[i] = outcome
+
+        return results, errors
+
+    async def _fetch_quote_async(self, semaphore: asyncio.Semaphore, ticker: str) -> Quote:
+        """Fetch a single quote through the provider registry, holding a concurrency slot meanwhile"""
+        async with semaphore:
+            quote = await asyncio.to_thread(quote_lookup.refresh, ticker)
+
+        if not quote:
+            raise ValueError("API limit reached or data unavailable")
+        return quote
+
+    async def _fetch_bulk_quotes_async(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        tickers: List[str]
+    ) -> Dict[str, Quote]:
+        """Fetch quotes in REALTIME_BULK_QUOTES batches; tickers that fail are left out"""
+        async def fetch_batch(batch: List[str]) -> Dict[str, Dict]:
+            async with semaphore:
+                data = await self._av_get_async(client, self.av_client.bulk_quote_params(batch))
+            return self.av_client.parse_bulk_quotes(data)
+
+        # Alpha Vantage has no index quotes; those go per-ticker to providers that do
+        batches = self.av_client.bulk_quote_batches([ticker for ticker in tickers if not ticker.startswith('^')])
+        outcomes = await asyncio.gather(*(fetch_batch(batch) for batch in batches), return_exceptions=True)
+
+        fetched = []
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error fetching bulk quotes for {len(batch)} tickers: {outcome}")
+                continue
+            fetched.extend(quote_from_dict(quote_data) for quote_data in outcome.values())
+
+        return {quote.ticker: quote for quote in quote_lookup.store(fetched)}
+
+    @staticmethod
+    def _run_async(coro):
+        """Run a coroutine to completion from sync code, even if an event loop is already running"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        # Called from inside an event loop: run on a fresh loop in a worker thread, keeping the request deadline
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
     def get_indices(self) -> List[IndexData]:
         """Get major market indices"""
-        indices = {
-            '^GSPC': 'S&P 500',
-            '^IXIC': 'NASDAQ',
-            '^DJI': 'Dow Jones',
-            '^RUT': 'Russell 2000'
-        }
+        quotes = self.get_multiple_quotes(list(INDEX_SYMBOLS))
 
         results = []
-        for symbol, name in indices.items():
-            quote = self.get_quote(symbol)
+        for (symbol, name), quote in zip(INDEX_SYMBOLS.items(), quotes):
             results.append(IndexData(
                 symbol=symbol,
                 name=name,
@@ -128,80 +291,21 @@ class MarketService:
     def get_chart_data(self, ticker: str, period: str = '1M') -> ChartData:
         """Get historical chart data for a ticker"""
         try:
-            cache_key = f"chart_{ticker}_{period}"
-            if cache_key in self.chart_cache:
-                return self.chart_cache[cache_key]
-
-            # Map periods to Alpha Vantage functions
-            if period in ['1D', '5D']:
-                function = 'TIME_SERIES_INTRADAY'
-                interval = '60min'
+            if period in INTRADAY_PERIOD_BARS:
+                cached = self._serve_cached('chart', (ticker, period), lambda: self._load_chart_data(ticker, period))
+                if cached:
+                    return cached
+                chart_data = self._load_chart_data(ticker, period)
             else:
-                function = 'TIME_SERIES_DAILY'
-                interval = None
-
-            params = {
-                'function': function,
-                'symbol': ticker,
-                'apikey': self.av_key,
-                'outputsize': 'compact'
-            }
-
-            if interval:
-                params['interval'] = interval
-
-            response = requests.get(self.av_base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            # Parse the response
-            time_series_key = None
-            for key in data.keys():
-                if 'Time Series' in key:
-                    time_series_key = key
-                    break
-
-            if time_series_key and data.get(time_series_key):
-                time_series = data[time_series_key]
-
-                timestamps = []
-                opens = []
-                highs = []
-                lows = []
-                closes = []
-                volumes = []
-
-                # Sort by date
-                sorted_dates = sorted(time_series.keys())
-
-                # Limit data points based on period
-                limit_map = {
-                    '1D': 10, '5D': 40, '1M': 30, '3M': 90,
-                    '6M': 180, '1Y': 252, 'YTD': 252, '5Y': 1260, 'MAX': 5000
-                }
-                limit = limit_map.get(period, 30)
-                sorted_dates = sorted_dates[-limit:]
-
-                for date_str in sorted_dates:
-                    day_data = time_series[date_str]
-                    timestamps.append(date_str)
-                    opens.append(round(float(day_data['1. open']), 2))
-                    highs.append(round(float(day_data['2. high']), 2))
-                    lows.append(round(float(day_data['3. low']), 2))
-                    closes.append(round(float(day_data['4. close']), 2))
-                    volumes.append(int(day_data['5. volume']))
-
-                chart_data = ChartData(
-                    timestamp=timestamps,
-                    open=opens,
-                    high=highs,
-                    low=lows,
-                    close=closes,
-                    volume=volumes
-                )
-
-                # Cache the result
-                self.chart_cache[cache_key] = chart_data
+                # Every daily period is a slice of one cached series per ticker
+                chart_data = None
+                entry = self._get_daily_series(ticker)
+                if entry:
+                    chart_data = self._chart_from_series(self.slice_period(entry.value, period)).model_copy(
+                        update={'stale': entry.stale, 'age_seconds': round(entry.age, 1)}
+                    )
+
+            if chart_data:
                 return chart_data
             else:
                 # Return mock chart data if API limit reached
@@ -211,76 +315,163 @@ class MarketService:
             print(f"Error fetching chart data for {ticker}: {e}")
             return self._get_mock_chart_data(ticker, period)
 
-    def _get_mock_chart_data(self, ticker: str, period: str) -> ChartData:
-        """Generate mock chart data for development/testing"""
-        # Determine number of data points
-        point_count_map = {
-            '1D': 10, '5D': 40, '1M': 30, '3M': 90,
-            '6M': 180, '1Y': 252, 'YTD': 200, '5Y': 1260, 'MAX': 1260
-        }
-        num_points = point_count_map.get(period, 30)
-
-        # Get base price from mock quote
-        quote = self._get_mock_quote(ticker)
-        base_price = quote.price
+    def get_period_series(self, ticker: str, period: str) -> Optional[PriceSeries]:
+        """Daily bars for a chart period as NumPy columns, or None if the ticker has no stored history"""
+        entry = self._get_daily_series(ticker)
+        return self.slice_period(entry.value, period) if entry else None
+
+    @staticmethod
+    def slice_period(series: PriceSeries, period: str) -> PriceSeries:
+        """Bars from the period's calendar start through the latest bar"""
+        if not len(series):
+            return series
+        start = period_start(period, series.timestamps[-1].astype(date))
+        return series.since(start) if start else series
+
+    def _get_daily_series(self, ticker: str) -> Optional[CacheEntry]:
+        """The canonical daily series for a ticker with its cache age; stale series refresh in the background"""
+        entry = cache.get_entry('series', ticker)
+        if entry:
+            if entry.stale:
+                background_refresher.schedule(('series', ticker), lambda: self._load_daily_series(ticker))
+            return entry
+
+        series = self._load_daily_series(ticker)
+        return CacheEntry(series, 0.0, False) if series else None
+
+    def _load_daily_series(self, ticker: str) -> Optional[PriceSeries]:
+        return single_flight.do(('market.series', ticker, ()), lambda: self._fetch_daily_series(ticker))
+
+    def _fetch_daily_series(self, ticker: str) -> Optional[PriceSeries]:
+        """Read the full stored history (syncing new bars first if due) and cache it"""
+        if self.synthetic:
+            series = synthetic_market.daily(ticker)
+            cache.set('series', ticker, series)
+            return series
+        return self._cache_columns(ticker, price_history.get_columns(ticker))
+
+    @staticmethod
+    def _cache_columns(ticker: str, columns: Dict[str, np.ndarray]) -> Optional[PriceSeries]:
+        if not len(columns['date']):
+            return None
+
+        # Copy out of the memory maps so cached series don't pin open files
+        series = PriceSeries(*(np.array(columns[name]) for name in ('date', 'open', 'high', 'low', 'close', 'volume')))
+        cache.set('series', ticker, series)
+        return series
+
+    def _get_daily_series_many(self, tickers: List[str], limit: Optional[int] = None) -> Dict[str, PriceSeries]:
+        """Daily series for many tickers without a round trip per ticker.
+
+        Cached series are served as _get_daily_series would; the rest come
+        from one bulk read of the stored histories, and only tickers due an
+        upstream sync are loaded one by one, concurrently under the request
+        deadline. Tickers with no history are left out. With `limit` the
+        bulk read takes only each ticker's latest `limit` bars, and those
+        partial series are not cached.
+        """
+        found, misses = {}, []
+        for ticker in tickers:
+            entry = cache.get_entry('series', ticker)
+            if entry is None:
+                misses.append(ticker)
+                continue
+            if entry.stale:
+                background_refresher.schedule(('series', ticker), lambda ticker=ticker: self._load_daily_series(ticker))
+            found[ticker] = entry.value
+
+        if not misses:
+            return found
+        if self.synthetic:
+            for ticker, (series, _) in synthetic_market.generate(misses).items():
+                cache.set('series', ticker, series)
+                found[ticker] = series
+            return found
+
+        stored, due = price_history.get_columns_many(misses, limit)
+        for ticker, columns in stored.items():
+            if not len(columns['date']):
+                continue
+            # Already copies of the files, not memory maps
+            found[ticker] = PriceSeries(*(columns[name] for name in ('date', 'open', 'high', 'low', 'close', 'volume')))
+            if limit is None:
+                cache.set('series', ticker, found[ticker])
+        if due:
+            found.update(self._run_async(self._gather_series(due)))
+        return found
+
+    async def _gather_series(self, tickers: List[str]) -> Dict[str, PriceSeries]:
+        """Load daily series concurrently, max_concurrency at a time; tickers still loading at the deadline are left out"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def load(ticker: str) -> Optional[CacheEntry]:
+            async with semaphore:
+                return await asyncio.to_thread(self._get_daily_series, ticker)
+
+        budget = deadline.remaining()
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(load(ticker), budget) for ticker in tickers),
+            return_exceptions=True
+        )
 
-        timestamps = []
-        opens = []
-        highs = []
-        lows = []
-        closes = []
-        volumes = []
+        found = {}
+        for ticker, outcome in zip(tickers, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                print(f"Request deadline exceeded loading daily series for {ticker}")
+            elif isinstance(outcome, Exception):
+                print(f"Error loading daily series for {ticker}: {outcome}")
+            elif outcome is not None and len(outcome.value):
+                found[ticker] = outcome.value
+        return found
+
+    @staticmethod
+    def _chart_from_series(series: PriceSeries) -> ChartData:
+        return ChartData(
+            timestamp=series.labels(),
+            open=np.round(series.open, 2).tolist(),
+            high=np.round(series.high, 2).tolist(),
+            low=np.round(series.low, 2).tolist(),
+            close=np.round(series.close, 2).tolist(),
+            volume=series.volume.tolist()
+        )
 
-        current_date = datetime.now()
+    def _load_chart_data(self, ticker: str, period: str) -> Optional[ChartData]:
+        """Fetch intraday chart data, coalescing with any identical fetch already in flight"""
+        return single_flight.do(
+            ('market.chart', ticker, (period,)),
+            lambda: self._fetch_chart_data(ticker, period)
+        )
 
-        for i in range(num_points):
-            date = current_date - timedelta(days=num_points - i)
-            timestamps.append(date.strftime('%Y-%m-%d'))
+    def _fetch_chart_data(self, ticker: str, period: str) -> Optional[ChartData]:
+        """Build an intraday chart period from 60min bars and cache it"""
+        if self.synthetic:
+            series = resample_ohlcv(synthetic_market.intraday(ticker), 60)
+        else:
+            series = market_data.intraday_series(ticker, '60min')
+        if not series:
+            return None
 
-            # Generate realistic OHLC data
-            open_price = base_price * (1 + random.uniform(-0.15, 0.15))
-            close_price = open_price * (1 + random.uniform(-0.03, 0.03))
-            high_price = max(open_price, close_price) * (1 + random.uniform(0, 0.02))
-            low_price = min(open_price, close_price) * (1 - random.uniform(0, 0.02))
+        chart_data = self._chart_from_series(series[-INTRADAY_PERIOD_BARS[period]:])
 
-            opens.append(round(open_price, 2))
-            highs.append(round(high_price, 2))
-            lows.append(round(low_price, 2))
-            closes.append(round(close_price, 2))
-            volumes.append(random.randint(10000000, 100000000))
+        # Cache the result
+        cache.set('chart', (ticker, period), chart_data)
+        return chart_data
 
-        return ChartData(
-            timestamp=timestamps,
-            open=opens,
-            high=highs,
-            low=lows,
-            close=closes,
-            volume=volumes
-        )
+    def _get_mock_chart_data(self, ticker: str, period: str) -> ChartData:
+        """Synthetic chart data for development/testing, consistent with the mock quote"""
+        if period in INTRADAY_PERIOD_BARS:
+            series = resample_ohlcv(synthetic_market.intraday(ticker), 60)[-INTRADAY_PERIOD_BARS[period]:]
+        else:
+            series = self.slice_period(synthetic_market.daily(ticker), period)
+        return self._chart_from_series(series)
 
     def search_stocks(self, query: str) -> List[Dict]:
         """Search for stocks by symbol or name"""
         try:
-            params = {
-                'function': 'SYMBOL_SEARCH',
-                'keywords': query,
-                'apikey': self.av_key
-            }
-
-            response = requests.get(self.av_base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'bestMatches' in data:
-                results = []
-                for match in data['bestMatches'][:5]:
-                    results.append({
-                        'symbol': match['1. symbol'],
-                        'name': match['2. name'],
-                        'type': match['3. type']
-                    })
-                return results
-            return []
+            return [
+                {'symbol': match['ticker'], 'name': match['name'], 'type': match['type']}
+                for match in symbol_index.lookup(query, limit=5)
+            ]
         except Exception as e:
             print(f"Error searching stocks: {e}")
             return []
@@ -294,8 +485,7 @@ class MarketService:
         ]
 
         quotes = []
-        for ticker in popular_tickers:
-            quote = self.get_quote(ticker)
+        for quote in self.get_multiple_quotes(popular_tickers):
             if quote.price > 0:
                 quotes.append({
                     'ticker': quote.ticker,
@@ -315,44 +505,14 @@ class MarketService:
     def get_intraday_data(self, ticker: str, interval: str = "5min") -> List[Dict]:
         """Get intraday price data for detailed charts"""
         try:
-            # Check cache first
-            cache_key = f"intraday_{ticker}_{interval}_{int(datetime.now().timestamp() // 60)}"
-            if cache_key in self.chart_cache:
-                return self.chart_cache[cache_key]
-
-            # Fetch from Alpha Vantage
-            params = {
-                'function': 'TIME_SERIES_INTRADAY',
-                'symbol': ticker,
-                'interval': interval,
-                'apikey': self.av_key,
-                'outputsize': 'compact'  # Last 100 data points
-            }
+            if self.synthetic:
+                return self._get_mock_intraday_data(ticker, interval)
 
-            response = requests.get(self.av_base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            # Find the time series key
-            time_series_key = f"Time Series ({interval})"
-
-            if time_series_key in data and data[time_series_key]:
-                time_series = data[time_series_key]
-
-                result = []
-                for timestamp, values in sorted(time_series.items()):
-                    result.append({
-                        'timestamp': timestamp,
-                        'open': round(float(values['1. open']), 2),
-                        'high': round(float(values['2. high']), 2),
-                        'low': round(float(values['3. low']), 2),
-                        'close': round(float(values['4. close']), 2),
-                        'volume': int(values['5. volume'])
-                    })
-
-                # Cache the result
-                self.chart_cache[cache_key] = result
-                return result
+            # One cached 1min series serves every interval
+            series = market_data.intraday_series(ticker, interval)
+
+            if series:
+                return series[-INTRADAY_BARS:].to_rows('timestamp', decimals=2)
             else:
                 # Return mock intraday data if API limit reached
                 print(f"API limit reached for intraday data {ticker}, using mock data")
@@ -363,87 +523,17 @@ class MarketService:
             return self._get_mock_intraday_data(ticker, interval)
 
     def _get_mock_intraday_data(self, ticker: str, interval: str) -> List[Dict]:
-        """Generate mock intraday data for development/testing"""
-        # Determine number of data points based on interval
-        interval_points = {
-            '1min': 60, '5min': 78, '15min': 26,
-            '30min': 13, '60min': 7
-        }
-        num_points = interval_points.get(interval, 78)
-
-        # Get base price
-        quote = self._get_mock_quote(ticker)
-        base_price = quote.price
-
-        result = []
-        current_time = datetime.now()
-
-        # Parse interval to minutes
-        interval_minutes = int(interval.replace('min', ''))
-
-        for i in range(num_points):
-            time_offset = timedelta(minutes=interval_minutes * (num_points - i))
-            timestamp = current_time - time_offset
-
-            # Generate realistic intraday movement
-            open_price = base_price * (1 + random.uniform(-0.02, 0.02))
-            close_price = open_price * (1 + random.uniform(-0.01, 0.01))
-            high_price = max(open_price, close_price) * (1 + random.uniform(0, 0.005))
-            low_price = min(open_price, close_price) * (1 - random.uniform(0, 0.005))
-
-            result.append({
-                'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'open': round(open_price, 2),
-                'high': round(high_price, 2),
-                'low': round(low_price, 2),
-                'close': round(close_price, 2),
-                'volume': random.randint(100000, 1000000)
-            })
-
-        return result
+        """Synthetic intraday bars for development/testing, resampled from synthetic 1min bars"""
+        series = resample_ohlcv(synthetic_market.intraday(ticker), interval_minutes(interval))
+        return series[-INTRADAY_BARS:].to_rows('timestamp', decimals=2)
 
     def get_company_overview(self, ticker: str) -> Dict:
         """Get detailed company information and fundamentals"""
         try:
-            # Check cache first (24 hour cache for company info)
-            cache_key = f"company_{ticker}_{int(datetime.now().timestamp() // 86400)}"
-            if cache_key in self.quote_cache:
-                return self.quote_cache[cache_key]
-
-            # Fetch from Alpha Vantage
-            params = {
-                'function': 'OVERVIEW',
-                'symbol': ticker,
-                'apikey': self.av_key
-            }
+            # Served from the fundamentals table; upstream is asked only for tickers it has never seen
+            overview = fundamentals_store.overview(ticker)
 
-            response = requests.get(self.av_base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if data and 'Symbol' in data:
-                overview = {
-                    'symbol': data.get('Symbol'),
-                    'name': data.get('Name'),
-                    'description': data.get('Description'),
-                    'sector': data.get('Sector'),
-                    'industry': data.get('Industry'),
-                    'exchange': data.get('Exchange'),
-                    'country': data.get('Country'),
-                    'market_cap': int(data.get('MarketCapitalization', 0)) if data.get('MarketCapitalization') else None,
-                    'pe_ratio': float(data.get('PERatio', 0)) if data.get('PERatio') else None,
-                    'peg_ratio': float(data.get('PEGRatio', 0)) if data.get('PEGRatio') else None,
-                    'dividend_yield': float(data.get('DividendYield', 0)) if data.get('DividendYield') else None,
-                    'eps': float(data.get('EPS', 0)) if data.get('EPS') else None,
-                    'beta': float(data.get('Beta', 0)) if data.get('Beta') else None,
-                    '52_week_high': float(data.get('52WeekHigh', 0)) if data.get('52WeekHigh') else None,
-                    '52_week_low': float(data.get('52WeekLow', 0)) if data.get('52WeekLow') else None,
-                    '50_day_ma': float(data.get('50DayMovingAverage', 0)) if data.get('50DayMovingAverage') else None,
-                    '200_day_ma': float(data.get('200DayMovingAverage', 0)) if data.get('200DayMovingAverage') else None,
-                }
-
-                # Cache the result
-                self.quote_cache[cache_key] = overview
+            if overview:
                 return overview
             else:
                 # Return mock company overview if API limit reached
@@ -456,186 +546,133 @@ class MarketService:
 
     def _get_mock_company_overview(self, ticker: str) -> Dict:
         """Generate mock company overview for development/testing"""
-        mock_companies = {
-            'AAPL': {
-                'name': 'Apple Inc.',
-                'sector': 'Technology',
-                'industry': 'Consumer Electronics',
-                'description': 'Apple Inc. designs, manufactures, and markets smartphones, personal computers, tablets, wearables, and accessories worldwide.'
-            },
-            'MSFT': {
-                'name': 'Microsoft Corporation',
-                'sector': 'Technology',
-                'industry': 'Software',
-                'description': 'Microsoft Corporation develops, licenses, and supports software, services, devices, and solutions worldwide.'
-            },
-            'GOOGL': {
-                'name': 'Alphabet Inc.',
-                'sector': 'Technology',
-                'industry': 'Internet Content & Information',
-                'description': 'Alphabet Inc. provides online advertising services in the United States, Europe, the Middle East, Africa, the Asia-Pacific, Canada, and Latin America.'
-            }
-        }
-
-        company_info = mock_companies.get(ticker, {
-            'name': f'{ticker} Corporation',
-            'sector': 'Technology',
-            'industry': 'Software',
-            'description': f'{ticker} is a leading technology company.'
-        })
-
-        quote = self._get_mock_quote(ticker)
-
-        return {
-            'symbol': ticker,
-            'name': company_info['name'],
-            'description': company_info['description'],
-            'sector': company_info['sector'],
-            'industry': company_info['industry'],
-            'exchange': 'NASDAQ',
-            'country': 'United States',
-            'market_cap': random.randint(100000000000, 3000000000000),
-            'pe_ratio': round(random.uniform(15, 45), 2),
-            'peg_ratio': round(random.uniform(1, 3), 2),
-            'dividend_yield': round(random.uniform(0, 3), 2),
-            'eps': round(random.uniform(1, 10), 2),
-            'beta': round(random.uniform(0.8, 1.5), 2),
-            '52_week_high': round(quote.price * 1.2, 2),
-            '52_week_low': round(quote.price * 0.8, 2),
-            '50_day_ma': round(quote.price * 0.98, 2),
-            '200_day_ma': round(quote.price * 0.95, 2),
-        }
+        return synthetic_market.overview(ticker)
 
     def calculate_technical_indicators(self, ticker: str, indicators: List[str] = None) -> Dict:
-        """Calculate technical indicators on historical data"""
+        """Calculate technical indicators on historical data.
+
+        Indicators are kept current by the ticker's streaming state, so only
+        bars added since the last call are computed; the 6M window is then
+        read from its output history.
+        """
         if indicators is None:
             indicators = ['SMA', 'RSI', 'MACD']
 
         try:
-            # Get historical data (6 months for enough data points)
-            chart_data = self.get_chart_data(ticker, period='6M')
-
-            if not chart_data.close or len(chart_data.close) < 50:
+            entry = self._get_daily_series(ticker)
+            if entry is None:
+                # No stored history: compute over the mock chart data directly
+                chart_data = self.get_chart_data(ticker, period='6M')
+                if not chart_data.close or len(chart_data.close) < 50:
+                    return {}
+                outputs = indicator_outputs(np.asarray(chart_data.close, dtype=np.float64))
+                return self._select_indicators({name: to_list(values) for name, values in outputs.items()},
+                                               indicators, len(chart_data.close))
+
+            # 6 months for enough data points
+            length = len(self.slice_period(entry.value, '6M'))
+            if length < 50:
                 return {}
 
-            closes = chart_data.close
-            results = {}
-
-            # Simple Moving Averages
-            if 'SMA' in indicators:
-                results['sma_20'] = self._calculate_sma(closes, 20)
-                results['sma_50'] = self._calculate_sma(closes, 50)
-                if len(closes) >= 200:
-                    results['sma_200'] = self._calculate_sma(closes, 200)
-
-            # Relative Strength Index
-            if 'RSI' in indicators:
-                results['rsi'] = self._calculate_rsi(closes, 14)
-
-            # MACD
-            if 'MACD' in indicators:
-                macd_data = self._calculate_macd(closes)
-                results['macd'] = macd_data['macd']
-                results['macd_signal'] = macd_data['signal']
-                results['macd_histogram'] = macd_data['histogram']
-
-            return results
+            stream = indicator_streams.get(ticker, entry.value)
+            return self._select_indicators(stream.history, indicators, length)
 
         except Exception as e:
             print(f"Error calculating technical indicators for {ticker}: {e}")
             return {}
 
-    def _calculate_sma(self, prices: List[float], period: int) -> List[float]:
-        """Calculate Simple Moving Average"""
-        sma = []
-        for i in range(len(prices)):
-            if i < period - 1:
-                sma.append(None)
-            else:
-                window = prices[i - period + 1:i + 1]
-                sma.append(round(sum(window) / period, 2))
-        return sma
-
-    def _calculate_rsi(self, prices: List[float], period: int = 14) -> List[float]:
-        """Calculate Relative Strength Index"""
-        if len(prices) < period + 1:
-            return []
-
-        deltas = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
+    @staticmethod
+    def _select_indicators(history: Dict[str, List], indicators: List[str], length: int) -> Dict:
+        """The last `length` values of each requested indicator's outputs"""
+        results = {}
+        for indicator in indicators:
+            for name in TECHNICAL_OUTPUTS.get(indicator, ()):
+                # SMA 200 only once the window itself spans 200 bars
+                if name == 'sma_200' and length < 200:
+                    continue
+                results[name] = list(history[name])[-length:]
+        return results
 
-        rsi = []
-        for i in range(len(gains)):
-            if i < period - 1:
-                rsi.append(None)
-            else:
-                avg_gain = sum(gains[i - period + 1:i + 1]) / period
-                avg_loss = sum(losses[i - period + 1:i + 1]) / period
-
-                if avg_loss == 0:
-                    rsi.append(100)
-                else:
-                    rs = avg_gain / avg_loss
-                    rsi.append(round(100 - (100 / (1 + rs)), 2))
-
-        return rsi
-
-    def _calculate_macd(self, prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Dict:
-        """Calculate MACD (Moving Average Convergence Divergence)"""
-        # Calculate EMAs
-        ema_fast = self._calculate_ema(prices, fast)
-        ema_slow = self._calculate_ema(prices, slow)
-
-        # Calculate MACD line
-        macd_line = []
-        for i in range(len(prices)):
-            if ema_fast[i] is not None and ema_slow[i] is not None:
-                macd_line.append(round(ema_fast[i] - ema_slow[i], 2))
-            else:
-                macd_line.append(None)
+    def get_live_indicators(self, ticker: str) -> Optional[Dict]:
+        """Latest indicator values, previewing today's bar at the live quote price when no bar for today exists yet"""
+        entry = self._get_daily_series(ticker)
+        stream = indicator_streams.get(ticker, entry.value) if entry else None
+        if stream is None:
+            return None
 
-        # Calculate signal line (EMA of MACD)
-        macd_values = [m for m in macd_line if m is not None]
-        signal_line_values = self._calculate_ema(macd_values, signal)
+        quote = quote_lookup.get(ticker)
+        provisional = quote is not None and stream.last < date.today().isoformat()
+        return {
+            'ticker': ticker,
+            'as_of': stream.last,
+            'price': quote.price if quote else None,
+            'provisional': provisional,
+            'indicators': stream.preview(quote.price) if provisional else stream.latest()
+        }
 
-        # Pad signal line to match length
-        signal_line = [None] * (len(macd_line) - len(signal_line_values)) + signal_line_values
+    def calculate_batch_indicators(self, tickers: List[str], indicators: List[str] = None, period: str = '6M',
+                                   latest: bool = False) -> Dict:
+        """Technical indicators for many tickers in one vectorized pass over a (time x ticker) panel.
+
+        Series are loaded in bulk (see _get_daily_series_many), cut to the
+        period plus INDICATOR_WARMUP_BARS of lookback and aligned on their
+        shared dates. The payload is columnar: one timestamp axis, tickers in
+        input order, and per output one whole time-major column of integer
+        hundredths (ticker j at timestamp i is values[i * len(tickers) + j] /
+        scale) with the positions of undefined values in ``nulls``. orjson
+        writes integers several times faster than floats, and a 500-ticker
+        panel has hundreds of thousands of them. With ``latest`` only each
+        ticker's last bar is returned, indexed by ticker, with its date in
+        ``as_of``.
+        """
+        if indicators is None:
+            indicators = ['SMA', 'RSI', 'MACD']
 
-        # Calculate histogram
-        histogram = []
-        for i in range(len(macd_line)):
-            if macd_line[i] is not None and signal_line[i] is not None:
-                histogram.append(round(macd_line[i] - signal_line[i], 2))
-            else:
-                histogram.append(None)
+        tickers = list(dict.fromkeys(tickers))
+        days = period_days(period)
+        loaded = self._get_daily_series_many(tickers, days + settings.INDICATOR_WARMUP_BARS if days else None)
+        found = [ticker for ticker in tickers if ticker in loaded]
+        missing = [ticker for ticker in tickers if ticker not in loaded]
+        if not found:
+            return {'tickers': [], 'timestamps': [], 'scale': 100, 'indicators': {}, 'missing': missing}
+
+        history = [loaded[ticker] for ticker in found]
+        start = period_start(period, max(series.timestamps[-1] for series in history).astype(date))
+        if start is not None:
+            start = np.datetime64(start)
+            history = [
+                series[max(int(np.searchsorted(series.timestamps, start)) - settings.INDICATOR_WARMUP_BARS, 0):]
+                for series in history
+            ]
+
+        index, panel = align_panel(history, ('high', 'low', 'close'))
+        first = int(np.searchsorted(index, start)) if start is not None else 0
+        values = outputs(indicators, panel['close'], panel['high'], panel['low'])
+        # SMA 200 only once the window itself spans 200 bars, as on the single-ticker endpoint
+        if len(index) - first < 200:
+            values.pop('sma_200', None)
+
+        if latest:
+            # Each ticker's own last bar; a ticker that stopped trading is not read at a row it has no bar for
+            has_bar = np.isfinite(panel['close'])
+            last = len(index) - 1 - has_bar[::-1].argmax(axis=0)
+            columns = np.arange(len(found))
+            return {
+                'tickers': found,
+                'as_of': np.datetime_as_string(index[last]).tolist(),
+                'scale': 100,
+                'indicators': {name: to_columns(series[last, columns]) for name, series in values.items()},
+                'missing': missing
+            }
 
         return {
-            'macd': macd_line,
-            'signal': signal_line,
-            'histogram': histogram
+            'tickers': found,
+            'timestamps': np.datetime_as_string(index[first:]).tolist(),
+            'scale': 100,
+            'indicators': {name: to_columns(series[first:]) for name, series in values.items()},
+            'missing': missing
         }
 
-    def _calculate_ema(self, prices: List[float], period: int) -> List[float]:
-        """Calculate Exponential Moving Average"""
-        ema = []
-        multiplier = 2 / (period + 1)
-
-        for i in range(len(prices)):
-            if i < period - 1:
-                ema.append(None)
-            elif i == period - 1:
-                # First EMA is SMA
-                sma = sum(prices[:period]) / period
-                ema.append(sma)
-            else:
-                # EMA = (Close - EMA(previous)) * multiplier + EMA(previous)
-                prev_ema = ema[-1]
-                current_ema = (prices[i] - prev_ema) * multiplier + prev_ema
-                ema.append(round(current_ema, 2))
-
-        return ema
-
 
 # Singleton instance
 market_service = MarketService()
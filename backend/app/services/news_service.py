@@ -1,8 +1,13 @@
-import requests
 import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from app.core import deadline
+from app.core.cache import cache
+from app.core.cassette import http_session
+from app.core.circuit_breaker import circuit_breakers
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.single_flight import single_flight
 
 
 class NewsService:
@@ -12,10 +17,7 @@ class NewsService:
 
     def __init__(self):
         self.api_key = settings.NEWS_API_KEY
-        self.session = requests.Session()
-        # Simple cache to reduce API calls
-        self.cache = {}
-        self.cache_ttl = 300  # 5 minutes
+        self.session = http_session()
 
     def get_top_headlines(
         self,
@@ -24,13 +26,12 @@ class NewsService:
         page_size: int = 20
     ) -> List[Dict]:
         """Get top business/financial headlines"""
-        cache_key = f"headlines_{category}_{country}_{page_size}"
+        cache_key = ("headlines", category, country, page_size)
 
         # Check cache
-        if cache_key in self.cache:
-            cached_time, cached_data = self.cache[cache_key]
-            if datetime.now().timestamp() - cached_time < self.cache_ttl:
-                return cached_data
+        cached = cache.get("news", cache_key)
+        if cached is not None:
+            return cached
 
         try:
             params = {
@@ -40,13 +41,10 @@ class NewsService:
                 "pageSize": page_size
             }
 
-            response = self.session.get(
-                f"{self.BASE_URL}/top-headlines",
-                params=params,
-                timeout=10
+            data = single_flight.do(
+                ('news.headlines', category, (country, page_size)),
+                lambda: self._get_json("top-headlines", params)
             )
-            response.raise_for_status()
-            data = response.json()
 
             if data.get("status") == "error":
                 raise Exception(data.get("message", "NewsAPI error"))
@@ -54,7 +52,7 @@ class NewsService:
             articles = self._format_articles(data.get("articles", []))
 
             # Cache the results
-            self.cache[cache_key] = (datetime.now().timestamp(), articles)
+            cache.set("news", cache_key, articles)
 
             return articles
 
@@ -91,13 +89,10 @@ class NewsService:
                 "language": "en"
             }
 
-            response = self.session.get(
-                f"{self.BASE_URL}/everything",
-                params=params,
-                timeout=10
+            data = single_flight.do(
+                ('news.search', query, (params["from"], params["to"], sort_by, page, page_size)),
+                lambda: self._get_json("everything", params)
             )
-            response.raise_for_status()
-            data = response.json()
 
             if data.get("status") == "error":
                 raise Exception(data.get("message", "NewsAPI error"))
@@ -116,6 +111,18 @@ class NewsService:
                 "page": page
             }
 
+    def _get_json(self, endpoint: str, params: Dict) -> Dict:
+        """GET a NewsAPI endpoint within the shared rate limit and decode the JSON body"""
+        with circuit_breakers.guard('newsapi'):
+            rate_limiter.acquire('newsapi')
+            response = self.session.get(
+                f"{self.BASE_URL}/{endpoint}",
+                params=params,
+                timeout=deadline.bounded(10)
+            )
+            response.raise_for_status()
+        return response.json()
+
     def get_ticker_news(
         self,
         ticker: str,
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from app.models.models import Portfolio, Position, Transaction, PortfolioSnapshot
 from app.models.schemas import (
     PortfolioCreate, PositionCreate, PositionUpdate, TransactionCreate,
@@ -101,9 +101,9 @@ class PortfolioService:
             Position.portfolio_id == portfolio_id
         ).all()
 
-        # Enrich with current prices
-        for position in positions:
-            quote = self.market_service.get_quote(position.ticker)
+        # Enrich with current prices, fetched for all tickers at once
+        quotes = self.market_service.get_multiple_quotes([position.ticker for position in positions])
+        for position, quote in zip(positions, quotes):
             if quote:
                 position.current_price = quote.price
                 position.current_value = quote.price * float(position.shares)
@@ -205,7 +205,6 @@ class PortfolioService:
     def _calculate_daily_change(self, portfolio_id: int) -> float:
         """Calculate daily change in portfolio value"""
         # Get yesterday's snapshot
-        from datetime import timedelta
         yesterday = date.today() - timedelta(days=1)
 
         snapshot = self.db.query(PortfolioSnapshot).filter(
@@ -253,6 +252,7 @@ class PortfolioService:
         sp500_quote = self.market_service.get_quote("^GSPC")
         sp500_return = sp500_quote.change_percent if sp500_quote else 0
 
+        # Written right away: a snapshot cannot be re-fetched, so it stays out of the write-behind queue
         snapshot = PortfolioSnapshot(
             portfolio_id=portfolio_id,
             snapshot_date=date.today(),
@@ -0,0 +1,258 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from app.core.columnar_store import bar_store
+from app.core.config import settings
+from app.core.single_flight import single_flight
+from app.db.base import SessionLocal
+from app.db.write_behind import upsert_rows
+from app.models.models import DailyBar, PriceHistorySync
+from app.services.av_series import PriceSeries
+from app.services.market_data import market_data
+
+# A compact TIME_SERIES_DAILY response holds the latest 100 bars, ~140 calendar days.
+# Histories older than this need a full download to avoid leaving a gap.
+COMPACT_SPAN = timedelta(days=130)
+
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class PriceHistoryService:
+    """Persistent daily OHLCV bars keyed by (ticker, date).
+
+    The first sync for a ticker backfills its full history; later syncs
+    download only the compact window and upsert bars from the last stored
+    date on, so a bar stored while its session was still trading is
+    corrected once it closes. Reads are date-range queries against the
+    local table and trigger a sync at most once per
+    PRICE_HISTORY_SYNC_INTERVAL.
+
+    Synced bars are mirrored into the memory-mapped columnar store so bulk
+    readers (analysis) can take NumPy slices instead of ORM rows.
+    """
+
+    def __init__(self):
+        self.sync_interval = timedelta(seconds=settings.PRICE_HISTORY_SYNC_INTERVAL)
+
+    def get_bars(
+        self,
+        ticker: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Daily bars in date order, optionally bounded by date and/or the latest `limit` bars"""
+        self.ensure_synced(ticker)
+        return self._query_bars(ticker, start, end, limit)
+
+    def _query_bars(
+        self,
+        ticker: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        db = SessionLocal()
+        try:
+            query = db.query(DailyBar).filter(DailyBar.ticker == ticker)
+            if start is not None:
+                query = query.filter(DailyBar.date >= start)
+            if end is not None:
+                query = query.filter(DailyBar.date <= end)
+
+            if limit is not None:
+                rows = query.order_by(DailyBar.date.desc()).limit(limit).all()[::-1]
+            else:
+                rows = query.order_by(DailyBar.date).all()
+
+            return [
+                {
+                    "date": row.date,
+                    "open": float(row.open),
+                    "high": float(row.high),
+                    "low": float(row.low),
+                    "close": float(row.close),
+                    "volume": int(row.volume)
+                }
+                for row in rows
+            ]
+        finally:
+            db.close()
+
+    def get_columns(
+        self,
+        ticker: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """Like get_bars, but as zero-copy column arrays from the columnar store"""
+        self.ensure_synced(ticker)
+
+        db = SessionLocal()
+        try:
+            state = db.get(PriceHistorySync, ticker)
+            first_date, last_date = (state.first_date, state.last_date) if state else (None, None)
+        finally:
+            db.close()
+
+        if not self._store_matches(ticker, first_date, last_date):
+            self._rebuild_store(ticker)
+        return bar_store.read(ticker, start, end, limit)
+
+    def get_columns_many(
+        self,
+        tickers: List[str],
+        limit: Optional[int] = None
+    ) -> Tuple[Dict[str, Dict[str, np.ndarray]], List[str]]:
+        """Stored columns for many tickers from one sync-state query, without reaching upstream.
+
+        Returns copies of the latest `limit` bars (all if None) for every
+        ticker synced within the sync interval, and the tickers that are
+        due a sync (or were never synced) for the caller to fetch however
+        it fans out upstream work.
+        """
+        db = SessionLocal()
+        try:
+            states = {
+                ticker: (first_date, last_date, synced_at)
+                for ticker, first_date, last_date, synced_at in db.query(
+                    PriceHistorySync.ticker, PriceHistorySync.first_date,
+                    PriceHistorySync.last_date, PriceHistorySync.synced_at
+                ).filter(PriceHistorySync.ticker.in_(tickers))
+            }
+        finally:
+            db.close()
+
+        now = datetime.utcnow()
+        stored, due = {}, []
+        for ticker in tickers:
+            if ticker not in states or now - states[ticker][2] >= self.sync_interval:
+                due.append(ticker)
+                continue
+            first_date, last_date, _ = states[ticker]
+            bars = bar_store.load(ticker, limit)
+            # A tail read only shows the last date; the first is checked when the whole history was read
+            whole = limit is None or len(bars["date"]) < limit
+            if not self._spans(bars["date"], first_date, last_date, whole):
+                self._rebuild_store(ticker)
+                bars = bar_store.load(ticker, limit)
+            stored[ticker] = bars
+        return stored, due
+
+    @classmethod
+    def _store_matches(cls, ticker: str, first_date: Optional[date], last_date: Optional[date]) -> bool:
+        """Whether the columnar copy spans the same dates as the synced table"""
+        return cls._spans(bar_store.open(ticker)["date"].view("datetime64[D]"), first_date, last_date)
+
+    @staticmethod
+    def _spans(days: np.ndarray, first_date: Optional[date], last_date: Optional[date], whole: bool = True) -> bool:
+        if first_date is None or last_date is None:
+            return not len(days)
+        return (
+            len(days) > 0
+            and (not whole or days[0] == np.datetime64(first_date, "D"))
+            and days[-1] == np.datetime64(last_date, "D")
+        )
+
+    def _rebuild_store(self, ticker: str) -> bool:
+        """Rewrite a ticker's columnar copy from the table, e.g. for bars synced before the store existed"""
+        bars = self._query_bars(ticker)
+        if not bars:
+            bar_store.delete(ticker)
+            return False
+        bar_store.rewrite(ticker, self._to_columns(bars))
+        return True
+
+    @staticmethod
+    def _to_columns(bars: List[Dict]) -> Dict[str, np.ndarray]:
+        return {
+            "date": np.array([bar["date"] for bar in bars], dtype="datetime64[D]"),
+            "open": np.array([bar["open"] for bar in bars], dtype=float),
+            "high": np.array([bar["high"] for bar in bars], dtype=float),
+            "low": np.array([bar["low"] for bar in bars], dtype=float),
+            "close": np.array([bar["close"] for bar in bars], dtype=float),
+            "volume": np.array([bar["volume"] for bar in bars], dtype=np.int64)
+        }
+
+    @staticmethod
+    def _to_rows(ticker: str, series: PriceSeries) -> List[Dict]:
+        """Insert parameters for the daily_bars table"""
+        return [
+            {"ticker": ticker, "date": d, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+            for d, o, h, lo, c, v in zip(
+                series.timestamps.tolist(), series.open.tolist(), series.high.tolist(),
+                series.low.tolist(), series.close.tolist(), series.volume.tolist()
+            )
+        ]
+
+    def ensure_synced(self, ticker: str):
+        """Sync a ticker unless it was synced within the sync interval"""
+        db = SessionLocal()
+        try:
+            state = db.get(PriceHistorySync, ticker)
+            if state and datetime.utcnow() - state.synced_at < self.sync_interval:
+                return
+        finally:
+            db.close()
+
+        single_flight.do(("price_history.sync", ticker, ()), lambda: self.sync(ticker))
+
+    def sync(self, ticker: str) -> int:
+        """Fetch bars from the last stored date on; returns how many were written"""
+        db = SessionLocal()
+        try:
+            state = db.get(PriceHistorySync, ticker)
+            first_date, last_date = (state.first_date, state.last_date) if state else (None, None)
+
+            # Backfill the full history once, then only the compact tail
+            if last_date is None or date.today() - last_date > COMPACT_SPAN:
+                outputsize = "full"
+            else:
+                outputsize = "compact"
+            series = market_data.daily_bars(ticker, outputsize)
+
+            # Nothing came back at all: leave synced_at alone so the next read retries
+            if series is None:
+                return 0
+
+            # Re-take the last stored bar too: it may have been saved mid-session
+            if last_date is not None:
+                series = series[series.timestamps >= np.datetime64(last_date, "D")]
+            rows = self._to_rows(ticker, series)
+            upsert_rows(db, DailyBar, rows, ("ticker", "date"), BAR_COLUMNS)
+
+            if state is None:
+                state = PriceHistorySync(ticker=ticker)
+                db.add(state)
+            if rows:
+                state.first_date = state.first_date or rows[0]["date"]
+                state.last_date = rows[-1]["date"]
+            state.synced_at = datetime.utcnow()
+
+            db.commit()
+
+            if rows:
+                # A store that missed earlier syncs (or predates them) is rebuilt from the table
+                try:
+                    if self._store_matches(ticker, first_date, last_date):
+                        bar_store.append(ticker, series.columns())
+                    else:
+                        self._rebuild_store(ticker)
+                except OSError as e:
+                    print(f"Error updating {ticker} in the columnar store: {e}")
+            return len(rows)
+        except IntegrityError:
+            # Another process created the ticker's sync state first
+            db.rollback()
+            return 0
+        except Exception as e:
+            print(f"Error syncing price history for {ticker}: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+
+price_history = PriceHistoryService()
@@ -0,0 +1,281 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core import deadline
+from app.core.background import background_refresher
+from app.core.cache import CacheEntry, cache
+from app.core.config import settings
+from app.core.single_flight import single_flight
+from app.db.base import SessionLocal
+from app.db.write_behind import upsert_rows, write_behind
+from app.models.models import StockCache
+from app.models.schemas import Quote
+from app.services.alpha_vantage import AlphaVantageClient
+from app.services.market_data import market_data
+from app.services.synthetic_market import synthetic_market
+
+# StockCache columns a quote writes; market_cap and pe_ratio belong to the fundamentals refresh
+QUOTE_COLUMNS = ('current_price', 'change', 'change_percent', 'volume', 'updated_at')
+
+
+def quote_from_dict(quote_data: Dict) -> Quote:
+    """Build a Quote from a provider quote dict"""
+    return Quote(
+        ticker=quote_data['ticker'],
+        price=round(quote_data['price'], 2),
+        change=round(quote_data['change'], 2),
+        change_percent=round(quote_data['change_percent'], 2),
+        volume=quote_data.get('volume') or None,
+        high=quote_data.get('high'),
+        low=quote_data.get('low'),
+        open=quote_data.get('open'),
+        previous_close=quote_data.get('previous_close')
+    )
+
+
+def _quote_from_row(row: StockCache, age: float, stale: bool = False) -> Quote:
+    price = float(row.current_price) if row.current_price else 0
+    change = float(row.change) if row.change else 0
+    return Quote(
+        ticker=row.ticker,
+        price=price,
+        change=change,
+        change_percent=float(row.change_percent) if row.change_percent else 0,
+        volume=int(row.volume) if row.volume else None,
+        market_cap=int(row.market_cap) if row.market_cap else None,
+        pe_ratio=float(row.pe_ratio) if row.pe_ratio else None,
+        previous_close=round(price - change, 2) if price else None,
+        stale=stale,
+        age_seconds=round(age, 1)
+    )
+
+
+class TieredQuoteLookup:
+    """One quote lookup for every service: process memory, then the StockCache table, then a provider.
+
+    Reads stop at the first tier holding a usable quote and promote it into
+    the memory tier. Both tiers share the quote TTL; past it a quote is still
+    served, flagged stale, for the tier's grace window while a background
+    refresh runs. Fetched quotes are written through both tiers, so routers,
+    portfolios and watchlists see the same price for a ticker and a ticker is
+    fetched once no matter which path asked first.
+    """
+
+    def __init__(self, ttl: float, store_grace: float):
+        self.ttl = ttl
+        self.store_grace = store_grace
+        self.synthetic = settings.MARKET_DATA_SOURCE == 'synthetic'
+        # Used for REALTIME_BULK_QUOTES batching in get_many
+        self.av_client = AlphaVantageClient()
+        # Per-ticker fetches get_many fans out, at most QUOTE_FETCH_CONCURRENCY in flight
+        self._executor = ThreadPoolExecutor(max_workers=settings.QUOTE_FETCH_CONCURRENCY, thread_name_prefix="quote-fetch")
+
+    def get(self, ticker: str, use_cache: bool = True) -> Optional[Quote]:
+        """Best available quote, fetching it if no tier has a usable one; None if nothing has it"""
+        if not use_cache:
+            return self.refresh(ticker)
+
+        cached, usable = self._lookup(ticker)
+        if usable:
+            return cached
+
+        fetched = self.refresh(ticker)
+        # An expired row is still better than nothing when the provider is unavailable
+        return fetched or cached
+
+    def get_cached(self, ticker: str) -> Optional[Quote]:
+        """Fresh or within-grace quote from the memory or table tier, without calling a provider"""
+        cached, usable = self._lookup(ticker)
+        return cached if usable else None
+
+    def get_many(self, tickers: List[str], use_cache: bool = True) -> Dict[str, Quote]:
+        """Quotes for many tickers, keyed by ticker; tickers nothing has are left out.
+
+        Memory misses are read from the table in one query and everything
+        fetched is queued for one batched upsert, so the table costs a single
+        round trip on the request path however many tickers are asked for.
+        """
+        wanted = list(dict.fromkeys(tickers))
+        quotes: Dict[str, Quote] = {}
+        expired: Dict[str, Quote] = {}
+
+        if use_cache:
+            missing = []
+            for ticker in wanted:
+                entry = cache.get_entry('quote', ticker)
+                if entry is None:
+                    missing.append(ticker)
+                else:
+                    quotes[ticker] = self._from_entry(ticker, entry)
+
+            for ticker, (quote, age) in self._read_store(missing).items():
+                if self._usable_row(ticker, quote, age):
+                    quotes[ticker] = quote
+                else:
+                    expired[ticker] = quote
+
+        fetched = self._fetch_many([ticker for ticker in wanted if ticker not in quotes])
+        quotes.update((quote.ticker, quote) for quote in self.store(fetched, previous=expired))
+
+        # An expired row is still better than nothing when the provider is unavailable
+        for ticker, quote in expired.items():
+            quotes.setdefault(ticker, quote)
+        return quotes
+
+    def _lookup(self, ticker: str) -> Tuple[Optional[Quote], bool]:
+        """(quote, usable) from the memory tier, else the table tier.
+
+        Stale quotes inside their grace window are usable and schedule a
+        background refresh. A row past its grace window is returned flagged
+        stale but not usable, so callers fetch instead.
+        """
+        entry = cache.get_entry('quote', ticker)
+        if entry is not None:
+            return self._from_entry(ticker, entry), True
+
+        row = self._read_store([ticker]).get(ticker)
+        if row is None:
+            return None, False
+
+        quote, age = row
+        return quote, self._usable_row(ticker, quote, age)
+
+    def _from_entry(self, ticker: str, entry: CacheEntry) -> Quote:
+        if entry.stale:
+            self.schedule_refresh(ticker)
+        return entry.value.model_copy(update={'stale': entry.stale, 'age_seconds': round(entry.age, 1)})
+
+    def _usable_row(self, ticker: str, quote: Quote, age: float) -> bool:
+        """Whether a table row may be served; fresh rows are promoted into memory for the rest of their lifetime"""
+        if age < self.ttl:
+            cache.set('quote', ticker, quote.model_copy(update={'age_seconds': None}), ttl=self.ttl - age)
+            return True
+        if age < self.ttl + self.store_grace:
+            self.schedule_refresh(ticker)
+            return True
+        return False
+
+    def schedule_refresh(self, ticker: str):
+        background_refresher.schedule(('quote', ticker), lambda: self.refresh(ticker))
+
+    def refresh(self, ticker: str) -> Optional[Quote]:
+        """Fetch a quote from the provider tier and write it through, coalescing identical fetches"""
+        return single_flight.do(('quote_lookup.fetch', ticker, ()), lambda: self._fetch_and_store(ticker))
+
+    def _fetch_and_store(self, ticker: str) -> Optional[Quote]:
+        quote = self._fetch(ticker)
+        return self.store([quote])[0] if quote else None
+
+    def _fetch(self, ticker: str) -> Optional[Quote]:
+        if self.synthetic:
+            return synthetic_market.quote(ticker)
+
+        quote_data = market_data.quote(ticker)
+        return quote_from_dict(quote_data) if quote_data else None
+
+    def _fetch_many(self, tickers: List[str]) -> List[Quote]:
+        """Provider quotes for several tickers, batched upstream where possible; not yet stored.
+
+        What the bulk calls miss is fetched per ticker concurrently; tickers
+        still unanswered at the request deadline are left out.
+        """
+        if not tickers:
+            return []
+        if self.synthetic:
+            return synthetic_market.quotes(tickers)
+
+        quotes = []
+        # Alpha Vantage has no index quotes, so they would only cost bulk slots
+        bulk_tickers = [ticker for ticker in tickers if not ticker.startswith('^')]
+        if settings.ALPHA_VANTAGE_BULK_QUOTES and len(bulk_tickers) > 1:
+            bulk = self.av_client.get_bulk_quotes(bulk_tickers)
+            quotes = [quote_from_dict(quote_data) for quote_data in bulk.values()]
+
+        # Whatever the bulk calls missed goes per-ticker through the provider registry
+        found = {quote.ticker for quote in quotes}
+        futures = {
+            # Pool threads run in a copy of this context so providers see the request deadline
+            self._executor.submit(contextvars.copy_context().run, self._fetch, ticker): ticker
+            for ticker in tickers if ticker not in found
+        }
+        if not futures:
+            return quotes
+
+        done, _ = wait(futures, timeout=deadline.remaining())
+        for future, ticker in futures.items():
+            if future not in done:
+                future.cancel()
+                print(f"Request deadline exceeded fetching quote for {ticker}")
+            elif future.exception() is not None:
+                print(f"Error fetching quote for {ticker}: {future.exception()}")
+            elif future.result():
+                quotes.append(future.result())
+        return quotes
+
+    def store(self, quotes: List[Quote], previous: Optional[Dict[str, Quote]] = None) -> List[Quote]:
+        """Write fetched quotes through every tier; returns them with known fundamentals filled in.
+
+        The memory tier is updated at once and the table row is queued for
+        the write-behind flush. Fundamentals missing from a fetched quote are
+        carried over from ``previous`` or the quote it replaces in memory.
+        """
+        previous = previous or {}
+        now = datetime.utcnow()
+        stored = []
+        for quote in quotes:
+            prior = previous.get(quote.ticker)
+            if prior is None:
+                entry = cache.get_entry('quote', quote.ticker)
+                prior = entry.value if entry is not None else None
+
+            quote = quote.model_copy(update={
+                'market_cap': quote.market_cap or (prior.market_cap if prior else None),
+                'pe_ratio': quote.pe_ratio or (prior.pe_ratio if prior else None),
+                'stale': False,
+                'age_seconds': None
+            })
+            cache.set('quote', quote.ticker, quote)
+            write_behind.put('stock_quote', quote.ticker, {
+                'ticker': quote.ticker,
+                'current_price': quote.price,
+                'change': quote.change,
+                'change_percent': quote.change_percent,
+                'volume': quote.volume,
+                'updated_at': now
+            })
+            stored.append(quote)
+        return stored
+
+    def _read_store(self, tickers: List[str]) -> Dict[str, Tuple[Quote, float]]:
+        """ticker -> (quote, age in seconds) from the StockCache table, in one IN (...) query"""
+        if not tickers:
+            return {}
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(select(StockCache).where(StockCache.ticker.in_(tickers))).scalars()
+            now = datetime.utcnow()
+            found = {}
+            for row in rows:
+                if row.current_price is None or row.updated_at is None:
+                    continue
+                age = (now - row.updated_at).total_seconds()
+                found[row.ticker] = _quote_from_row(row, age, stale=age >= self.ttl), age
+            return found
+        except Exception as e:
+            print(f"Error reading cached quotes for {len(tickers)} tickers: {e}")
+            return {}
+        finally:
+            db.close()
+
+
+def _write_quotes(db: Session, rows: List[Dict]):
+    upsert_rows(db, StockCache, rows, 'ticker', QUOTE_COLUMNS)
+
+
+write_behind.register('stock_quote', _write_quotes)
+
+quote_lookup = TieredQuoteLookup(settings.CACHE_TTL_QUOTE, settings.STOCK_CACHE_STALE_GRACE)
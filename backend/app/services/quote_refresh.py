@@ -0,0 +1,189 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from app.core.access_tracker import quote_access
+from app.core.cache import cache
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.models import Position, WatchlistStock
+from app.services.market_data import market_data
+from app.services.market_service import INDEX_SYMBOLS, market_service
+
+
+class QuoteRefreshScheduler:
+    """Keeps hot quotes warm by refreshing them shortly before their cache entry expires.
+
+    The hot set is every watchlist and position ticker, the dashboard indices
+    and any ticker requested within QUOTE_REFRESH_RECENT_WINDOW. Each cycle
+    refreshes the tickers that would expire before the next cycle, most
+    frequently requested first, and stops at its share of the Alpha Vantage
+    rate limit so user-triggered fetches still get through.
+
+    Every upstream request counts against that share: one per bulk batch,
+    one per ticker fetched singly. Bulk quotes are a premium endpoint, so
+    until a bulk call has succeeded a cycle only probes with one batch;
+    after a failed bulk call they are not tried again for
+    BULK_RETRY_INTERVAL. Tickers no provider can quote are skipped.
+    """
+
+    # Seconds to wait before trying bulk quotes again after they returned nothing
+    BULK_RETRY_INTERVAL = 3600
+
+    def __init__(self, interval: float, budget_share: float):
+        self.interval = interval
+        self.budget_share = budget_share
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.deferred = 0
+        self.skipped = 0
+        # None until the first bulk call; then whether the last one returned quotes
+        self.bulk_works: Optional[bool] = None
+        self.bulk_checked_at = 0.0
+        self.last_cycle: Optional[Dict] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="quote-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Quote refresh cycle failed: {e}")
+
+    def request_budget(self) -> int:
+        """Upstream requests one cycle may spend"""
+        per_cycle = settings.ALPHA_VANTAGE_RATE_LIMIT * self.interval / 60
+        return max(1, int(per_cycle * self.budget_share))
+
+    def use_bulk(self) -> bool:
+        """Whether this cycle should try REALTIME_BULK_QUOTES"""
+        if not settings.ALPHA_VANTAGE_BULK_QUOTES or market_service.synthetic:
+            return False
+        return self.bulk_works is not False or time.time() - self.bulk_checked_at >= self.BULK_RETRY_INTERVAL
+
+    @staticmethod
+    def quotable(tickers: List[str]) -> List[str]:
+        """Tickers some quote provider handles; synthetic data covers every ticker"""
+        if market_service.synthetic:
+            return list(tickers)
+        return [ticker for ticker in tickers if market_data.route('quote', ticker)]
+
+    def hot_symbols(self) -> Dict[str, float]:
+        """Hot tickers mapped to their priority: recent request frequency, plus 1 if pinned"""
+        priorities = dict(quote_access.scores())
+
+        pinned = set(INDEX_SYMBOLS)
+        db = SessionLocal()
+        try:
+            pinned.update(row.ticker for row in db.query(WatchlistStock.ticker).distinct())
+            pinned.update(row.ticker for row in db.query(Position.ticker).distinct())
+        except Exception as e:
+            print(f"Error loading watchlist/position tickers for refresh: {e}")
+        finally:
+            db.close()
+
+        for ticker in pinned:
+            priorities[ticker] = priorities.get(ticker, 0.0) + 1
+        return priorities
+
+    def due(self, priorities: Dict[str, float]) -> List[str]:
+        """Tickers whose quote is missing or would expire before the next cycle, by priority"""
+        due = []
+        for ticker in priorities:
+            remaining = cache.remaining_ttl('quote', ticker)
+            if remaining is None or remaining <= self.interval:
+                due.append(ticker)
+        return sorted(due, key=lambda ticker: priorities[ticker], reverse=True)
+
+    def run_once(self) -> Dict:
+        """Run one refresh cycle and return what it did"""
+        priorities = self.hot_symbols()
+        due = self.due(priorities)
+        candidates = self.quotable(due)
+        skipped = len(due) - len(candidates)
+
+        if market_service.synthetic:
+            # Generated locally: no upstream requests to budget
+            outcome = market_service.refresh_quotes(candidates) if candidates else {'refreshed': 0, 'errors': {}}
+            refreshed, failed, requests, deferred = outcome['refreshed'], len(outcome['errors']), 0, []
+        else:
+            refreshed, failed, requests, deferred = self._refresh(candidates)
+
+        self.cycles += 1
+        self.refreshed += refreshed
+        self.failed += failed
+        self.deferred += len(deferred)
+        self.skipped += skipped
+        self.last_cycle = {
+            'at': time.time(),
+            'hot': len(priorities),
+            'due': len(due),
+            'refreshed': refreshed,
+            'failed': failed,
+            'deferred': len(deferred),
+            'skipped': skipped,
+            'requests': requests
+        }
+        return self.last_cycle
+
+    def _refresh(self, tickers: List[str]):
+        """Refresh tickers in priority order within the request budget: (refreshed, failed, requests, deferred)"""
+        budget = self.request_budget()
+        requests = refreshed = 0
+        remaining = list(tickers)
+
+        if self.use_bulk() and len(remaining) > 1:
+            # Alpha Vantage has no index quotes; a bulk batch is only worth it for several tickers
+            bulk = [ticker for ticker in remaining if not ticker.startswith('^')]
+            batch_size = market_service.av_client.bulk_batch_size
+            batches = budget if self.bulk_works else 1
+            bulk = bulk[:batches * batch_size]
+            if len(bulk) > 1:
+                fetched = market_service.refresh_bulk_quotes(bulk)
+                requests += len(market_service.av_client.bulk_quote_batches(bulk))
+                refreshed += len(fetched)
+                self.bulk_works = bool(fetched)
+                self.bulk_checked_at = time.time()
+                remaining = [ticker for ticker in remaining if ticker not in fetched]
+
+        # Whatever bulk did not cover costs one request per ticker
+        single = remaining[:max(0, budget - requests)]
+        deferred = remaining[len(single):]
+        failed = 0
+        if single:
+            outcome = market_service.refresh_quotes(single, bulk=False)
+            refreshed += outcome['refreshed']
+            failed = len(outcome['errors'])
+            requests += len(single)
+        return refreshed, failed, requests, deferred
+
+    def stats(self) -> Dict:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'interval': self.interval,
+            'request_budget': self.request_budget(),
+            'cycles': self.cycles,
+            'refreshed': self.refreshed,
+            'failed': self.failed,
+            'deferred': self.deferred,
+            'skipped': self.skipped,
+            'bulk_quotes': self.bulk_works,
+            'last_cycle': self.last_cycle
+        }
+
+
+quote_refresh_scheduler = QuoteRefreshScheduler(settings.QUOTE_REFRESH_INTERVAL, settings.QUOTE_REFRESH_BUDGET_SHARE)
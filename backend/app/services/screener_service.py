@@ -1,7 +1,14 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.models.schemas import StockScreenerFilters, ScreenerResult
-from app.models.models import StockCache
+from app.models.models import Fundamentals, StockCache
+
+# Popular stocks the screener runs over until it integrates a full-market screening API
+SCREENER_UNIVERSE = [
+    'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'AMD',
+    'JPM', 'BAC', 'WMT', 'V', 'MA', 'DIS', 'NFLX', 'PYPL',
+    'KO', 'PEP', 'NKE', 'COST', 'HD', 'MCD', 'SBUX', 'TGT'
+]
 
 
 class ScreenerService:
@@ -10,9 +17,28 @@ class ScreenerService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _query(self):
+        """StockCache rows paired with their fundamentals row, if any"""
+        return self.db.query(StockCache, Fundamentals).outerjoin(
+            Fundamentals, Fundamentals.ticker == StockCache.ticker
+        )
+
+    @staticmethod
+    def _result(stock: StockCache, fundamentals: Optional[Fundamentals]) -> ScreenerResult:
+        return ScreenerResult(
+            ticker=stock.ticker,
+            name=(fundamentals.name if fundamentals else None) or stock.ticker,
+            price=float(stock.current_price) if stock.current_price else 0,
+            market_cap=int(stock.market_cap) if stock.market_cap else 0,
+            pe_ratio=float(stock.pe_ratio) if stock.pe_ratio else None,
+            change_percent=float(stock.change_percent) if stock.change_percent else 0,
+            volume=int(stock.volume) if stock.volume else 0,
+            sector=fundamentals.sector if fundamentals else None
+        )
+
     def screen_stocks(self, filters: StockScreenerFilters) -> List[ScreenerResult]:
         """Screen stocks based on filters"""
-        query = self.db.query(StockCache)
+        query = self._query()
 
         # Apply filters
         if filters.min_market_cap:
@@ -27,81 +53,42 @@ class ScreenerService:
             query = query.filter(StockCache.current_price >= filters.min_price)
         if filters.max_price:
             query = query.filter(StockCache.current_price <= filters.max_price)
+        if filters.sector:
+            query = query.filter(Fundamentals.sector == filters.sector)
 
         # Execute query
         results = query.limit(100).all()  # Limit to 100 results
 
         # Convert to ScreenerResult
         return [
-            ScreenerResult(
-                ticker=stock.ticker,
-                name=stock.ticker,  # TODO: Add company name to cache
-                price=float(stock.current_price) if stock.current_price else 0,
-                market_cap=int(stock.market_cap) if stock.market_cap else 0,
-                pe_ratio=float(stock.pe_ratio) if stock.pe_ratio else None,
-                change_percent=float(stock.change_percent) if stock.change_percent else 0,
-                volume=int(stock.volume) if stock.volume else 0
-            )
-            for stock in results
+            self._result(stock, fundamentals)
+            for stock, fundamentals in results
             if stock.current_price  # Only include stocks with price data
         ]
 
     def get_top_gainers(self, limit: int = 10) -> List[ScreenerResult]:
         """Get top gaining stocks"""
-        results = self.db.query(StockCache).filter(
+        results = self._query().filter(
             StockCache.change_percent.isnot(None),
             StockCache.current_price.isnot(None)
         ).order_by(StockCache.change_percent.desc()).limit(limit).all()
 
-        return [
-            ScreenerResult(
-                ticker=stock.ticker,
-                name=stock.ticker,
-                price=float(stock.current_price),
-                market_cap=int(stock.market_cap) if stock.market_cap else 0,
-                pe_ratio=float(stock.pe_ratio) if stock.pe_ratio else None,
-                change_percent=float(stock.change_percent),
-                volume=int(stock.volume) if stock.volume else 0
-            )
-            for stock in results
-        ]
+        return [self._result(stock, fundamentals) for stock, fundamentals in results]
 
     def get_top_losers(self, limit: int = 10) -> List[ScreenerResult]:
         """Get top losing stocks"""
-        results = self.db.query(StockCache).filter(
+        results = self._query().filter(
             StockCache.change_percent.isnot(None),
             StockCache.current_price.isnot(None)
         ).order_by(StockCache.change_percent.asc()).limit(limit).all()
 
-        return [
-            ScreenerResult(
-                ticker=stock.ticker,
-                name=stock.ticker,
-                price=float(stock.current_price),
-                market_cap=int(stock.market_cap) if stock.market_cap else 0,
-                pe_ratio=float(stock.pe_ratio) if stock.pe_ratio else None,
-                change_percent=float(stock.change_percent),
-                volume=int(stock.volume) if stock.volume else 0
-            )
-            for stock in results
-        ]
+        return [self._result(stock, fundamentals) for stock, fundamentals in results]
 
     def get_most_active(self, limit: int = 10) -> List[ScreenerResult]:
         """Get most actively traded stocks"""
-        results = self.db.query(StockCache).filter(
+        results = self._query().filter(
             StockCache.volume.isnot(None),
             StockCache.current_price.isnot(None)
         ).order_by(StockCache.volume.desc()).limit(limit).all()
 
-        return [
-            ScreenerResult(
-                ticker=stock.ticker,
-                name=stock.ticker,
-                price=float(stock.current_price),
-                market_cap=int(stock.market_cap) if stock.market_cap else 0,
-                pe_ratio=float(stock.pe_ratio) if stock.pe_ratio else None,
-                change_percent=float(stock.change_percent) if stock.change_percent else 0,
-                volume=int(stock.volume)
-            )
-            for stock in results
-        ]
+        return [self._result(stock, fundamentals) for stock, fundamentals in results]
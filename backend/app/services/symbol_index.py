@@ -0,0 +1,306 @@
+import bisect
+import csv
+import io
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from app.core.background import background_refresher
+from app.core.cache import cache
+from app.core.config import settings
+from app.services.alpha_vantage import AlphaVantageClient
+from app.services.market_data import market_data
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# LISTING_STATUS asset types as SYMBOL_SEARCH names them
+ASSET_TYPES = {"Stock": "Equity", "ETF": "ETF"}
+
+# Candidates scored per prefix lookup; "a" alone prefixes thousands of symbols
+MAX_PREFIX_CANDIDATES = 500
+# Fuzzy matching: shortest query term tried, and least trigram similarity (Dice coefficient) a match needs
+FUZZY_MIN_LENGTH = 3
+FUZZY_THRESHOLD = 0.45
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _prefix_range(keys: List[str], prefix: str) -> range:
+    """Positions of the sorted keys starting with prefix"""
+    start = bisect.bisect_left(keys, prefix)
+    return range(start, bisect.bisect_left(keys, prefix + "\uffff", lo=start))
+
+
+class SymbolIndex:
+    """In-memory symbol and company-name search, answering typeahead queries without an upstream call.
+
+    Built from an Alpha Vantage LISTING_STATUS file and from whatever the
+    search providers return for queries the index missed. Matches are
+    ranked: exact symbol, symbol prefix, prefix of every query word in the
+    company name, then fuzzy matches on trigram similarity for typos.
+    Prefix lookups are binary searches over sorted symbol and name-word
+    keys; fuzzy lookups go through a trigram -> term index.
+
+    Queries the providers found nothing for are remembered for
+    CACHE_TTL_SEARCH_MISS, and synthetic mode never asks the providers.
+    """
+
+    def __init__(self, listing_path: str, max_age: float):
+        self.listing_path = listing_path
+        self.max_age = max_age
+        self.synthetic = settings.MARKET_DATA_SOURCE == "synthetic"
+        self._lock = threading.RLock()
+        self._entries: List[Dict] = []
+        self._ids: Dict[str, int] = {}
+        # Sorted keys with a parallel list of entry ids
+        self._symbol_keys: List[str] = []
+        self._symbol_ids: List[int] = []
+        self._word_keys: List[str] = []
+        self._word_ids: List[int] = []
+        self._entry_words: List[List[str]] = []
+        # Fuzzy matching: term -> entry ids, trigram -> terms, term -> its trigram count
+        self._terms: Dict[str, Set[int]] = defaultdict(set)
+        self._grams: Dict[str, Set[str]] = defaultdict(set)
+        self._gram_counts: Dict[str, int] = {}
+        self.loaded_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, matches: Iterable[Dict]):
+        """Index provider-format matches (ticker, name, type, region); known symbols are updated in place"""
+        with self._lock:
+            for match in matches:
+                symbol = (match.get("ticker") or "").upper()
+                if not symbol:
+                    continue
+                entry = {
+                    "ticker": symbol,
+                    "name": match.get("name") or "",
+                    "type": match.get("type") or "",
+                    "region": match.get("region") or ""
+                }
+                if symbol in self._ids:
+                    self._entries[self._ids[symbol]].update(entry)
+                    continue
+                self._index(entry)
+
+    def _index(self, entry: Dict):
+        entry_id = len(self._entries)
+        symbol = entry["ticker"].lower()
+        words = _WORD.findall(entry["name"].lower())
+        self._entries.append(entry)
+        self._entry_words.append(words)
+        self._ids[entry["ticker"]] = entry_id
+
+        position = bisect.bisect_left(self._symbol_keys, symbol)
+        self._symbol_keys.insert(position, symbol)
+        self._symbol_ids.insert(position, entry_id)
+        for word in set(words):
+            position = bisect.bisect_left(self._word_keys, word)
+            self._word_keys.insert(position, word)
+            self._word_ids.insert(position, entry_id)
+
+        for term in {symbol, *words}:
+            if term not in self._terms:
+                grams = _trigrams(term)
+                for gram in grams:
+                    self._grams[gram].add(term)
+                self._gram_counts[term] = len(grams)
+            self._terms[term].add(entry_id)
+
+    def _rebuild(self, entries: List[Dict]):
+        """Replace the index in one pass, keeping symbols learned from providers that the listing lacks"""
+        listed = {entry["ticker"] for entry in entries}
+        with self._lock:
+            learned = [entry for entry in self._entries if entry["ticker"] not in listed]
+
+        ids: Dict[str, int] = {}
+        kept: List[Dict] = []
+        entry_words: List[List[str]] = []
+        symbols, words = [], []
+        terms: Dict[str, Set[int]] = defaultdict(set)
+        for entry in entries + learned:
+            if entry["ticker"] in ids:
+                continue
+            entry_id = ids[entry["ticker"]] = len(kept)
+            name_words = _WORD.findall(entry["name"].lower())
+            kept.append(entry)
+            entry_words.append(name_words)
+            symbols.append((entry["ticker"].lower(), entry_id))
+            words.extend((word, entry_id) for word in set(name_words))
+            for term in {entry["ticker"].lower(), *name_words}:
+                terms[term].add(entry_id)
+
+        symbols.sort()
+        words.sort()
+        grams: Dict[str, Set[str]] = defaultdict(set)
+        gram_counts: Dict[str, int] = {}
+        for term in terms:
+            term_grams = _trigrams(term)
+            for gram in term_grams:
+                grams[gram].add(term)
+            gram_counts[term] = len(term_grams)
+
+        with self._lock:
+            self._entries, self._ids, self._entry_words = kept, ids, entry_words
+            self._symbol_keys = [key for key, _ in symbols]
+            self._symbol_ids = [entry_id for _, entry_id in symbols]
+            self._word_keys = [key for key, _ in words]
+            self._word_ids = [entry_id for _, entry_id in words]
+            self._terms, self._grams, self._gram_counts = terms, grams, gram_counts
+
+    def load_listing(self, path: Optional[str] = None) -> int:
+        """(Re)build the index from a LISTING_STATUS CSV; returns the number of symbols loaded"""
+        path = path or self.listing_path
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = self.parse_listing(f.read())
+        self._rebuild(entries)
+        self.loaded_at = os.path.getmtime(path)
+        return len(entries)
+
+    @staticmethod
+    def parse_listing(text: str) -> List[Dict]:
+        """Active rows of a LISTING_STATUS CSV as provider-format matches"""
+        entries = []
+        for row in csv.DictReader(io.StringIO(text)):
+            if row.get("status", "Active") != "Active" or not row.get("symbol"):
+                continue
+            entries.append({
+                "ticker": row["symbol"].upper(),
+                "name": row.get("name") or "",
+                "type": ASSET_TYPES.get(row.get("assetType"), row.get("assetType") or ""),
+                "region": "United States"
+            })
+        return entries
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Best local matches for a typeahead query, best first"""
+        query = query.strip().lower()
+        words = _WORD.findall(query)
+        if not words:
+            return []
+
+        scores: Dict[int, float] = {}
+
+        def score(entry_id: int, value: float):
+            if value > scores.get(entry_id, 0):
+                scores[entry_id] = value
+
+        with self._lock:
+            symbol = query.replace(" ", "")
+            for position in _prefix_range(self._symbol_keys, symbol)[:MAX_PREFIX_CANDIDATES]:
+                key = self._symbol_keys[position]
+                # Exact symbol first, then shorter symbols: "f" -> F before FB before FORD
+                score(self._symbol_ids[position], 100 if key == symbol else 80 + 10 * len(symbol) / len(key))
+
+            # Every query word must prefix some word of the name; the longest word narrows candidates most
+            anchor = max(words, key=len)
+            candidates = {
+                self._word_ids[position]
+                for position in _prefix_range(self._word_keys, anchor)[:MAX_PREFIX_CANDIDATES]
+            }
+            for entry_id in candidates:
+                name_words = self._entry_words[entry_id]
+                if all(any(word.startswith(q) for word in name_words) for q in words):
+                    # Names led by the query ("apple" -> Apple Inc) beat names merely containing it
+                    leading = bool(name_words) and name_words[0].startswith(words[0])
+                    score(entry_id, 60 + (10 if leading else 0) - min(len(name_words), 10) * 0.5)
+
+            if len(scores) < limit and len(anchor) >= FUZZY_MIN_LENGTH:
+                for entry_id, similarity in self._fuzzy(anchor).items():
+                    score(entry_id, 50 * similarity)
+
+            ranked = sorted(scores, key=lambda entry_id: (-scores[entry_id], len(self._entries[entry_id]["ticker"])))
+            results = [dict(self._entries[entry_id]) for entry_id in ranked[:limit]]
+
+        if results:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return results
+
+    def _fuzzy(self, term: str) -> Dict[int, float]:
+        """Entry ids whose symbol or a name word is trigram-similar to term, with the best similarity"""
+        grams = _trigrams(term)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self._grams.get(gram, ()):
+                shared[candidate] += 1
+
+        # Typos change a word's length by a character or two; repeated letters collapse in trigram sets
+        slack = max(2, len(term) // 3)
+        matches: Dict[int, float] = {}
+        for candidate, count in shared.items():
+            if abs(len(candidate) - len(term)) > slack:
+                continue
+            similarity = 2 * count / (len(grams) + self._gram_counts[candidate])
+            if similarity < FUZZY_THRESHOLD:
+                continue
+            for entry_id in self._terms[candidate]:
+                matches[entry_id] = max(similarity, matches.get(entry_id, 0))
+        return matches
+
+    def lookup(self, query: str, limit: int = 10) -> List[Dict]:
+        """Local matches, asking the search providers only when the index has none; provider matches are kept"""
+        matches = self.search(query, limit)
+        if matches or self.synthetic:
+            return matches
+
+        key = query.strip().lower()
+        if cache.get("search_miss", key):
+            return []
+
+        matches = market_data.search(query)
+        if not matches:
+            # Typeahead repeats the same miss on every keystroke; don't spend a provider call on each
+            cache.set("search_miss", key, True)
+            return []
+        self.add(matches)
+        return matches[:limit]
+
+    def ensure_loaded(self):
+        """Load the listing file, downloading it in the background if it is missing or older than max_age"""
+        if os.path.exists(self.listing_path):
+            try:
+                self.load_listing()
+            except (OSError, ValueError) as e:
+                print(f"Error loading symbol listing {self.listing_path}: {e}")
+
+        fresh = self.loaded_at is not None and time.time() - self.loaded_at < self.max_age
+        if not fresh and not self.synthetic:
+            background_refresher.schedule(("symbol_index", "listing"), self.download)
+
+    def download(self) -> int:
+        """Fetch LISTING_STATUS, save it to the listing path and rebuild the index from it"""
+        text = AlphaVantageClient().get_listing_status()
+        if text is None:
+            return 0
+
+        directory = os.path.dirname(self.listing_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.listing_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, self.listing_path)
+        return self.load_listing()
+
+    def stats(self) -> Dict:
+        return {
+            "symbols": len(self._entries),
+            "listing_path": self.listing_path,
+            "loaded_at": self.loaded_at,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+symbol_index = SymbolIndex(settings.SYMBOL_LISTING_PATH, settings.SYMBOL_LISTING_MAX_AGE)
@@ -0,0 +1,284 @@
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.models.schemas import Quote
+from app.services.av_series import PriceSeries
+
+# Anchor prices for well-known tickers; anything else gets a stable price from its hash
+ANCHOR_PRICES = {
+    'AAPL': 175.43, 'MSFT': 380.50, 'GOOGL': 140.25, 'AMZN': 155.80,
+    'TSLA': 242.15, 'META': 485.90, 'NVDA': 495.20, 'AMD': 165.75,
+    '^GSPC': 4550.50, '^IXIC': 14200.30, '^DJI': 35800.20, '^RUT': 2050.75,
+    'SPY': 455.20, 'QQQ': 380.40, 'DIA': 358.10, 'IWM': 195.30,
+    'JPM': 145.30, 'BAC': 28.75, 'WMT': 165.20, 'V': 245.80,
+    'MA': 385.50, 'DIS': 95.40, 'NFLX': 425.60, 'PYPL': 62.30
+}
+
+# Profiles for mock company overviews; other tickers get a generic one
+MOCK_COMPANIES = {
+    'AAPL': {
+        'name': 'Apple Inc.',
+        'sector': 'Technology',
+        'industry': 'Consumer Electronics',
+        'description': 'Apple Inc. designs, manufactures, and markets smartphones, personal computers, tablets, wearables, and accessories worldwide.'
+    },
+    'MSFT': {
+        'name': 'Microsoft Corporation',
+        'sector': 'Technology',
+        'industry': 'Software',
+        'description': 'Microsoft Corporation develops, licenses, and supports software, services, devices, and solutions worldwide.'
+    },
+    'GOOGL': {
+        'name': 'Alphabet Inc.',
+        'sector': 'Technology',
+        'industry': 'Internet Content & Information',
+        'description': 'Alphabet Inc. provides online advertising services in the United States, Europe, the Middle East, Africa, the Asia-Pacific, Canada, and Latin America.'
+    }
+}
+
+# Sectors of other well-known tickers, so mock attribution and screening have something to group by
+MOCK_SECTORS = {
+    'AMZN': 'Technology', 'TSLA': 'Consumer Cyclical', 'META': 'Technology', 'NVDA': 'Technology',
+    'AMD': 'Technology', 'JPM': 'Financial', 'BAC': 'Financial', 'WMT': 'Consumer Defensive',
+    'V': 'Financial', 'MA': 'Financial', 'DIS': 'Communication', 'NFLX': 'Communication',
+    'PYPL': 'Financial'
+}
+
+TRADING_DAYS = 252
+SESSION_MINUTES = 390  # 09:30-16:00
+SESSION_OPEN = 570  # minutes after midnight
+MARKET_VOLATILITY = 0.18
+
+
+class TickerParams:
+    """Per-ticker model parameters, derived only from (seed, ticker) so they never depend on the universe"""
+
+    __slots__ = ("price", "drift", "volatility", "loading", "volume", "shares", "pe_ratio", "seed")
+
+    def __init__(self, seed: int, ticker: str):
+        self.seed = zlib.crc32(f"{seed}:{ticker}".encode())
+        rng = np.random.default_rng(self.seed)
+        is_index = ticker.startswith('^')
+
+        self.price = ANCHOR_PRICES.get(ticker) or float(np.round(np.exp(rng.uniform(np.log(10), np.log(600))), 2))
+        self.drift = float(rng.uniform(0.02, 0.12))
+        self.volatility = MARKET_VOLATILITY if is_index else float(rng.uniform(0.18, 0.55))
+        # Correlation with the common market factor; indices track it almost exactly
+        self.loading = 0.97 if is_index else float(rng.uniform(0.35, 0.8))
+        self.volume = float(np.exp(rng.uniform(np.log(2e6), np.log(8e7))))
+        self.shares = float(np.exp(rng.uniform(np.log(2e8), np.log(1.6e10))))
+        self.pe_ratio = float(rng.uniform(10, 50))
+
+    @property
+    def beta(self) -> float:
+        return self.loading * self.volatility / MARKET_VOLATILITY
+
+
+class SyntheticMarket:
+    """Seeded, network-free market data for development and load tests.
+
+    Daily closes are correlated geometric Brownian motions: each ticker's
+    log return mixes a shared market shock with its own shock according
+    to its factor loading, and every path is scaled so it ends at the
+    ticker's anchor price on ``as_of``. The last few sessions also get
+    1-minute bars, built as Brownian bridges from each day's open to its
+    close, and those days' highs/lows are taken from the minute bars. So
+    quotes, intraday bars, daily bars and overviews all agree.
+
+    Output depends only on (seed, as_of, ticker): the same seed gives the
+    same data, and adding tickers to a request never changes the others.
+    """
+
+    def __init__(self, seed: int, years: int, intraday_days: int, max_tickers: int = 2000):
+        self.seed = seed
+        self.years = years
+        self.intraday_days = intraday_days
+        self.max_tickers = max_tickers
+        self._lock = threading.Lock()
+        # (ticker, as_of) -> (daily series, 1min series)
+        self._paths: "OrderedDict[Tuple[str, date], Tuple[PriceSeries, PriceSeries]]" = OrderedDict()
+        self._market: Dict[date, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _sessions(self, as_of: date) -> np.ndarray:
+        end = np.busday_offset(np.datetime64(as_of, 'D'), 0, roll='backward')
+        return np.busday_offset(end, np.arange(-self.years * TRADING_DAYS + 1, 1), roll='backward')
+
+    def _market_shocks(self, as_of: date, days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Shared daily and per-minute market factor shocks for a date"""
+        shocks = self._market.get(as_of)
+        if shocks is None:
+            rng = np.random.default_rng([self.seed, as_of.toordinal()])
+            shocks = (rng.standard_normal(days), rng.standard_normal((self.intraday_days, SESSION_MINUTES)))
+            self._market = {as_of: shocks}
+        return shocks
+
+    def generate(self, tickers: List[str], as_of: Optional[date] = None) -> Dict[str, Tuple[PriceSeries, PriceSeries]]:
+        """Daily and 1-minute series for a universe, simulating uncached tickers in one batch"""
+        as_of = as_of or date.today()
+        with self._lock:
+            missing = list(dict.fromkeys(t for t in tickers if (t, as_of) not in self._paths))
+            if missing:
+                for ticker, paths in zip(missing, self._simulate(missing, as_of)):
+                    self._paths[(ticker, as_of)] = paths
+                while len(self._paths) > self.max_tickers:
+                    self._paths.popitem(last=False)
+            return {ticker: self._paths[(ticker, as_of)] for ticker in tickers}
+
+    def _simulate(self, tickers: List[str], as_of: date) -> List[Tuple[PriceSeries, PriceSeries]]:
+        sessions = self._sessions(as_of)
+        days, n = len(sessions), len(tickers)
+        market_daily, market_minute = self._market_shocks(as_of, days)
+        params = [TickerParams(self.seed, ticker) for ticker in tickers]
+
+        def column(attr: str) -> np.ndarray:
+            return np.array([getattr(p, attr) for p in params])
+
+        sigma, mu, rho = column("volatility"), column("drift"), column("loading")
+        price, base_volume = column("price"), column("volume")
+
+        # Idiosyncratic shocks from each ticker's own stream: (days, n), (intraday days, minutes, n)
+        rngs = [np.random.default_rng([p.seed, as_of.toordinal()]) for p in params]
+        own_daily = np.stack([rng.standard_normal(days) for rng in rngs], axis=1)
+        own_minute = np.stack([rng.standard_normal((self.intraday_days, SESSION_MINUTES)) for rng in rngs], axis=2)
+        noise = np.stack([rng.standard_normal((4, days)) for rng in rngs], axis=2)
+
+        # Correlated GBM log returns, rescaled so every path ends at its anchor price
+        dt = 1 / TRADING_DAYS
+        shocks = rho * market_daily[:, None] + np.sqrt(1 - rho ** 2) * own_daily
+        log_returns = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * shocks
+        log_close = np.cumsum(log_returns, axis=0)
+        log_close += np.log(price) - log_close[-1]
+        close = np.exp(log_close)
+
+        # Opens gap a little from the previous close; highs/lows extend past the body
+        prev_close = np.vstack([close[:1] * np.exp(-log_returns[:1]), close[:-1]])
+        open_ = prev_close * np.exp(0.15 * sigma * np.sqrt(dt) * noise[0])
+        body_high, body_low = np.maximum(open_, close), np.minimum(open_, close)
+        high = body_high * np.exp(np.abs(noise[1]) * 0.3 * sigma * np.sqrt(dt))
+        low = body_low * np.exp(-np.abs(noise[2]) * 0.3 * sigma * np.sqrt(dt))
+        volume = (base_volume * np.exp(0.35 * noise[3] + 4 * np.abs(log_returns))).astype(np.int64)
+
+        # Minute bars for the last sessions: Brownian bridges pinned to each day's open and close
+        k = self.intraday_days
+        minute_shocks = rho * market_minute[:, :, None] + np.sqrt(1 - rho ** 2) * own_minute
+        walk = np.cumsum(minute_shocks, axis=1)
+        t = np.arange(1, SESSION_MINUTES + 1)[None, :, None] / SESSION_MINUTES
+        bridge = walk - t * walk[:, -1:, :]
+        minute_sigma = sigma * np.sqrt(dt / SESSION_MINUTES)
+        log_open, log_end = np.log(open_[-k:])[:, None, :], np.log(close[-k:])[:, None, :]
+        minute_close = np.exp(log_open + (log_end - log_open) * t + minute_sigma * bridge)
+        minute_open = np.concatenate([np.exp(log_open), minute_close[:, :-1, :]], axis=1)
+        wick = np.exp(np.abs(np.roll(minute_shocks, 1, axis=1)) * 0.5 * minute_sigma)
+        minute_high = np.maximum(minute_open, minute_close) * wick
+        minute_low = np.minimum(minute_open, minute_close) / wick
+        # U-shaped intraday volume profile summing to the day's volume
+        profile = 1 + 2 * (2 * t - 1) ** 2
+        minute_volume = np.floor(volume[-k:][:, None, :] * profile / profile.sum()).astype(np.int64)
+
+        high[-k:] = minute_high.max(axis=1)
+        low[-k:] = minute_low.min(axis=1)
+        volume[-k:] = minute_volume.sum(axis=1)
+
+        minute_times = (
+            sessions[-k:].astype('datetime64[m]')[:, None]
+            + np.timedelta64(SESSION_OPEN, 'm')
+            + np.arange(SESSION_MINUTES).astype('timedelta64[m]')
+        ).ravel().astype('datetime64[s]')
+
+        results = []
+        for i in range(n):
+            daily = PriceSeries(sessions, open_[:, i], high[:, i], low[:, i], close[:, i], volume[:, i])
+            minute = PriceSeries(
+                minute_times,
+                minute_open[:, :, i].ravel(),
+                minute_high[:, :, i].ravel(),
+                minute_low[:, :, i].ravel(),
+                minute_close[:, :, i].ravel(),
+                minute_volume[:, :, i].ravel()
+            )
+            results.append((daily, minute))
+        return results
+
+    def daily(self, ticker: str) -> PriceSeries:
+        return self.generate([ticker])[ticker][0]
+
+    def intraday(self, ticker: str) -> PriceSeries:
+        """1-minute bars for the last sessions"""
+        return self.generate([ticker])[ticker][1]
+
+    def quotes(self, tickers: List[str]) -> List[Quote]:
+        """Quotes as of the last session's close, consistent with daily() and intraday()"""
+        paths = self.generate(tickers)
+        return [self._quote(ticker, paths[ticker][0]) for ticker in tickers]
+
+    def quote(self, ticker: str) -> Quote:
+        return self.quotes([ticker])[0]
+
+    def _quote(self, ticker: str, daily: PriceSeries) -> Quote:
+        params = TickerParams(self.seed, ticker)
+        price, previous_close = float(daily.close[-1]), float(daily.close[-2])
+        change = price - previous_close
+        return Quote(
+            ticker=ticker,
+            price=round(price, 2),
+            change=round(change, 2),
+            change_percent=round(change / previous_close * 100, 2),
+            volume=int(daily.volume[-1]),
+            market_cap=None if ticker.startswith('^') else int(price * params.shares),
+            pe_ratio=None if ticker.startswith('^') else round(params.pe_ratio, 2),
+            high=round(float(daily.high[-1]), 2),
+            low=round(float(daily.low[-1]), 2),
+            open=round(float(daily.open[-1]), 2),
+            previous_close=round(previous_close, 2)
+        )
+
+    def overview(self, ticker: str) -> Dict:
+        """Company overview in the provider format, with fundamentals from fundamentals()"""
+        company_info = MOCK_COMPANIES.get(ticker, {
+            'name': f'{ticker} Corporation',
+            'sector': MOCK_SECTORS.get(ticker, 'Technology'),
+            'industry': 'Software',
+            'description': f'{ticker} is a leading technology company.'
+        })
+
+        return {
+            'symbol': ticker,
+            'name': company_info['name'],
+            'description': company_info['description'],
+            'sector': company_info['sector'],
+            'industry': company_info['industry'],
+            'exchange': 'NASDAQ',
+            'country': 'United States',
+            **self.fundamentals(ticker)
+        }
+
+    def fundamentals(self, ticker: str) -> Dict:
+        """Overview figures derived from the same path and parameters as the quote"""
+        params = TickerParams(self.seed, ticker)
+        daily = self.daily(ticker)
+        price = float(daily.close[-1])
+        year = daily.close[-TRADING_DAYS:]
+        rng = np.random.default_rng(params.seed + 1)
+        return {
+            'market_cap': int(price * params.shares),
+            'pe_ratio': round(params.pe_ratio, 2),
+            'peg_ratio': round(float(rng.uniform(1, 3)), 2),
+            'dividend_yield': round(float(rng.uniform(0, 3)), 2),
+            'eps': round(price / params.pe_ratio, 2),
+            'beta': round(params.beta, 2),
+            '52_week_high': round(float(daily.high[-TRADING_DAYS:].max()), 2),
+            '52_week_low': round(float(daily.low[-TRADING_DAYS:].min()), 2),
+            '50_day_ma': round(float(year[-50:].mean()), 2),
+            '200_day_ma': round(float(year[-200:].mean()), 2),
+        }
+
+
+synthetic_market = SyntheticMarket(
+    seed=settings.SYNTHETIC_SEED,
+    years=settings.SYNTHETIC_HISTORY_YEARS,
+    intraday_days=settings.SYNTHETIC_INTRADAY_DAYS
+)
@@ -27,9 +27,9 @@ class WatchlistService:
         if not watchlist:
             return None
 
-        # Enrich stocks with live prices
-        for stock in watchlist.stocks:
-            quote = self.market_service.get_quote(stock.ticker)
+        # Enrich stocks with live prices, fetched for all tickers at once
+        quotes = self.market_service.get_multiple_quotes([stock.ticker for stock in watchlist.stocks])
+        for stock, quote in zip(watchlist.stocks, quotes):
             if quote:
                 stock.current_price = quote.price
                 stock.change = quote.change
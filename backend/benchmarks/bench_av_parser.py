@@ -0,0 +1,103 @@
+"""Benchmark: Alpha Vantage TIME_SERIES_DAILY parsing, per-field Python loops vs NumPy columns
+
+Builds a 20-year outputsize=full fixture (~5,200 bars) and times the old
+dict-walking parsers against app.services.av_series.parse_time_series.
+
+Usage: python benchmarks/bench_av_parser.py [years]
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from app.services.av_series import parse_time_series
+
+
+def make_fixture(years: int) -> bytes:
+    """A TIME_SERIES_DAILY response body, newest bar first like the real API"""
+    rng = np.random.default_rng(42)
+    end = np.datetime64("2026-10-16")
+    dates = np.arange(end - 365 * years, end, dtype="datetime64[D]")
+    dates = dates[np.is_busday(dates)]
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.012, len(dates))))
+    volume = rng.integers(1_000_000, 80_000_000, len(dates))
+
+    series = {}
+    for d, c, v in zip(dates[::-1], close[::-1], volume[::-1]):
+        series[str(d)] = {
+            "1. open": f"{c * 0.996:.4f}",
+            "2. high": f"{c * 1.012:.4f}",
+            "3. low": f"{c * 0.988:.4f}",
+            "4. close": f"{c:.4f}",
+            "5. volume": str(v)
+        }
+    return json.dumps({
+        "Meta Data": {"1. Information": "Daily Prices (open, high, low, close) and Volumes", "2. Symbol": "BENCH"},
+        "Time Series (Daily)": series
+    }, indent=4).encode()
+
+
+def legacy_historical(payload: bytes):
+    """AlphaVantageClient.get_historical_prices before the NumPy parser"""
+    data = json.loads(payload)
+    prices = []
+    for date_str, values in data["Time Series (Daily)"].items():
+        prices.append({
+            "date": datetime.strptime(date_str, "%Y-%m-%d"),
+            "open": float(values["1. open"]),
+            "high": float(values["2. high"]),
+            "low": float(values["3. low"]),
+            "close": float(values["4. close"]),
+            "volume": int(values["5. volume"])
+        })
+    return sorted(prices, key=lambda x: x["date"])
+
+
+def legacy_chart(payload: bytes):
+    """MarketService chart parsing before the NumPy parser: parallel rounded lists"""
+    time_series = json.loads(payload)["Time Series (Daily)"]
+    timestamps, opens, highs, lows, closes, volumes = [], [], [], [], [], []
+    for date_str in sorted(time_series.keys()):
+        day_data = time_series[date_str]
+        timestamps.append(date_str)
+        opens.append(round(float(day_data["1. open"]), 2))
+        highs.append(round(float(day_data["2. high"]), 2))
+        lows.append(round(float(day_data["3. low"]), 2))
+        closes.append(round(float(day_data["4. close"]), 2))
+        volumes.append(int(day_data["5. volume"]))
+    return closes
+
+
+def timed(fn, payload: bytes, repeat: int = 10) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    payload = make_fixture(years)
+
+    series = parse_time_series(payload)
+    legacy = legacy_historical(payload)
+    assert len(series) == len(legacy)
+    assert np.allclose(series.close, [bar["close"] for bar in legacy])
+    assert (series.volume == [bar["volume"] for bar in legacy]).all()
+
+    print(f"Fixture: {years} years, {len(series)} bars, {len(payload) / 1e6:.1f} MB; best of 10\n")
+    numpy_t = timed(parse_time_series, payload)
+    for label, fn in (("historical (dicts)", legacy_historical), ("chart (lists)", legacy_chart)):
+        legacy_t = timed(fn, payload)
+        print(f"{label:<20} legacy {legacy_t * 1000:7.1f}ms   numpy {numpy_t * 1000:6.1f}ms   {legacy_t / numpy_t:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark: technical indicators for many tickers, one call per ticker vs one (time x ticker) panel
+
+Both sides do what their endpoint does with the bars it loaded: compute
+every indicator over the period plus its warmup, then serialize the
+period's rows (per-ticker lists for /technical/{ticker}, integer columns
+for POST /technical/batch).
+
+Usage: python benchmarks/bench_batch_indicators.py [tickers] [bars] [period bars]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import orjson
+
+from app.services.av_series import PriceSeries, align_panel
+from app.services.indicators import INDICATOR_OUTPUTS, outputs, to_columns, to_list
+
+INDICATORS = list(INDICATOR_OUTPUTS)
+
+
+def make_series(tickers: int, bars: int, seed: int = 11):
+    """Business-day random walks; every tenth ticker listed later, so the panel has leading gaps"""
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64("2026-10-16") - bars * 7 // 5 - 10, np.datetime64("2026-10-16"), dtype="datetime64[D]")
+    dates = dates[np.is_busday(dates)][-bars:]
+    series = []
+    for i in range(tickers):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+        spread = close * rng.uniform(0.002, 0.02, bars)
+        start = bars // 3 if i % 10 == 0 else 0
+        series.append(PriceSeries(
+            dates[start:], close[start:], (close + spread)[start:], (close - spread)[start:], close[start:],
+            rng.integers(1_000_000, 50_000_000, bars - start)
+        ))
+    return series
+
+
+def single_compute(s: PriceSeries):
+    return outputs(INDICATORS, s.close, s.high, s.low)
+
+
+def single(s: PriceSeries, rows: int):
+    """What one /technical/{ticker} call computes and serializes"""
+    values = single_compute(s)
+    return orjson.dumps({name: to_list(series[-rows:]) for name, series in values.items()})
+
+
+def panel_compute(series):
+    _, columns = align_panel(series, ("high", "low", "close"))
+    return outputs(INDICATORS, columns["close"], columns["high"], columns["low"])
+
+
+def panel(series, rows: int):
+    """What POST /technical/batch computes and serializes"""
+    values = panel_compute(series)
+    return orjson.dumps(
+        {name: to_columns(series[-rows:]) for name, series in values.items()},
+        option=orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 380
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 126
+    series = make_series(tickers, bars)
+
+    # Decoded panel columns match the per-ticker results, leading gaps included
+    batch = orjson.loads(panel(series, rows))
+    for column in (0, 1, tickers - 1):
+        expected = orjson.loads(single(series[column], rows))
+        for name, values in expected.items():
+            cells = np.array(batch[name]["values"], dtype=float) / 100
+            cells[batch[name]["nulls"]] = np.nan
+            decoded = [None if np.isnan(v) else v for v in cells.reshape(-1, tickers)[:, column].tolist()]
+            assert decoded[-len(values):] == values, name
+
+    print(f"{tickers} tickers x {bars} bars ({rows} serialized), {len(INDICATORS)} indicators; best of 10\n")
+    cases = (
+        ("compute", lambda s: single_compute(s), lambda: panel_compute(series)),
+        ("compute + serialize", lambda s: single(s, rows), lambda: panel(series, rows)),
+    )
+    for label, single_fn, panel_fn in cases:
+        one_t = timed(lambda: single_fn(series[1]), 10)
+        loop_t = timed(lambda: [single_fn(s) for s in series], 3)
+        panel_t = timed(panel_fn, 10)
+        print(f"{label:<20} one ticker {one_t * 1000:6.2f}ms   per-ticker loop {loop_t * 1000:7.1f}ms   "
+              f"panel {panel_t * 1000:6.1f}ms = {panel_t / one_t:5.1f} single calls, "
+              f"{loop_t / panel_t:4.1f}x faster than the loop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""End-to-end API latency benchmark, reproducible with recorded upstream responses
+
+Record once against the live APIs, then replay without network access:
+
+    HTTP_CASSETTE_MODE=record python benchmarks/bench_endpoints.py 1
+    HTTP_CASSETTE_MODE=replay python benchmarks/bench_endpoints.py 20
+    HTTP_CASSETTE_MODE=replay HTTP_REPLAY_LATENCY_SCALE=1 python benchmarks/bench_endpoints.py 20
+
+Replay misses fail like network errors, so uncovered calls fall back to
+mock data exactly as they would when the upstream is down. Each run
+clears the in-process cache between rounds so every round reaches the
+(replayed) upstream.
+
+Usage: python benchmarks/bench_endpoints.py [rounds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.core.cache import cache
+from app.core.cassette import cassette
+from app.main import app
+
+ENDPOINTS = [
+    "/api/v1/market/quote/AAPL",
+    "/api/v1/market/indices",
+    "/api/v1/market/chart/AAPL?period=1Y",
+    "/api/v1/market/intraday/AAPL?interval=5min",
+    "/api/v1/market/company/AAPL",
+    "/api/v1/macro/indicators",
+    "/api/v1/news/headlines",
+]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"Cassette mode: {cassette.mode if cassette else 'off'}; {rounds} rounds\n")
+
+    timings = {path: [] for path in ENDPOINTS}
+    with TestClient(app) as client:
+        for _ in range(rounds):
+            cache.clear()
+            for path in ENDPOINTS:
+                start = time.perf_counter()
+                response = client.get(path)
+                timings[path].append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    print(f"  {path}: HTTP {response.status_code}")
+
+    print(f"{'endpoint':<48}{'p50':>10}{'p95':>10}")
+    for path, samples in timings.items():
+        ms = np.array(samples) * 1000
+        print(f"{path:<48}{np.percentile(ms, 50):>8.1f}ms{np.percentile(ms, 95):>8.1f}ms")
+
+    if cassette is not None:
+        print(f"\n{cassette.store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark: technical indicators, pure-Python loops vs the NumPy indicator module
+
+Usage: python benchmarks/bench_indicators.py [bars]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from app.services.indicators import macd, rsi, sma, to_list
+
+
+def make_closes(bars: int, seed: int = 7) -> np.ndarray:
+    """Random-walk closes around 100"""
+    rng = np.random.default_rng(seed)
+    return np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars))), 2)
+
+
+# MarketService indicator helpers before the NumPy module, verbatim
+
+def legacy_sma(prices, period):
+    sma = []
+    for i in range(len(prices)):
+        if i < period - 1:
+            sma.append(None)
+        else:
+            window = prices[i - period + 1:i + 1]
+            sma.append(round(sum(window) / period, 2))
+    return sma
+
+
+def legacy_rsi(prices, period=14):
+    if len(prices) < period + 1:
+        return []
+
+    deltas = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
+    gains = [d if d > 0 else 0 for d in deltas]
+    losses = [-d if d < 0 else 0 for d in deltas]
+
+    rsi = []
+    for i in range(len(gains)):
+        if i < period - 1:
+            rsi.append(None)
+        else:
+            avg_gain = sum(gains[i - period + 1:i + 1]) / period
+            avg_loss = sum(losses[i - period + 1:i + 1]) / period
+
+            if avg_loss == 0:
+                rsi.append(100)
+            else:
+                rs = avg_gain / avg_loss
+                rsi.append(round(100 - (100 / (1 + rs)), 2))
+
+    return rsi
+
+
+def legacy_ema(prices, period):
+    ema = []
+    multiplier = 2 / (period + 1)
+
+    for i in range(len(prices)):
+        if i < period - 1:
+            ema.append(None)
+        elif i == period - 1:
+            ema.append(sum(prices[:period]) / period)
+        else:
+            prev_ema = ema[-1]
+            ema.append(round((prices[i] - prev_ema) * multiplier + prev_ema, 2))
+
+    return ema
+
+
+def legacy_macd(prices, fast=12, slow=26, signal=9):
+    ema_fast = legacy_ema(prices, fast)
+    ema_slow = legacy_ema(prices, slow)
+
+    macd_line = []
+    for i in range(len(prices)):
+        if ema_fast[i] is not None and ema_slow[i] is not None:
+            macd_line.append(round(ema_fast[i] - ema_slow[i], 2))
+        else:
+            macd_line.append(None)
+
+    macd_values = [m for m in macd_line if m is not None]
+    signal_line_values = legacy_ema(macd_values, signal)
+    signal_line = [None] * (len(macd_line) - len(signal_line_values)) + signal_line_values
+
+    histogram = []
+    for i in range(len(macd_line)):
+        if macd_line[i] is not None and signal_line[i] is not None:
+            histogram.append(round(macd_line[i] - signal_line[i], 2))
+        else:
+            histogram.append(None)
+
+    return {'macd': macd_line, 'signal': signal_line, 'histogram': histogram}
+
+
+def legacy_all(prices):
+    return [legacy_sma(prices, 20), legacy_sma(prices, 50), legacy_sma(prices, 200),
+            legacy_rsi(prices), legacy_macd(prices)]
+
+
+def numpy_all(closes):
+    return [to_list(sma(closes, 20)), to_list(sma(closes, 50)), to_list(sma(closes, 200)),
+            to_list(rsi(closes)), [to_list(values) for values in macd(closes)]]
+
+
+def timed(fn, data, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    bars = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    closes = make_closes(bars)
+    prices = closes.tolist()
+
+    # Legacy SMA is rounded to cents; legacy EMA rounds every step, so MACD agrees only to a few cents
+    for period in (20, 50, 200):
+        legacy = np.array(legacy_sma(prices, period), dtype=float)
+        assert np.allclose(sma(closes, period), legacy, atol=0.0051, equal_nan=True)
+    legacy_line = np.array(legacy_macd(prices)['macd'], dtype=float)
+    assert np.allclose(macd(closes)[0], legacy_line, atol=0.05, equal_nan=True)
+
+    print(f"{bars} bars; best of 5\n")
+    cases = (
+        ("sma 200", lambda p: legacy_sma(p, 200), lambda c: sma(c, 200)),
+        ("rsi 14", legacy_rsi, rsi),
+        ("macd 12/26/9", legacy_macd, macd),
+    )
+    for label, legacy_fn, numpy_fn in cases:
+        legacy_t = timed(legacy_fn, prices)
+        numpy_t = timed(numpy_fn, closes)
+        print(f"{label:<24} legacy {legacy_t * 1000:7.1f}ms   numpy {numpy_t * 1000:6.2f}ms   {legacy_t / numpy_t:5.1f}x")
+
+    legacy_t = timed(legacy_all, prices)
+    numpy_t = timed(numpy_all, closes)
+    print(f"{'endpoint (with lists)':<24} legacy {legacy_t * 1000:7.1f}ms   numpy {numpy_t * 1000:6.2f}ms   {legacy_t / numpy_t:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: daily-bar range reads from SQLite (ORM) vs the memory-mapped columnar store
+
+Usage: python benchmarks/bench_price_store.py [tickers] [years]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.columnar_store import ColumnarBarStore
+from app.db.base import Base
+from app.models.models import DailyBar
+
+
+def make_bars(years: int, seed: int):
+    """Business-day bars with a random-walk close"""
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64("2026-10-16") - 365 * years, np.datetime64("2026-10-16"), dtype="datetime64[D]")
+    dates = dates[np.is_busday(dates)]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return {
+        "date": dates,
+        "open": close * 0.995,
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.integers(1_000_000, 50_000_000, len(dates))
+    }
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine, tables=[DailyBar.__table__])
+        Session = sessionmaker(bind=engine)
+        store = ColumnarBarStore(os.path.join(tmp, "store"))
+
+        print(f"Loading {n_tickers} tickers x {years} years of daily bars...")
+        with engine.begin() as conn:
+            for i, ticker in enumerate(tickers):
+                bars = make_bars(years, i)
+                store.rewrite(ticker, bars)
+                conn.execute(insert(DailyBar), [
+                    {
+                        "ticker": ticker, "date": d.item(), "open": float(o), "high": float(h),
+                        "low": float(lo), "close": float(c), "volume": int(v)
+                    }
+                    for d, o, h, lo, c, v in zip(*(bars[k] for k in ("date", "open", "high", "low", "close", "volume")))
+                ])
+        n_bars = len(make_bars(years, 0)["date"])
+
+        def sqlite_full():
+            db = Session()
+            try:
+                for ticker in tickers:
+                    rows = db.query(DailyBar).filter(DailyBar.ticker == ticker).order_by(DailyBar.date).all()
+                    np.array([float(row.close) for row in rows])
+            finally:
+                db.close()
+
+        def sqlite_1y():
+            db = Session()
+            try:
+                for ticker in tickers:
+                    rows = db.query(DailyBar).filter(
+                        DailyBar.ticker == ticker, DailyBar.date >= np.datetime64("2025-10-16").item()
+                    ).order_by(DailyBar.date).all()
+                    np.array([float(row.close) for row in rows])
+            finally:
+                db.close()
+
+        def memmap_full():
+            for ticker in tickers:
+                np.asarray(store.read(ticker)["close"]).sum()
+
+        def memmap_1y():
+            for ticker in tickers:
+                np.asarray(store.read(ticker, start="2025-10-16")["close"]).sum()
+
+        print(f"{n_bars} bars per ticker, best of 5\n")
+        print(f"{'read':<22}{'sqlite/ORM':>12}{'memmap':>12}{'speedup':>10}")
+        for label, slow, fast in (
+            (f"full history x{n_tickers}", sqlite_full, memmap_full),
+            (f"last 1Y x{n_tickers}", sqlite_1y, memmap_1y),
+        ):
+            slow_t, fast_t = timed(slow), timed(fast)
+            print(f"{label:<22}{slow_t * 1000:>10.1f}ms{fast_t * 1000:>10.1f}ms{slow_t / fast_t:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
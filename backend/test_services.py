@@ -1,4 +1,5 @@
 """Test script for backend services"""
+import os
 import sys
 sys.path.insert(0, '/home/user/HedgeEdge/backend')
 
@@ -156,6 +157,402 @@ def test_screener_service():
     finally:
         db.close()
 
+def test_price_history_store():
+    """Test that the columnar store catches up with bars synced before it existed"""
+    print("\n=== Testing Price History Store ===")
+    import tempfile
+    from datetime import datetime, timedelta
+    from unittest import mock
+    import numpy as np
+    from app.core.columnar_store import bar_store
+    from app.models.models import DailyBar, PriceHistorySync
+    from app.services.av_series import PriceSeries
+    from app.services.price_history import price_history
+
+    ticker = "ZZSTORE"
+    days = np.arange(np.datetime64(date.today()) - 24, np.datetime64(date.today()) + 1)
+    closes = np.linspace(100.0, 124.0, len(days))
+    series = PriceSeries(days, closes, closes + 1, closes - 1, closes, np.full(len(days), 1000, dtype=np.int64))
+
+    db = SessionLocal()
+    root = bar_store.root
+    try:
+        bar_store.root = tempfile.mkdtemp()
+        db.query(DailyBar).filter(DailyBar.ticker == ticker).delete()
+        db.query(PriceHistorySync).filter(PriceHistorySync.ticker == ticker).delete()
+
+        # 20 bars synced by a release without the columnar store, due for a sync
+        print("\n1. Syncing 5 new bars onto 20 bars that are only in the table...")
+        for d, c in zip(days[:20].tolist(), closes[:20].tolist()):
+            db.add(DailyBar(ticker=ticker, date=d, open=c, high=c + 1, low=c - 1, close=c, volume=1000))
+        db.add(PriceHistorySync(
+            ticker=ticker, first_date=days[0].tolist(), last_date=days[19].tolist(),
+            synced_at=datetime.utcnow() - timedelta(days=1)
+        ))
+        db.commit()
+
+        with mock.patch("app.services.price_history.market_data.daily_bars", return_value=series):
+            columns = price_history.get_columns(ticker)
+        assert len(columns["date"]) == 25, f"store has {len(columns['date'])} bars, expected 25"
+        assert columns["date"][0] == days[0] and columns["date"][-1] == days[-1]
+        print(f"   ✓ Store holds {len(columns['date'])} bars, {columns['date'][0]} to {columns['date'][-1]}")
+
+        # A store left behind by a failed write is rebuilt on read
+        print("\n2. Reading after the store lost its tail...")
+        bar_store.rewrite(ticker, {name: values[:10] for name, values in series.columns().items()})
+        columns = price_history.get_columns(ticker)
+        assert len(columns["date"]) == 25, f"store has {len(columns['date'])} bars, expected 25"
+        print(f"   ✓ Store rebuilt with {len(columns['date'])} bars")
+
+        # The latest bar was stored mid-session; the next sync takes its closing values
+        print("\n3. Syncing a corrected latest bar...")
+        db.get(PriceHistorySync, ticker).synced_at = datetime.utcnow() - timedelta(days=1)
+        db.commit()
+        series.close = np.concatenate((closes[:-1], [130.0]))
+        with mock.patch("app.services.price_history.market_data.daily_bars", return_value=series):
+            columns = price_history.get_columns(ticker)
+        bars = price_history.get_bars(ticker, limit=1)
+        assert len(columns["date"]) == 25 and columns["close"][-1] == 130.0, f"store close {columns['close'][-1]}"
+        assert bars[0]["close"] == 130.0, f"table close {bars[0]['close']}"
+        print(f"   ✓ Latest close corrected to {bars[0]['close']} in the table and the store")
+
+        # The provider has nothing past the last stored bar, which comes back unchanged
+        print("\n4. Syncing when no new bars exist...")
+        db.get(PriceHistorySync, ticker).synced_at = datetime.utcnow() - timedelta(days=1)
+        db.commit()
+        generation = bar_store._current(ticker)
+        with mock.patch("app.services.price_history.market_data.daily_bars", return_value=series[-1:]):
+            price_history.sync(ticker)
+        db.expire_all()
+        stored = db.query(DailyBar).filter(DailyBar.ticker == ticker).count()
+        columns = price_history.get_columns(ticker)
+        assert stored == 25, f"table has {stored} bars, expected 25"
+        assert len(columns["date"]) == 25 and columns["close"][-1] == 130.0
+        assert bar_store._current(ticker) == generation, "an unchanged bar rewrote the store"
+        assert datetime.utcnow() - db.get(PriceHistorySync, ticker).synced_at < timedelta(minutes=1)
+        print("   ✓ Table and store unchanged, sync time advanced")
+
+        # Last synced longer ago than a compact response reaches back: only a full download closes the gap
+        print("\n5. Syncing after a gap longer than the compact window...")
+        db.query(DailyBar).filter(DailyBar.ticker == ticker).delete()
+        db.query(PriceHistorySync).filter(PriceHistorySync.ticker == ticker).delete()
+        bar_store.delete(ticker)
+        full_days = np.arange(np.datetime64(date.today()) - 209, np.datetime64(date.today()) + 1)
+        full_closes = np.linspace(50.0, 100.0, len(full_days))
+        full = PriceSeries(
+            full_days, full_closes, full_closes + 1, full_closes - 1, full_closes,
+            np.full(len(full_days), 1000, dtype=np.int64)
+        )
+        for d, c in zip(full_days[:10].tolist(), full_closes[:10].tolist()):
+            db.add(DailyBar(ticker=ticker, date=d, open=c, high=c + 1, low=c - 1, close=c, volume=1000))
+        db.add(PriceHistorySync(
+            ticker=ticker, first_date=full_days[0].tolist(), last_date=full_days[9].tolist(),
+            synced_at=datetime.utcnow() - timedelta(days=1)
+        ))
+        db.commit()
+
+        with mock.patch("app.services.price_history.market_data.daily_bars", return_value=full) as daily_bars:
+            columns = price_history.get_columns(ticker)
+        assert daily_bars.call_args.args == (ticker, "full"), f"fetched {daily_bars.call_args}"
+        assert len(columns["date"]) == 210, f"store has {len(columns['date'])} bars, expected 210"
+        assert np.all(np.diff(columns["date"].astype("<i8")) == 1), "the store has a gap"
+        assert len(price_history.get_bars(ticker)) == 210
+        print(f"   ✓ Full download filled {len(columns['date']) - 10} bars with no gap")
+
+        print("\n✓ Price History Store: PASSED")
+    except Exception as e:
+        print(f"\n✗ Price History Store: FAILED - {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.query(DailyBar).filter(DailyBar.ticker == ticker).delete()
+        db.query(PriceHistorySync).filter(PriceHistorySync.ticker == ticker).delete()
+        db.commit()
+        db.close()
+        bar_store.delete(ticker)
+        bar_store.root = root
+
+def test_circuit_breaker():
+    """Test the breaker's closed -> open -> half-open cycle, including a cancelled probe"""
+    print("\n=== Testing Circuit Breaker ===")
+    import asyncio
+    import time
+    from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+    def call(breaker, error=None):
+        with breaker.guard():
+            if error:
+                raise error
+
+    try:
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+
+        print("\n1. Two upstream failures open the circuit...")
+        for _ in range(2):
+            try:
+                call(breaker, ConnectionError("down"))
+            except ConnectionError:
+                pass
+        assert breaker.state == OPEN, f"state {breaker.state}"
+        try:
+            call(breaker)
+            raise AssertionError("an open circuit let a call through")
+        except CircuitOpenError:
+            pass
+        print(f"   ✓ Open, {breaker.stats()['rejected']} call rejected")
+
+        print("\n2. Cancelling the half-open probe...")
+        time.sleep(0.06)
+        assert breaker.state == HALF_OPEN, f"state {breaker.state}"
+
+        async def cancelled_probe():
+            async def probe():
+                with breaker.guard():
+                    await asyncio.sleep(10)
+            task = asyncio.create_task(probe())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        asyncio.run(cancelled_probe())
+        assert breaker.allow(), "the cancelled probe kept the half-open slot"
+        breaker.release()
+        print("   ✓ Probe slot freed")
+
+        print("\n3. A failed probe reopens the circuit, a successful one closes it...")
+        try:
+            call(breaker, ConnectionError("still down"))
+        except ConnectionError:
+            pass
+        assert breaker.state == OPEN, f"state {breaker.state}"
+        time.sleep(0.06)
+        call(breaker)
+        assert breaker.state == CLOSED, f"state {breaker.state}"
+        assert breaker.stats()["consecutive_failures"] == 0
+        print(f"   ✓ Closed after {breaker.stats()['opened']} openings")
+
+        print("\n✓ Circuit Breaker: PASSED")
+    except Exception as e:
+        print(f"\n✗ Circuit Breaker: FAILED - {e}")
+        import traceback
+        traceback.print_exc()
+
+def test_columnar_store_rewrite_race():
+    """Test that reads racing rewrites of the same ticker always see one whole generation"""
+    print("\n=== Testing Columnar Store Rewrite Race ===")
+    import shutil
+    import tempfile
+    import threading
+    import time
+    import numpy as np
+    from app.core.columnar_store import ColumnarBarStore
+
+    def bars(length, close):
+        days = np.arange(np.datetime64("2026-01-01"), np.datetime64("2026-01-01") + length)
+        prices = np.full(length, close)
+        return {"date": days, "open": prices, "high": prices, "low": prices, "close": prices,
+                "volume": np.full(length, 1000, dtype=np.int64)}
+
+    store = ColumnarBarStore(tempfile.mkdtemp())
+    versions = {30: 1.0, 40: 2.0}
+    store.rewrite("RACE", bars(30, 1.0))
+    done = threading.Event()
+    errors = []
+
+    def rewrite():
+        try:
+            for i in range(200):
+                length = 40 if i % 2 == 0 else 30
+                store.rewrite("RACE", bars(length, versions[length]))
+                # Corrections come one sync apart, never back to back; keep a read from spanning two swaps
+                time.sleep(0.002)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                for columns in (store.open("RACE"), store.load("RACE"), store.read("RACE")):
+                    length = len(columns["date"])
+                    assert length in versions, f"read {length} bars"
+                    assert all(len(values) == length for values in columns.values()), "columns of different lengths"
+                    assert (np.asarray(columns["close"]) == versions[length]).all(), "closes from another generation"
+        except Exception as e:
+            errors.append(e)
+
+    try:
+        print("\n1. Reading from 3 threads while another rewrites 200 times...")
+        threads = [threading.Thread(target=rewrite)] + [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, f"{len(errors)} failed reads, first: {errors[0]!r}"
+        generations = [entry for entry in os.listdir(store._ticker_dir("RACE")) if entry.startswith("gen-")]
+        assert len(generations) == 2, f"{len(generations)} generations left on disk"
+        print(f"   ✓ Every read saw one whole generation; {len(generations)} kept on disk")
+
+        print("\n✓ Columnar Store Rewrite Race: PASSED")
+    except Exception as e:
+        print(f"\n✗ Columnar Store Rewrite Race: FAILED - {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        shutil.rmtree(store.root, ignore_errors=True)
+
+def test_intraday_base_extension():
+    """Test that an expired intraday base is extended by an overlapping compact tail"""
+    print("\n=== Testing Intraday Base Extension ===")
+    import time
+    from unittest import mock
+    import numpy as np
+    from app.core.cache import cache
+    from app.services.alpha_vantage import AlphaVantageClient
+    from app.services.av_series import PriceSeries
+
+    def minutes(start, count, close):
+        stamps = np.datetime64(start, "s") + np.arange(count) * 60
+        prices = np.full(count, close)
+        return PriceSeries(stamps, prices, prices + 0.5, prices - 0.5, prices, np.full(count, 100, dtype=np.int64))
+
+    ticker = "ZZINTRA"
+    client = AlphaVantageClient()
+    # 300 bars from 09:30, then a compact tail of 100 restating the last 30 and adding 70
+    base = minutes("2026-10-16T09:30", 300, 10.0)
+    tail = minutes("2026-10-16T14:00", 100, 11.0)
+    try:
+        print("\n1. Reading an expired base whose compact tail overlaps it...")
+        cache.set("intraday", ticker, base, ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get_entry("intraday", ticker).stale, "base not stale"
+        with mock.patch.object(client, "_fetch_intraday_1min", return_value=tail) as fetch:
+            series = client.get_intraday_base(ticker)
+        assert [call.args[1] for call in fetch.call_args_list] == ["compact"], f"fetched {fetch.call_args_list}"
+
+        span = base.timestamps[-1] - base.timestamps[0]
+        assert series.timestamps[-1] == tail.timestamps[-1], f"ends at {series.timestamps[-1]}"
+        assert series.timestamps[-1] - series.timestamps[0] == span, "span changed"
+        assert len(np.unique(series.timestamps)) == len(series) == 300, f"{len(series)} bars"
+        restated = series.timestamps >= tail.timestamps[0]
+        assert (series.close[restated] == 11.0).all() and (series.close[~restated] == 10.0).all(), \
+            "overlapping bars not taken from the tail"
+        assert cache.get("intraday", ticker) is series, "extended base not cached"
+        print(f"   ✓ {len(series)} bars from {series.timestamps[0]} to {series.timestamps[-1]}, "
+              f"{restated.sum()} from the tail")
+
+        print("\n✓ Intraday Base Extension: PASSED")
+    except Exception as e:
+        print(f"\n✗ Intraday Base Extension: FAILED - {e}")
+        import traceback
+        traceback.print_exc()
+
+def test_shared_cache_tier():
+    """Test the Redis L2 tier across two cache instances: L1 miss -> L2 hit, and pub/sub invalidation"""
+    print("\n=== Testing Shared Cache Tier ===")
+    import time
+    import fakeredis
+    from app.core.cache import CacheStore
+    from app.core.redis_cache import RedisCacheTier
+    from app.models.schemas import Quote
+
+    # Two processes' caches sharing one (fake) Redis server
+    server = fakeredis.FakeServer()
+    first, second = (
+        CacheStore(max_entries=100, namespace_ttls={"quote": 60}, namespace_grace={"quote": 30})
+        for _ in range(2)
+    )
+    try:
+        for store in (first, second):
+            store.attach_l2(RedisCacheTier(fakeredis.FakeRedis(server=server)), ["quote"])
+
+        print("\n1. Reading a value another instance wrote...")
+        first.set("quote", "AAPL", Quote(ticker="AAPL", price=190.0, change=1.0, change_percent=0.5))
+        entry = second.get_entry("quote", "AAPL")
+        assert entry is not None and entry.value.price == 190.0, f"entry {entry}"
+        assert not entry.stale, "a fresh L2 value came back stale"
+        assert second.stats()["namespaces"]["quote"]["l2_hits"] == 1
+        assert second.remaining_ttl("quote", "AAPL") is not None, "the L2 hit was not promoted into L1"
+        print(f"   ✓ L1 miss served from L2 and promoted (fresh for {second.remaining_ttl('quote', 'AAPL'):.0f}s)")
+
+        print("\n2. Overwriting it from the first instance...")
+        first.set("quote", "AAPL", Quote(ticker="AAPL", price=191.5, change=2.5, change_percent=1.3))
+        waited = 0.0
+        while second.remaining_ttl("quote", "AAPL") is not None and waited < 3:
+            time.sleep(0.05)
+            waited += 0.05
+        assert second.remaining_ttl("quote", "AAPL") is None, "the invalidation never reached the second instance"
+        assert second.get("quote", "AAPL").price == 191.5
+        # A writer ignores its own announcements
+        assert first.remaining_ttl("quote", "AAPL") is not None, "the writer dropped its own L1 copy"
+        print(f"   ✓ Second instance dropped its L1 copy after {waited:.2f}s and re-read 191.5 from L2")
+
+        print("\n✓ Shared Cache Tier: PASSED")
+    except Exception as e:
+        print(f"\n✗ Shared Cache Tier: FAILED - {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        for store in (first, second):
+            store.detach_l2()
+
+def test_sqlite_token_bucket():
+    """Test two SQLite-backed buckets (as two worker processes) sharing one token count"""
+    print("\n=== Testing SQLite Token Bucket ===")
+    import sqlite3
+    import tempfile
+    import threading
+    from app.core.rate_limit import SQLiteTokenBucket
+
+    try:
+        path = os.path.join(tempfile.mkdtemp(), "rate_limit.db")
+        # Refill is negligible over the test, so exactly `burst` tokens exist between both buckets
+        buckets = [SQLiteTokenBucket(path, "test", rate_per_minute=0.6, burst=20) for _ in range(2)]
+
+        print("\n1. Two connections racing for 20 tokens...")
+        granted = [0, 0]
+        errors = []
+
+        def worker(index):
+            try:
+                for _ in range(25):
+                    if buckets[index].acquire(timeout=0):
+                        granted[index] += 1
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, f"errors: {errors}"
+        assert sum(granted) == 20, f"granted {granted}"
+        print(f"   ✓ Tokens granted {granted[0]} + {granted[1]} = 20, none twice")
+
+        print("\n2. Taking a token while another connection holds the write lock...")
+        blocker = sqlite3.connect(path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        buckets[0]._connect = lambda: sqlite3.connect(path, timeout=0.1, isolation_level=None)
+        try:
+            buckets[0]._take()
+            raise AssertionError("took a token while the database was locked")
+        except sqlite3.OperationalError as e:
+            assert "locked" in str(e), f"lock timeout surfaced as: {e}"
+        finally:
+            blocker.execute("ROLLBACK")
+            blocker.close()
+        print("   ✓ Lock timeout raised as 'database is locked'")
+
+        print("\n✓ SQLite Token Bucket: PASSED")
+    except Exception as e:
+        print(f"\n✗ SQLite Token Bucket: FAILED - {e}")
+        import traceback
+        traceback.print_exc()
+
 if __name__ == "__main__":
     print("=" * 60)
     print("HedgeEdge Backend Services Test Suite")
@@ -165,6 +562,12 @@ if __name__ == "__main__":
     test_portfolio_service()
     test_watchlist_service()
     test_screener_service()
+    test_price_history_store()
+    test_circuit_breaker()
+    test_columnar_store_rewrite_race()
+    test_intraday_base_extension()
+    test_shared_cache_tier()
+    test_sqlite_token_bucket()
 
     print("\n" + "=" * 60)
     print("Test Suite Complete!")